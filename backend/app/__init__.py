@@ -4,9 +4,11 @@ from flask_migrate import Migrate
 from flask_cors import CORS
 from flask_login import LoginManager
 from config import Config
+from .engine import RoutingSession
 
 # Initialize extensions (but don't connect them to the app yet)
-db = SQLAlchemy()
+# RoutingSession lets read-only views use the read engine (see app/engine.py)
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 migrate = Migrate()
 login_manager = LoginManager()
 login_manager.login_view = 'login'
@@ -15,15 +17,19 @@ login_manager.login_message_category = 'info'
 # User loader callback required by Flask-Login
 # Must be defined *before* create_app or imported if defined elsewhere
 from .models import User
+from .auth import get_principal, BearerTokenSessionInterface
 
 @login_manager.user_loader
 def load_user(user_id):
-    return User.query.get(int(user_id))
+    # Served from the principal cache; only a cache miss queries the User table
+    return get_principal(int(user_id))
 
 def create_app(config_class=Config):
     """Application factory pattern"""
     app = Flask(__name__)
     app.config.from_object(config_class)
+    from .thumbnails import check_thumbnail_formats
+    check_thumbnail_formats(app.config['THUMBNAIL_FORMATS'])
 
     # Load CORS configuration from environment or use defaults
     # For local development, we'll make it handle any localhost/127.0.0.1 origin
@@ -58,10 +64,23 @@ def create_app(config_class=Config):
          supports_credentials=True  # Allow cookies/credentials
         )
 
+    # Pool sizing/timeouts and the optional read engine, from the DB_* settings
+    from . import engine
+    engine.configure_engines(app)
+
     # Initialize Flask extensions here
     db.init_app(app)
     migrate.init_app(app, db)
+
+    # SQLite: WAL + pragmas on every connection, one writer at a time
+    engine.init_app(app)
     login_manager.init_app(app)
+    if app.config.get('AUTH_BEARER_SKIPS_SESSION'):
+        app.session_interface = BearerTokenSessionInterface()
+
+    # gzip/brotli for large API responses
+    from . import http_cache
+    http_cache.init_app(app)
 
     # Register blueprints here (if we split routes into multiple files)
     # Example: from app.main import bp as main_bp
@@ -1,47 +1,191 @@
+import threading
+import time
+import datetime
 from functools import wraps
-from flask import request, jsonify, current_app
+from flask import request, jsonify, current_app, g
+from flask.sessions import SecureCookieSessionInterface
+from flask_login import UserMixin
+from sqlalchemy import event
 import jwt
+from . import db
 from .models import User
 
+# Default lifetime of cached principals (seconds); override with PRINCIPAL_CACHE_TTL
+DEFAULT_PRINCIPAL_CACHE_TTL = 300
+PRINCIPAL_CACHE_MAX_SIZE = 10000
+
+
+class Principal(UserMixin):
+    """The authenticated user as seen by request handlers.
+
+    Carries only what the handlers need (id, username, email), so it can be
+    built straight from token claims or a cache entry without touching the DB.
+    """
+    __slots__ = ('id', 'username', 'email')
+
+    def __init__(self, id, username, email):
+        self.id = id
+        self.username = username
+        self.email = email
+
+    @classmethod
+    def from_user(cls, user):
+        return cls(user.id, user.username, user.email)
+
+    def __repr__(self):
+        return f'<Principal {self.id} {self.username}>'
+
+
+class PrincipalCache:
+    """Small thread-safe TTL cache of Principal objects keyed by user id.
+
+    Entries are dropped when the underlying User row changes in this process;
+    other processes see the change once the TTL expires.
+    """
+    def __init__(self, max_size=PRINCIPAL_CACHE_MAX_SIZE):
+        self.max_size = max_size
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            expires_at, principal = entry
+            if expires_at < time.monotonic():
+                del self._entries[user_id]
+                return None
+            return principal
+
+    def set(self, principal, ttl):
+        with self._lock:
+            if len(self._entries) >= self.max_size:
+                # Cheap bound: evict the entry closest to expiry
+                oldest = min(self._entries, key=lambda key: self._entries[key][0])
+                del self._entries[oldest]
+            self._entries[principal.id] = (time.monotonic() + ttl, principal)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+principal_cache = PrincipalCache()
+
+
+@event.listens_for(User, 'after_update')
+@event.listens_for(User, 'after_delete')
+def _invalidate_cached_principal(mapper, connection, target):
+    principal_cache.invalidate(target.id)
+
+
+def get_principal(user_id):
+    """Returns the Principal for a user id, hitting the DB only on a cache miss."""
+    principal = principal_cache.get(user_id)
+    if principal is None:
+        user = db.session.get(User, user_id)
+        if user is None:
+            return None
+        principal = Principal.from_user(user)
+        principal_cache.set(principal, current_app.config.get('PRINCIPAL_CACHE_TTL', DEFAULT_PRINCIPAL_CACHE_TTL))
+    return principal
+
+
+def issue_access_token(user):
+    """Creates a signed JWT carrying the claims request handlers need."""
+    now = datetime.datetime.now(datetime.timezone.utc)
+    token_payload = {
+        'user_id': user.id,
+        'username': user.username,
+        'email': user.email,
+        'iat': now,
+        'exp': now + datetime.timedelta(days=1)  # Token expires in 1 day
+    }
+    return jwt.encode(token_payload, current_app.config['SECRET_KEY'], algorithm='HS256')
+
+
+def get_bearer_token(req):
+    """Returns the bearer token from the Authorization header, if any."""
+    auth_header = req.headers.get('Authorization')
+    if auth_header and auth_header.startswith('Bearer '):
+        return auth_header.split(' ')[1]
+    return None
+
+
+class BearerTokenSessionInterface(SecureCookieSessionInterface):
+    """Cookie session interface that ignores the session cookie on bearer-token requests.
+
+    Token-authenticated API calls never need the Flask-Login session, so the
+    cookie is neither decoded nor re-issued for them unless the handler
+    modifies the session.
+    """
+    def open_session(self, app, request):
+        if get_bearer_token(request):
+            return self.session_class()
+        return super().open_session(app, request)
+
+    def save_session(self, app, session, response):
+        # A bearer request that changed the session (logout_user() on /logout)
+        # still writes it, so the cookie session is cleared as well
+        if get_bearer_token(request) and not session.modified:
+            return
+        return super().save_session(app, session, response)
+
+
+def _principal_from_token(token):
+    """Decodes a JWT into a Principal. Raises jwt.InvalidTokenError subclasses."""
+    data = jwt.decode(token, current_app.config['SECRET_KEY'], algorithms=['HS256'])
+    user_id = data['user_id']
+
+    # Opt-in stateless fast path: the token already carries everything handlers
+    # use. The user row is not read, so a deleted user's tokens stay valid until
+    # they expire; by default the principal cache limits that to PRINCIPAL_CACHE_TTL
+    if current_app.config.get('JWT_TRUST_CLAIMS', False) and 'username' in data and 'email' in data:
+        return Principal(user_id, data['username'], data['email'])
+
+    # Claims not trusted (the default), or tokens issued before claims were added
+    return get_principal(user_id)
+
+
 def token_required(f):
     """Decorator to verify JWT token in Authorization header"""
     @wraps(f)
     def decorated(*args, **kwargs):
-        token = None
-        
-        # Check if Authorization header exists and has the correct format
-        auth_header = request.headers.get('Authorization')
-        if auth_header and auth_header.startswith('Bearer '):
-            token = auth_header.split(' ')[1]
-        
+        token = get_bearer_token(request)
+
         # Initialize current_user to None (will be passed to the decorated function)
         jwt_user = None
-        
+
         # If token is provided, try to authenticate with it
         if token:
             try:
-                # Decode the token
-                data = jwt.decode(token, current_app.config['SECRET_KEY'], algorithms=['HS256'])
-                jwt_user = User.query.get(data['user_id'])
-                
+                jwt_user = _principal_from_token(token)
+
                 if not jwt_user:
                     return jsonify({'error': 'Invalid token - user not found'}), 401
-                
+
             except jwt.ExpiredSignatureError:
                 return jsonify({'error': 'Token has expired'}), 401
-            except jwt.InvalidTokenError:
+            except (jwt.InvalidTokenError, KeyError):
                 return jsonify({'error': 'Invalid token'}), 401
-        
+
+            # Make Flask-Login's current_user resolve to the token principal so
+            # it never falls back to the session/remember cookie loader.
+            g._login_user = jwt_user
+            return f(current_user=jwt_user, *args, **kwargs)
+
         # Check if the user is authenticated via Flask-Login
         from flask_login import current_user as flask_login_user
-        if not jwt_user and not flask_login_user.is_authenticated:
+        if not flask_login_user.is_authenticated:
             # No valid authentication - either via JWT or cookies
             return jsonify({'error': 'Authentication required'}), 401
-            
-        # Use JWT user if available, otherwise use Flask-Login user
-        authenticated_user = jwt_user if jwt_user else flask_login_user
-            
+
         # Pass the authenticated user to the decorated function
-        return f(current_user=authenticated_user, *args, **kwargs)
-    
+        return f(current_user=flask_login_user._get_current_object(), *args, **kwargs)
+
     return decorated
@@ -108,6 +108,7 @@ class PersistentCache:
             card_set.id: {
                 'name': card_set.name,
                 'year': card_set.year,
+                'manufacturer': card_set.manufacturer,
                 # Add other relevant fields
             } for card_set in card_sets
         }
@@ -0,0 +1,283 @@
+# backend/app/card_identification.py
+"""Identifies a card crop with local checks before any eBay call.
+
+A crop whose pHash is close to one of the uploader's own cards
+(image_hash.card_hash_index) is a duplicate: DUPLICATE_POLICY 'reuse' copies
+that card's fields into the new card, 'skip' creates nothing. A crop close to
+a representative hash of the shared catalog (catalog.catalog_hash_index)
+takes that entry's fields. Only then does OCR run.
+
+Most cards print the player name, the card number and a copyright year in
+legible text. OCR tokens are matched against the player, team and
+manufacturer references, and the result decides the route:
+
+    ocr      known player (score >= OCR_ACCEPT_SCORE) plus year and manufacturer:
+             the card is created from the OCR fields, no network call
+    catalog  the OCR fields name a catalogued card (season, manufacturer,
+             number and player): its entry's fields, no network call
+    keyword  likely player (score >= OCR_KEYWORD_SCORE): eBay keyword search
+             built from the OCR fields, no image upload
+    image    otherwise: eBay search_by_image, as before OCR existed
+
+pytesseract (and the tesseract binary) are optional; without them, or with
+OCR_PREPASS off, every crop takes the image route. Cards identified through
+eBay are catalogued (catalog.resolve_catalog_card) so the next collector's
+upload of the same card resolves locally (record_identification, once the
+request's eBay calls are done). Cards from the ocr route are not: a misread
+would be served to every collector, so they stay out of the shared catalog
+until an upload identified through eBay creates the entry.
+"""
+import re
+import time
+import cv2
+from flask import current_app
+from .image_utils import load_image
+from .ebay_client import find_card_on_ebay, search_ebay_by_keywords
+from .image_hash import card_hash_index, to_signed, to_unsigned
+from .catalog import catalog_hash_index, catalog_card_data, find_catalog_card, resolve_catalog_card, \
+    record_catalog_reuse
+from .services import map_ebay_result_to_card_data, match_reference_names, normalize_season_year, \
+    YEAR_PATTERN, NUMBER_PATTERN
+
+# Optional OCR engine; identification falls back to eBay image search without it
+try:
+    import pytesseract
+except ImportError:
+    pytesseract = None
+
+OCR_WORK_HEIGHT = 1200 # Crops are scaled to about this height (card text ~30 px tall)
+OCR_MIN_WORD_CONFIDENCE = 50 # Tesseract word confidence (0-100) kept as a token
+OCR_MAX_NGRAM = 3 # Player names are matched against 1-3 word runs of a line
+OCR_MANUFACTURER_MIN_SCORE = 90 # Manufacturer names are short; near-misses are usually other words
+# Card fields copied from the user's own card with the same pHash
+REUSED_FIELDS = ('player_name', 'card_year', 'manufacturer', 'card_number', 'team', 'image_url', 'sport',
+                 'catalog_card_id')
+CARD_NUMBER_PATTERN = re.compile(r'\bNo\.?\s*([A-Za-z]{0,3}\d{1,4})\b', re.IGNORECASE)
+
+_ocr_available = None
+
+
+def ocr_available():
+    """True if pytesseract and the tesseract binary can be used (checked once per process)."""
+    global _ocr_available
+    if _ocr_available is None:
+        _ocr_available = False
+        if pytesseract is not None:
+            tesseract_cmd = current_app.config.get('TESSERACT_CMD')
+            if tesseract_cmd:
+                pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
+            try:
+                pytesseract.get_tesseract_version()
+                _ocr_available = True
+            except Exception as e:
+                print(f"Warning: OCR pre-pass disabled, tesseract is not usable: {e}")
+    return _ocr_available
+
+
+def ocr_card_lines(image_path):
+    """Runs tesseract on a card crop.
+
+    Returns:
+        list: Text lines (words with confidence >= OCR_MIN_WORD_CONFIDENCE, in
+              reading order), or None if the image cannot be read.
+    """
+    gray = load_image(image_path, OCR_WORK_HEIGHT, grayscale=True)
+    if gray is None:
+        return None
+    scale = OCR_WORK_HEIGHT / gray.shape[0]
+    if abs(scale - 1) > 0.1:
+        gray = cv2.resize(gray, None, fx=scale, fy=scale,
+                          interpolation=cv2.INTER_CUBIC if scale > 1 else cv2.INTER_AREA)
+    # psm 11: sparse text, no assumption of a single text block (card fronts and backs)
+    data = pytesseract.image_to_data(gray, config='--psm 11', output_type=pytesseract.Output.DICT)
+    lines = {}
+    for i, word in enumerate(data['text']):
+        word = word.strip()
+        if word and float(data['conf'][i]) >= OCR_MIN_WORD_CONFIDENCE:
+            key = (data['block_num'][i], data['par_num'][i], data['line_num'][i])
+            lines.setdefault(key, []).append(word)
+    return [' '.join(words) for _, words in sorted(lines.items())]
+
+
+def ocr_card_fields(lines):
+    """Maps OCR text lines to card fields.
+
+    Returns:
+        dict: player_name, team, manufacturer, card_year and card_number (None
+              when not found) plus player_score (0-100).
+    """
+    word_lines = []
+    for line in lines:
+        words = [word.strip('.,:;()©®™*') for word in line.split()]
+        word_lines.append([word for word in words if word])
+    matches = match_reference_names(word_lines, OCR_MAX_NGRAM, current_app.config.get('OCR_KEYWORD_SCORE', 75))
+    text = ' '.join(lines)
+
+    card_year = None
+    year_match = YEAR_PATTERN.search(text)
+    if year_match:
+        try:
+            card_year = normalize_season_year(year_match.group(0))
+        except ValueError:
+            pass
+    number_match = NUMBER_PATTERN.search(text) or CARD_NUMBER_PATTERN.search(text)
+
+    player, player_score = matches['player_name']
+    manufacturer, manufacturer_score = matches['manufacturer']
+    return {
+        'player_name': player if player_score >= current_app.config.get('OCR_KEYWORD_SCORE', 75) else None,
+        'player_score': player_score,
+        'team': matches['team'][0],
+        'manufacturer': manufacturer if manufacturer_score >= OCR_MANUFACTURER_MIN_SCORE else None,
+        'card_year': card_year,
+        'card_number': number_match.group(1) if number_match else None,
+    }
+
+
+def keyword_query(fields):
+    """eBay search keywords from OCR fields, most specific first."""
+    parts = [fields.get('card_year'), fields.get('manufacturer'), fields.get('player_name')]
+    if fields.get('card_number'):
+        parts.append(f"#{fields['card_number']}")
+    return ' '.join(part for part in parts if part)
+
+
+def find_duplicate(image_hash, owner_id):
+    """The owner's card nearest to the crop's pHash within DUPLICATE_MAX_DISTANCE.
+
+    Returns:
+        tuple: (Card, Hamming distance), or (None, None).
+    """
+    matches = card_hash_index.find(image_hash, current_app.config.get('DUPLICATE_MAX_DISTANCE', 10), owner_id)
+    return matches[0][::-1] if matches else (None, None)
+
+
+def identify_card(image_path, use_ocr=None, owner_id=None, image_hash=None):
+    """Identifies one card crop: own duplicates and the catalog by pHash, then OCR, then eBay.
+
+    Args:
+        image_path (str): Path to the card crop.
+        use_ocr (bool): Run the OCR pre-pass; defaults to the OCR_PREPASS setting.
+        owner_id (int): Uploading user, for duplicate detection in their collection.
+        image_hash (int): The crop's pHash (image_hash.image_phash); None skips the
+                          hash lookups.
+
+    Returns:
+        tuple: (mapped card data or None, info). info holds source ('duplicate',
+               'catalog', 'ocr', 'keyword' or 'image'), api_calls ({'keyword': n,
+               'image': n}), ocr_ms, lookup_ms, player_score, duplicate_of and
+               hash_distance when the crop matched by hash, and catalog_card_id.
+               Mapped data carries image_hash and catalog_card_id for the new card.
+               Nothing is written; pass the result to record_identification
+               before saving the card.
+    """
+    config = current_app.config
+    info = {'source': 'image', 'api_calls': {'keyword': 0, 'image': 0}, 'ocr_ms': 0.0, 'lookup_ms': 0.0,
+            'player_score': 0, 'duplicate_of': None, 'hash_distance': None, 'catalog_card_id': None}
+
+    mapped_data = None
+    policy = config.get('DUPLICATE_POLICY', 'reuse')
+    if image_hash is not None and owner_id is not None and policy != 'off':
+        duplicate, distance = find_duplicate(image_hash, owner_id)
+        if duplicate is not None:
+            info.update(source='duplicate', duplicate_of=duplicate.id, hash_distance=distance)
+            print(f"{image_path} looks like card {duplicate.id} already in the collection (distance {distance})")
+            if policy == 'skip':
+                return None, info
+            # Same picture, same card: copy the identification, not the copy's own grade or notes
+            mapped_data = {field: getattr(duplicate, field) for field in REUSED_FIELDS}
+            mapped_data['grade'] = None
+
+    catalog_lookup = config.get('CATALOG_LOOKUP', True)
+    if mapped_data is None and image_hash is not None and catalog_lookup:
+        matches = catalog_hash_index.find(image_hash, config.get('HASH_REUSE_MAX_DISTANCE', 6))
+        if matches:
+            distance, entry = matches[0]
+            info.update(source='catalog', hash_distance=distance)
+            print(f"{image_path} matches catalog card {entry.identity_key} (distance {distance})")
+            mapped_data = catalog_card_data(entry)
+
+    if mapped_data is None:
+        if use_ocr is None:
+            use_ocr = config.get('OCR_PREPASS', True)
+        mapped_data = _identify_by_content(image_path, use_ocr, catalog_lookup, info)
+
+    if mapped_data is not None:
+        mapped_data.setdefault('catalog_card_id', None)
+        info['catalog_card_id'] = mapped_data['catalog_card_id']
+        if image_hash is not None:
+            mapped_data['image_hash'] = to_signed(image_hash)
+    return mapped_data, info
+
+
+def record_identification(mapped_data, source):
+    """Catalog writes for a card identified by identify_card. Does not commit.
+
+    A catalog hit counts as a reuse; a card identified through eBay
+    ('keyword' or 'image') is catalogued and mapped_data gets its
+    catalog_card_id. OCR alone is not trusted to name a card for every
+    collector, so 'ocr' cards (like duplicates) write nothing. identify_card
+    itself only reads, so callers run this right before saving the card,
+    after the request's eBay calls, and the write transaction (SQLite's write
+    lock) is not held across them.
+    """
+    image_hash = mapped_data.get('image_hash')
+    image_hash = to_unsigned(image_hash) if image_hash is not None else None
+    if source == 'catalog':
+        record_catalog_reuse(mapped_data['catalog_card_id'], image_hash)
+    elif source in ('keyword', 'image'):
+        entry = resolve_catalog_card(mapped_data, source, image_hash)
+        mapped_data['catalog_card_id'] = entry.id if entry else None
+
+
+def _identify_by_content(image_path, use_ocr, catalog_lookup, info):
+    """OCR pre-pass (checked against the catalog), then eBay keyword or image search.
+
+    Fills info and returns mapped data or None.
+    """
+    config = current_app.config
+    fields = None
+    if use_ocr and ocr_available():
+        start = time.perf_counter()
+        try:
+            lines = ocr_card_lines(image_path)
+            fields = ocr_card_fields(lines) if lines else None
+        except Exception as e:
+            print(f"OCR failed for {image_path}: {e}")
+        info['ocr_ms'] = round((time.perf_counter() - start) * 1000, 1)
+
+    if fields:
+        info['player_score'] = fields['player_score']
+        card_fields = {key: value for key, value in fields.items() if key != 'player_score'}
+        entry = find_catalog_card(card_fields) if catalog_lookup and fields['player_name'] else None
+        if entry is not None:
+            info['source'] = 'catalog'
+            print(f"OCR fields of {image_path} name catalog card {entry.identity_key}")
+            return catalog_card_data(entry)
+        if (fields['player_score'] >= config.get('OCR_ACCEPT_SCORE', 92)
+                and fields['card_year'] and fields['manufacturer']):
+            info['source'] = 'ocr'
+            print(f"OCR identified {image_path}: {card_fields}")
+            return dict(card_fields, grade=None, image_url=None)
+
+        if fields['player_name']:
+            info['source'] = 'keyword'
+            start = time.perf_counter()
+            info['api_calls']['keyword'] += 1
+            mapped_data = map_ebay_result_to_card_data(search_ebay_by_keywords(keyword_query(fields)))
+            info['lookup_ms'] = round((time.perf_counter() - start) * 1000, 1)
+            if mapped_data:
+                # OCR read these off the card itself; fill what the listing title lacked
+                for key, value in card_fields.items():
+                    if value and not mapped_data.get(key):
+                        mapped_data[key] = value
+                return mapped_data
+            print(f"Keyword search found nothing for {image_path}, falling back to image search")
+
+    info['source'] = 'image'
+    start = time.perf_counter()
+    info['api_calls']['image'] += 1
+    ebay_result = find_card_on_ebay(image_path)
+    mapped_data = map_ebay_result_to_card_data(ebay_result) if ebay_result else None
+    info['lookup_ms'] = round(info['lookup_ms'] + (time.perf_counter() - start) * 1000, 1)
+    return mapped_data
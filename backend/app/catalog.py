@@ -0,0 +1,152 @@
+# backend/app/catalog.py
+"""Canonical card catalog shared by every collector.
+
+A CatalogCard is one printed card, e.g. 2024-25 Panini Hoops #122 Jaylen
+Brown. Its identity is season, manufacturer, card number and player, so a
+card is only catalogued once all four are known. An entry keeps the fields
+mapped the first time anyone identified the card plus up to
+CATALOG_MAX_HASHES pHashes of crops that resolved to it.
+
+identify_card checks the catalog before any eBay call, by image hash
+(catalog_hash_index) and by the fields OCR read off the card, so a popular
+card costs one lookup in total rather than one per collector. User cards
+link to their entry through Card.catalog_card_id: identified uploads create
+the entry if needed, hand-entered and edited cards link to an existing one.
+"""
+from sqlalchemy import select, update
+from flask import current_app
+from . import db
+from .models import Card, CatalogCard, CatalogCardHash
+from .image_hash import HashIndex, hamming, to_signed, to_unsigned
+from .collection import record_card_changes
+from .engine import dialect_insert
+from .services import card_season_fields, parse_season_start, resolve_reference_ids
+
+# Card fields an entry carries over to the user cards resolved to it
+CATALOG_FIELDS = ('player_name', 'card_year', 'manufacturer', 'card_number', 'team', 'sport', 'image_url')
+# A crop only becomes another representative hash if it adds coverage
+REPRESENTATIVE_HASH_MIN_DISTANCE = 3
+
+catalog_hash_index = HashIndex(CatalogCardHash, CatalogCard, CatalogCardHash.catalog_card_id)
+
+
+def catalog_identity(fields):
+    """Identity key for card fields (a dict or Card), or None unless all identity fields are known."""
+    get = fields.get if isinstance(fields, dict) else (lambda field: getattr(fields, field, None))
+    season_start = parse_season_start(get('card_year'))
+    manufacturer, card_number, player_name = (str(get(field) or '').strip().lower()
+                                              for field in ('manufacturer', 'card_number', 'player_name'))
+    card_number = card_number.lstrip('#')
+    if season_start is None or not (manufacturer and card_number and player_name):
+        return None
+    return f"{season_start}|{manufacturer}|{card_number}|{player_name}"
+
+
+def find_catalog_card(fields):
+    """The catalog entry named by card fields, or None."""
+    key = catalog_identity(fields)
+    return CatalogCard.query.filter_by(identity_key=key).first() if key else None
+
+
+def find_catalog_card_ids(cards):
+    """Catalog entry IDs for several cards (dicts or Cards) with one query; None where none matches."""
+    keys = [catalog_identity(card) for card in cards]
+    wanted = {key for key in keys if key}
+    ids = dict(db.session.execute(
+        select(CatalogCard.identity_key, CatalogCard.id).where(CatalogCard.identity_key.in_(wanted))
+    ).all()) if wanted else {}
+    return [ids.get(key) for key in keys]
+
+
+def catalog_card_data(entry):
+    """Mapped card data (as map_ebay_result_to_card_data returns) for a catalog entry."""
+    data = {field: getattr(entry, field) for field in CATALOG_FIELDS}
+    data.update(grade=None, catalog_card_id=entry.id)
+    return data
+
+
+def add_representative_hash(entry, image_hash):
+    """Stores image_hash (unsigned) for the entry unless it has enough hashes or a close one already.
+
+    Returns:
+        bool: True if the hash was added. Does not commit.
+    """
+    stored = [to_unsigned(value) for value in db.session.scalars(
+        select(CatalogCardHash.image_hash).where(CatalogCardHash.catalog_card_id == entry.id))]
+    if len(stored) >= current_app.config.get('CATALOG_MAX_HASHES', 8):
+        return False
+    if any(hamming(image_hash, value) < REPRESENTATIVE_HASH_MIN_DISTANCE for value in stored):
+        return False
+    db.session.add(CatalogCardHash(catalog_card_id=entry.id, image_hash=to_signed(image_hash)))
+    return True
+
+
+def resolve_catalog_card(data, source, image_hash=None):
+    """Finds or creates the catalog entry for identified card data.
+
+    Args:
+        data (dict): Mapped card fields.
+        source (str): How the card was identified ('image', 'keyword', 'ocr', 'backfill').
+        image_hash (int): Unsigned pHash of the crop, kept as a representative hash.
+
+    Returns:
+        CatalogCard: The entry, or None if the fields do not name one card.
+                     Stages its writes in the session without committing.
+    """
+    key = catalog_identity(data)
+    if key is None:
+        return None
+    entry = CatalogCard.query.filter_by(identity_key=key).first()
+    if entry is None:
+        values = {field: data.get(field) for field in CATALOG_FIELDS}
+        values.update(card_season_fields(values['card_year']))
+        values.update(resolve_reference_ids(values))
+        # ON CONFLICT rather than a savepoint: pysqlite's RELEASE would commit the caller's transaction
+        insert_stmt = dialect_insert(CatalogCard.__table__, db.session)
+        db.session.execute(insert_stmt.values(identity_key=key, source=source, reuse_count=0, **values)
+                           .on_conflict_do_nothing(index_elements=['identity_key']))
+        # Ours, or a concurrent upload's that catalogued the same card first
+        entry = CatalogCard.query.filter_by(identity_key=key).one()
+    if image_hash is not None:
+        add_representative_hash(entry, image_hash)
+    return entry
+
+
+def record_catalog_reuse(catalog_card_id, image_hash=None):
+    """Counts an upload resolved from the catalog without an eBay call. Does not commit."""
+    db.session.execute(update(CatalogCard).where(CatalogCard.id == catalog_card_id)
+                       .values(reuse_count=CatalogCard.reuse_count + 1),
+                       execution_options={'synchronize_session': False})
+    if image_hash is not None:
+        add_representative_hash(db.session.get(CatalogCard, catalog_card_id), image_hash)
+
+
+def backfill_card_catalog(after_id, limit):
+    """Links one keyset page of unlinked cards (id > after_id) to the catalog (migration job).
+
+    Only cards whose player matched the reference table are catalogued, so
+    free-text typos do not become catalog entries. Their stored image hash
+    becomes a representative hash. Call load_reference_data_cache() first.
+    Does not commit.
+
+    Returns:
+        tuple: (last card ID scanned or None when no cards remain, cards scanned, cards linked).
+    """
+    cards = Card.query.filter(Card.id > after_id).order_by(Card.id).limit(limit).all()
+    if not cards:
+        return None, 0, 0
+
+    linked_by_owner = {}
+    for card in cards:
+        if card.catalog_card_id is not None or card.player_id is None:
+            continue
+        data = {field: getattr(card, field) for field in CATALOG_FIELDS}
+        entry = resolve_catalog_card(data, 'backfill', to_unsigned(card.image_hash))
+        if entry is not None:
+            card.catalog_card_id = entry.id
+            linked_by_owner.setdefault(card.owner_id, []).append(card)
+
+    for owner_id, linked in linked_by_owner.items():
+        # Facet fields are unchanged; this only stamps the cards for delta sync
+        record_card_changes(owner_id, removed=linked, added=linked)
+    return cards[-1].id, len(cards), sum(len(linked) for linked in linked_by_owner.values())
@@ -0,0 +1,482 @@
+# backend/app/collection.py
+"""Derived per-user collection data that is kept in step with card writes.
+
+Every code path that creates, updates or deletes cards reports the change here
+*before* committing, so the side tables are updated in the same transaction.
+"""
+import threading
+from collections import Counter, OrderedDict
+from datetime import datetime
+from sqlalchemy import select, update, delete, func, tuple_
+from . import db
+from .engine import dialect_insert
+from .models import User, Card, CardFacet, CardTombstone
+from .serializers import select_card_rows, format_card_year
+
+# Card columns exposed through /autocomplete-options
+FACET_FIELDS = ('player_name', 'manufacturer', 'team', 'grade')
+
+# Card columns rolled up into card_facet; card_year only feeds /cards/stats
+ROLLUP_SOURCE_FIELDS = FACET_FIELDS + ('card_year',)
+
+# Pseudo-field holding one row per owner with the total card count
+TOTAL_FIELD = 'total'
+TOTAL_VALUE = '*'
+
+# card_facet field -> /cards/stats response key
+STAT_FIELDS = {
+    'team': 'by_team',
+    'card_year': 'by_season',
+    'manufacturer': 'by_manufacturer',
+    'grade': 'by_grade',
+}
+
+# Response keys used by the legacy (unfiltered) /autocomplete-options payload
+FACET_RESPONSE_KEYS = {
+    'player_name': 'player_names',
+    'manufacturer': 'manufacturers',
+    'team': 'teams',
+    'grade': 'grades',
+}
+
+
+def facet_values(card):
+    """Returns the (field, value) rollup pairs for a Card or a dict of card fields."""
+    get = card.get if isinstance(card, dict) else (lambda field: getattr(card, field, None))
+    pairs = [(TOTAL_FIELD, TOTAL_VALUE)]
+    for field in ROLLUP_SOURCE_FIELDS:
+        value = get(field)
+        if field == 'card_year':
+            # Seasons are stored both as 'YYYY-YY' and as a plain end year
+            value = format_card_year(value)
+        if value:
+            pairs.append((field, value))
+    return pairs
+
+
+def apply_facet_changes(owner_id, removed=(), added=()):
+    """Adjusts the owner's facet counts for cards leaving and entering the collection.
+
+    An update is reported as the card's old values in `removed` and its new
+    values in `added`; unchanged fields cancel out and touch no rows.
+
+    Args:
+        owner_id (int): Owner of the cards.
+        removed (iterable): Cards (or field dicts) that no longer hold their values.
+        added (iterable): Cards (or field dicts) that now hold their values.
+    """
+    deltas = Counter()
+    for card in removed:
+        for pair in facet_values(card):
+            deltas[pair] -= 1
+    for card in added:
+        for pair in facet_values(card):
+            deltas[pair] += 1
+    deltas = {pair: delta for pair, delta in deltas.items() if delta}
+    if not deltas:
+        return
+
+    # Upsert, so concurrent first writes of the same value add up instead of
+    # colliding on uq_card_facet_owner_field_value
+    insert_stmt = dialect_insert(CardFacet.__table__, db.session)
+    db.session.execute(
+        insert_stmt.on_conflict_do_update(
+            index_elements=['owner_id', 'field', 'value'],
+            set_={'count': CardFacet.__table__.c['count'] + insert_stmt.excluded['count']}),
+        [{'owner_id': owner_id, 'field': field, 'value': value, 'value_key': value.lower(), 'count': delta}
+         for (field, value), delta in deltas.items()]
+    )
+    emptied = [pair for pair, delta in deltas.items() if delta < 0]
+    if emptied:
+        db.session.execute(
+            delete(CardFacet).where(CardFacet.owner_id == owner_id, CardFacet.count <= 0,
+                                    tuple_(CardFacet.field, CardFacet.value).in_(emptied)),
+            execution_options={'synchronize_session': False}
+        )
+
+
+class CollectionOwnerMissing(Exception):
+    """Raised when a card write names an owner whose user row is gone (e.g. a deleted user's token)."""
+
+
+def bump_collection_version(owner_id):
+    """Marks the owner's collection as changed (invalidates its ETags).
+
+    Returns:
+        tuple: (new collection_version, change timestamp).
+
+    Raises:
+        CollectionOwnerMissing: The user no longer exists.
+    """
+    now = datetime.utcnow().replace(microsecond=0)
+    version = db.session.execute(
+        update(User)
+        .where(User.id == owner_id)
+        .values(collection_version=User.collection_version + 1, collection_updated_at=now)
+        .returning(User.collection_version),
+        execution_options={'synchronize_session': False}
+    ).scalar_one_or_none()
+    if version is None:
+        raise CollectionOwnerMissing(f"User {owner_id} does not exist")
+    return version, now
+
+
+def record_card_changes(owner_id, removed=(), added=(), deleted_ids=()):
+    """Single hook for card writes: updates every derived structure for the owner.
+
+    Cards in `added` are stamped with the new change_version/updated_at: Card
+    instances directly, field dicts (which must carry 'id') with one UPDATE.
+
+    Args:
+        owner_id (int): Owner of the cards.
+        removed (iterable): Cards (or field dicts) as they were before the write.
+        added (iterable): Cards (or field dicts) as they are after the write.
+        deleted_ids (iterable): IDs of deleted cards; a tombstone is written for each.
+
+    Returns:
+        int: The collection version the change was recorded under.
+    """
+    added = list(added)
+    apply_facet_changes(owner_id, removed=removed, added=added)
+    version, now = bump_collection_version(owner_id)
+
+    stamped_ids = []
+    for card in added:
+        if isinstance(card, dict):
+            stamped_ids.append(card['id'])
+        else:
+            card.change_version = version
+            card.updated_at = now
+    if stamped_ids:
+        db.session.execute(
+            update(Card).where(Card.id.in_(stamped_ids)).values(change_version=version, updated_at=now),
+            execution_options={'synchronize_session': False}
+        )
+
+    deleted_ids = list(deleted_ids)
+    if deleted_ids:
+        db.session.execute(CardTombstone.__table__.insert(), [
+            {'owner_id': owner_id, 'card_id': card_id, 'change_version': version, 'deleted_at': now}
+            for card_id in deleted_ids
+        ])
+    return version
+
+
+# Within one change_version, deletions sort before upserts (a card ID can be
+# reused by a card created in the transaction that deleted it)
+_DELETE, _UPSERT = 'd', 'u'
+
+
+class SyncCursor:
+    """Position in a collection's change feed: keyset (version, kind, card_id) plus a guard.
+
+    A plain version cursor, "<version>", stands after every change of that
+    version. A page that ends part-way through a version returns
+    "<version>:<kind>:<card_id>:<guard>". guard is the collection version the
+    client's copy is complete up to as far as deletions are concerned: the
+    cursor version for a delta sync, the collection version at the first page
+    of a full sync (whose cards all predate it). While guard is ahead of the
+    keyset, tombstones at or below it are skipped; a guard below the owner's
+    sync floor means purged deletions were missed.
+    """
+
+    def __init__(self, version, kind=_UPSERT, card_id=None, guard=None):
+        self.version = version
+        self.kind = kind
+        self.card_id = card_id
+        self.guard = version if guard is None else guard
+
+    @classmethod
+    def full(cls, collection_version):
+        """Cursor for a client with no cards: every card, then changes after collection_version."""
+        return cls(-1, guard=collection_version)
+
+    @classmethod
+    def parse(cls, value):
+        """Parses a cursor string. Returns None if it is malformed."""
+        parts = value.split(':')
+        try:
+            if len(parts) == 1:
+                cursor = cls(int(parts[0]))
+            elif len(parts) == 4 and parts[1] in (_DELETE, _UPSERT):
+                cursor = cls(int(parts[0]), parts[1], int(parts[2]), int(parts[3]))
+            else:
+                return None
+        except ValueError:
+            return None
+        return cursor if cursor.version >= 0 and cursor.guard >= 0 else None
+
+    def __str__(self):
+        if self.card_id is None:
+            return str(self.version)
+        return f"{self.version}:{self.kind}:{self.card_id}:{self.guard}"
+
+
+def _after(version_column, id_column, version, card_id):
+    # Keyset predicate: rows sorting after (version, card_id), or after all of version
+    if card_id is None:
+        return version_column > version
+    return tuple_(version_column, id_column) > tuple_(version, card_id)
+
+
+def get_card_changes(owner_id, cursor, limit):
+    """Collects up to `limit` card upserts and deletions after `cursor`.
+
+    Changes are ordered by (change_version, kind, card ID), so a page may end
+    part-way through a version; the returned cursor resumes exactly there.
+
+    Args:
+        owner_id (int): Collection owner.
+        cursor (SyncCursor): Position the client has synced to.
+        limit (int): Maximum number of changes to return.
+
+    Returns:
+        tuple: (upserted card dicts, deleted card IDs, next SyncCursor, has_more).
+    """
+    if cursor.kind == _DELETE:
+        upsert_after = Card.change_version >= cursor.version
+        delete_after = _after(CardTombstone.change_version, CardTombstone.card_id, cursor.version, cursor.card_id)
+    else:
+        upsert_after = _after(Card.change_version, Card.id, cursor.version, cursor.card_id)
+        delete_after = CardTombstone.change_version > cursor.version
+    upserts = db.session.execute(
+        select(Card.change_version, Card.id)
+        .where(Card.owner_id == owner_id, upsert_after)
+        .order_by(Card.change_version, Card.id).limit(limit + 1)
+    ).all()
+    if cursor.guard > cursor.version:
+        # Full sync: deletions up to the first page predate every card it returns
+        delete_after = CardTombstone.change_version > cursor.guard
+    deletes = db.session.execute(
+        select(CardTombstone.change_version, CardTombstone.card_id)
+        .where(CardTombstone.owner_id == owner_id, delete_after)
+        .order_by(CardTombstone.change_version, CardTombstone.card_id).limit(limit + 1)
+    ).all()
+    changes = sorted([(version, _UPSERT, card_id) for version, card_id in upserts] +
+                     [(version, _DELETE, card_id) for version, card_id in deletes])
+
+    has_more = len(changes) > limit
+    changes = changes[:limit]
+    if has_more:
+        version, kind, card_id = changes[-1]
+        next_cursor = SyncCursor(version, kind, card_id, max(cursor.guard, version))
+    else:
+        next_cursor = SyncCursor(max([cursor.guard] + [version for version, _, _ in changes]))
+
+    upsert_ids = [card_id for _, kind, card_id in changes if kind == _UPSERT]
+    cards = select_card_rows(Card.id.in_(upsert_ids), order_by=Card.change_version) if upsert_ids else []
+    deleted = [card_id for _, kind, card_id in changes if kind == _DELETE]
+    return cards, deleted, next_cursor, has_more
+
+
+def purge_card_tombstones(before):
+    """Deletes tombstones older than `before` and raises each owner's sync floor.
+
+    Clients holding a cursor below the floor can no longer see those deletions
+    and must do a full resync. Commits its own transaction.
+
+    Returns:
+        int: Number of tombstones removed.
+    """
+    floors = db.session.execute(
+        select(CardTombstone.owner_id, func.max(CardTombstone.change_version))
+        .where(CardTombstone.deleted_at < before)
+        .group_by(CardTombstone.owner_id)
+    ).all()
+    for owner_id, floor in floors:
+        db.session.execute(
+            update(User).where(User.id == owner_id, User.sync_floor_version < floor)
+            .values(sync_floor_version=floor),
+            execution_options={'synchronize_session': False}
+        )
+    removed = db.session.execute(
+        CardTombstone.__table__.delete().where(CardTombstone.deleted_at < before)
+    ).rowcount
+    db.session.commit()
+    return removed
+
+
+def get_collection_version(owner_id):
+    """Returns (collection_version, collection_updated_at) for the owner."""
+    row = db.session.execute(
+        select(User.collection_version, User.collection_updated_at).where(User.id == owner_id)
+    ).first()
+    return (row[0] or 0, row[1]) if row else (0, None)
+
+
+def get_sync_bounds(owner_id):
+    """Returns (collection_version, sync_floor_version) for the owner."""
+    row = db.session.execute(
+        select(User.collection_version, User.sync_floor_version).where(User.id == owner_id)
+    ).first()
+    return (row[0] or 0, row[1] or 0) if row else (0, 0)
+
+
+def get_card_version(card_id):
+    """Returns (owner_id, change_version, updated_at) for a card, or None if it doesn't exist."""
+    return db.session.execute(
+        select(Card.owner_id, Card.change_version, Card.updated_at).where(Card.id == card_id)
+    ).first()
+
+
+def get_facet_options(owner_id):
+    """Returns every facet value for the owner, grouped by field and sorted."""
+    options = {field: [] for field in FACET_FIELDS}
+    rows = db.session.execute(
+        select(CardFacet.field, CardFacet.value)
+        .where(CardFacet.owner_id == owner_id, CardFacet.field.in_(FACET_FIELDS))
+        .order_by(CardFacet.field, CardFacet.value)
+    )
+    for field, value in rows:
+        options[field].append(value)
+    return options
+
+
+def search_facet_values(owner_id, field, prefix='', limit=20):
+    """Returns up to `limit` facet values of one field starting with `prefix`.
+
+    The prefix is matched case-insensitively as a range on value_key, so the
+    lookup is a single index range scan bounded by the result size.
+
+    Returns:
+        list: Dicts with 'value' and 'count', ordered by value.
+    """
+    stmt = select(CardFacet.value, CardFacet.count).where(
+        CardFacet.owner_id == owner_id,
+        CardFacet.field == field
+    )
+    prefix = (prefix or '').lower()
+    if prefix:
+        # "ja" -> ["ja", "jb"): every key with the prefix sorts inside this range
+        upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+        stmt = stmt.where(CardFacet.value_key >= prefix, CardFacet.value_key < upper)
+    stmt = stmt.order_by(CardFacet.value_key).limit(limit)
+    return [{'value': value, 'count': count} for value, count in db.session.execute(stmt)]
+
+
+def rebuild_card_facets(owner_id=None):
+    """Recomputes facet counts from the card table (all owners if owner_id is None).
+
+    Used for backfills and to repair drift; commits its own transaction.
+    """
+    delete_stmt = CardFacet.__table__.delete()
+    if owner_id is not None:
+        delete_stmt = delete_stmt.where(CardFacet.owner_id == owner_id)
+    db.session.execute(delete_stmt)
+
+    for field, counts in compute_rollups(owner_id).items():
+        rows = [
+            {'owner_id': owner, 'field': field, 'value': value, 'value_key': value.lower(), 'count': count}
+            for (owner, value), count in counts.items()
+        ]
+        if rows:
+            db.session.execute(CardFacet.__table__.insert(), rows)
+
+    db.session.commit()
+
+
+def compute_rollups(owner_id=None):
+    """Runs the GROUP BY aggregations behind card_facet directly on the card table.
+
+    Returns:
+        dict: field -> Counter of (owner_id, value) -> card count.
+    """
+    rollups = {}
+    total = select(Card.owner_id, func.count()).group_by(Card.owner_id)
+    if owner_id is not None:
+        total = total.where(Card.owner_id == owner_id)
+    rollups[TOTAL_FIELD] = Counter({(owner, TOTAL_VALUE): count for owner, count in db.session.execute(total)})
+
+    for field in ROLLUP_SOURCE_FIELDS:
+        column = getattr(Card, field)
+        stmt = select(Card.owner_id, column, func.count()).where(column.isnot(None), column != '')
+        if owner_id is not None:
+            stmt = stmt.where(Card.owner_id == owner_id)
+        stmt = stmt.group_by(Card.owner_id, column)
+        counts = Counter()
+        for owner, value, count in db.session.execute(stmt):
+            if field == 'card_year':
+                value = format_card_year(value)
+            counts[(owner, value)] += count
+        rollups[field] = counts
+    return rollups
+
+
+def _stats_payload(owner_id, version, counts_by_field):
+    """Shapes per-field {value: count} maps into the /cards/stats response."""
+    total = counts_by_field.get(TOTAL_FIELD, {}).get(TOTAL_VALUE, 0)
+    stats = {'collection_version': version, 'total_cards': total, 'distinct': {}}
+    for field, key in STAT_FIELDS.items():
+        counts = counts_by_field.get(field, {})
+        groups = [{'value': value, 'count': count}
+                  for value, count in sorted(counts.items(), key=lambda item: (-item[1], item[0]))]
+        unknown = total - sum(counts.values())
+        if unknown > 0:
+            groups.append({'value': None, 'count': unknown})
+        stats[key] = groups
+        stats['distinct'][key[3:] + 's'] = len(counts)
+    stats['distinct']['players'] = len(counts_by_field.get('player_name', {}))
+    return stats
+
+
+def compute_collection_stats(owner_id, version=None):
+    """Collection statistics computed live with GROUP BY over the owner's cards."""
+    counts_by_field = {
+        field: {value: count for (_, value), count in counts.items()}
+        for field, counts in compute_rollups(owner_id).items()
+    }
+    return _stats_payload(owner_id, version, counts_by_field)
+
+
+class CollectionStatsCache:
+    """Per-process LRU of stats payloads keyed by owner and collection version.
+
+    A version bump makes the old entry unreachable, so no explicit invalidation
+    is needed; writes keep the card_facet rollups current for the next rebuild.
+    """
+    def __init__(self, max_size=1024):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, owner_id, version):
+        with self._lock:
+            entry = self._entries.get(owner_id)
+            if entry is None or entry[0] != version:
+                return None
+            self._entries.move_to_end(owner_id)
+            return entry[1]
+
+    def set(self, owner_id, version, stats):
+        with self._lock:
+            self._entries[owner_id] = (version, stats)
+            self._entries.move_to_end(owner_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+
+stats_cache = CollectionStatsCache()
+
+
+def get_collection_stats(owner_id, version):
+    """Collection statistics read from the incrementally maintained rollups.
+
+    Cost is proportional to the number of distinct values, not the number of
+    cards, and the result is memoized per collection version.
+    """
+    stats = stats_cache.get(owner_id, version)
+    if stats is not None:
+        return stats
+
+    counts_by_field = {}
+    rows = db.session.execute(
+        select(CardFacet.field, CardFacet.value, CardFacet.count)
+        .where(CardFacet.owner_id == owner_id,
+               CardFacet.field.in_(list(STAT_FIELDS) + ['player_name', TOTAL_FIELD]))
+    )
+    for field, value, count in rows:
+        counts_by_field.setdefault(field, {})[value] = count
+
+    stats = _stats_payload(owner_id, version, counts_by_field)
+    stats_cache.set(owner_id, version, stats)
+    return stats
@@ -6,6 +6,8 @@ from flask import current_app
 
 # Correct Production Endpoint for searchByImage
 EBAY_API_ENDPOINT_PROD = "https://api.ebay.com/buy/browse/v1/item_summary/search_by_image"
+# Keyword search (no image upload), used when OCR already narrowed the card down
+EBAY_SEARCH_ENDPOINT_PROD = "https://api.ebay.com/buy/browse/v1/item_summary/search"
 # Sandbox not supported for this endpoint
 # EBAY_API_ENDPOINT_SANDBOX = "..."
 
@@ -124,6 +126,46 @@ def find_card_on_ebay(image_path):
         print(f"Unexpected error calling eBay API: {e}")
         return None
 
+def search_ebay_by_keywords(query, limit=2):
+    """Calls the eBay Browse keyword search; a cheaper request than find_card_on_ebay.
+
+    Args:
+        query (str): Search keywords, e.g. "1996-97 Topps Michael Jordan #139".
+        limit (int): Maximum number of items returned.
+
+    Returns:
+        dict or None: Parsed API response data (same itemSummaries shape as
+                      find_card_on_ebay), or None if an error occurs.
+    """
+    print(f"DEBUG: Attempting eBay keyword search: {query}")
+    if not current_app.config.get('EBAY_APP_ID'):
+        print("Error: eBay App ID not configured.")
+        return None
+
+    access_token = get_oauth_token()
+    if not access_token:
+        print("Error: Could not obtain eBay OAuth token.")
+        return None
+
+    headers = {
+        'Authorization': f'Bearer {access_token}',
+        'X-EBAY-C-MARKETPLACE-ID': EBAY_MARKETPLACE_ID
+    }
+    try:
+        response = requests.get(EBAY_SEARCH_ENDPOINT_PROD, headers=headers, params={'q': query, 'limit': limit})
+        response.raise_for_status()
+        api_response_data = response.json()
+        print(f"DEBUG: Received eBay keyword response (first 500 chars): {str(api_response_data)[:500]}")
+        return api_response_data
+    except requests.exceptions.RequestException as e:
+        print(f"Error calling eBay keyword search: {e}")
+        print(f"Response Status: {e.response.status_code if e.response else 'N/A'}")
+        print(f"Response Body: {e.response.text if e.response else 'N/A'}")
+        return None
+    except Exception as e:
+        print(f"Unexpected error calling eBay keyword search: {e}")
+        return None
+
 # Example standalone test (requires Flask app context for config)
 # if __name__ == '__main__':
 #     app = create_app()
@@ -0,0 +1,352 @@
+# backend/app/engine.py
+"""Database engine profiles, read/write session routing and pool metrics.
+
+PostgreSQL: the pool is sized from config (DB_POOL_*), connections are
+pre-pinged and recycled, and every session gets a statement_timeout. An
+optional READ_DATABASE_URL adds a second engine that views decorated with
+@use_read_engine query instead of the primary.
+
+SQLite: every connection gets WAL journaling and the tuning pragmas below, and
+write transactions are serialized through one lock per database file (a thread
+lock plus an fcntl lock shared by all worker processes). Writers queue on the
+lock instead of colliding inside SQLite and failing with "database is locked",
+while WAL lets readers proceed alongside the single writer.
+
+Pools are InstrumentedQueuePool instances so checkout wait times and
+saturation can be served by /metrics/db-pool.
+"""
+import re
+import time
+import threading
+from functools import wraps
+from flask import g, has_app_context
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+from sqlalchemy.sql.dml import UpdateBase
+from sqlalchemy.dialects import postgresql, sqlite
+
+# Bind key of the optional read engine (see SQLALCHEMY_BINDS)
+READ_BIND = 'read'
+# Upper bounds (ms) of the checkout wait histogram buckets
+WAIT_BUCKETS_MS = (1, 5, 10, 50, 100, 500, 1000, 5000)
+
+
+class PoolMetrics:
+    """Thread-safe counters for connection checkouts from one pool."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.buckets = [0] * (len(WAIT_BUCKETS_MS) + 1)
+
+    def record(self, wait, timed_out=False):
+        wait_ms = wait * 1000
+        index = next((i for i, bound in enumerate(WAIT_BUCKETS_MS) if wait_ms <= bound), len(WAIT_BUCKETS_MS))
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+                self.wait_total += wait
+            self.wait_max = max(self.wait_max, wait)
+            self.buckets[index] += 1
+
+    def snapshot(self):
+        with self._lock:
+            labels = [f'le_{bound}ms' for bound in WAIT_BUCKETS_MS] + ['gt_' + str(WAIT_BUCKETS_MS[-1]) + 'ms']
+            return {
+                'checkouts': self.checkouts,
+                'timeouts': self.timeouts,
+                'wait_ms_avg': round(1000 * self.wait_total / self.checkouts, 3) if self.checkouts else 0.0,
+                'wait_ms_max': round(1000 * self.wait_max, 3),
+                'wait_ms_histogram': dict(zip(labels, self.buckets)),
+            }
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that times how long each checkout waits for a connection.
+
+    The wait includes opening a new connection when the pool has spare
+    capacity, and the full pool_timeout when it is saturated.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            self.metrics.record(time.perf_counter() - start, timed_out=True)
+            raise
+        self.metrics.record(time.perf_counter() - start)
+        return connection
+
+
+def pool_metrics(engines):
+    """Returns pool sizing, saturation and checkout wait metrics per engine.
+
+    Args:
+        engines (dict): Bind key -> Engine (db.engines).
+    """
+    metrics = {}
+    for key, engine in engines.items():
+        pool = engine.pool
+        stats = {'pool_class': type(pool).__name__}
+        if isinstance(pool, QueuePool):
+            capacity = pool.size() + max(pool._max_overflow, 0)
+            stats.update({
+                'pool_size': pool.size(),
+                'max_overflow': pool._max_overflow,
+                'checked_out': pool.checkedout(),
+                'idle': pool.checkedin(),
+                'overflow': max(pool.overflow(), 0),
+                'saturation': round(pool.checkedout() / capacity, 3) if capacity > 0 else None,
+            })
+        if isinstance(pool, InstrumentedQueuePool):
+            stats.update(pool.metrics.snapshot())
+        metrics['primary' if key is None else key] = stats
+    return metrics
+
+
+class RoutingSession(Session):
+    """db.session class that sends reads to the read engine inside @use_read_engine views.
+
+    Flushes and INSERT/UPDATE/DELETE statements always go to the primary.
+    """
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if (bind is None and not self._flushing and has_app_context() and g.get('use_read_engine')
+                and not isinstance(clause, UpdateBase)):
+            engine = self._db.engines.get(READ_BIND)
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def use_read_engine(view):
+    """Decorator for read-only views: their queries use the read engine when one is configured.
+
+    Replicas may lag the primary slightly; only use it on views whose clients
+    tolerate that (their ETags come from the same engine, so stay consistent).
+    """
+    @wraps(view)
+    def decorated(*args, **kwargs):
+        g.use_read_engine = True
+        try:
+            return view(*args, **kwargs)
+        finally:
+            g.use_read_engine = False
+    return decorated
+
+
+def dialect_insert(table, session):
+    """INSERT construct for the session's primary dialect, which supports ON CONFLICT clauses.
+
+    Both supported databases (PostgreSQL and SQLite >= 3.24) implement
+    on_conflict_do_nothing()/on_conflict_do_update() with the same arguments.
+    """
+    if session.get_bind().dialect.name == 'postgresql':
+        return postgresql.insert(table)
+    return sqlite.insert(table)
+
+
+def _is_postgresql(url):
+    return make_url(url).get_backend_name() in ('postgresql', 'postgres')
+
+
+def _is_memory_sqlite(url):
+    url = make_url(url)
+    return url.get_backend_name() == 'sqlite' and (not url.database or url.database == ':memory:'
+                                                    or url.database.startswith('file::memory:'))
+
+
+def engine_options(config, url, statement_timeout_ms):
+    """Builds create_engine() keyword arguments for the engine profile of `url`."""
+    if _is_postgresql(url):
+        options = {
+            'poolclass': InstrumentedQueuePool,
+            'pool_size': config.get('DB_POOL_SIZE', 10),
+            'max_overflow': config.get('DB_MAX_OVERFLOW', 20),
+            'pool_timeout': config.get('DB_POOL_TIMEOUT', 30),
+            'pool_recycle': config.get('DB_POOL_RECYCLE', 1800),
+            'pool_pre_ping': config.get('DB_POOL_PRE_PING', True),
+        }
+        if statement_timeout_ms:
+            # Applied by the server to every statement on the connection
+            options['connect_args'] = {'options': f'-c statement_timeout={int(statement_timeout_ms)}'}
+        return options
+    if _is_memory_sqlite(url):
+        return {}
+    # File-backed SQLite already uses a QueuePool; instrument it for /metrics/db-pool
+    return {'poolclass': InstrumentedQueuePool}
+
+
+def configure_engines(app):
+    """Fills SQLALCHEMY_ENGINE_OPTIONS/SQLALCHEMY_BINDS from the DB_* settings.
+
+    Must run before db.init_app(app). Options set explicitly in the config win.
+    """
+    config = app.config
+    url = config.get('SQLALCHEMY_DATABASE_URI')
+    if not url:
+        return
+    options = engine_options(config, url, config.get('DB_STATEMENT_TIMEOUT_MS'))
+    options.update(config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+    config['SQLALCHEMY_ENGINE_OPTIONS'] = options
+
+    read_url = config.get('READ_DATABASE_URL')
+    binds = dict(config.get('SQLALCHEMY_BINDS') or {})
+    if read_url and READ_BIND not in binds:
+        binds[READ_BIND] = dict(engine_options(config, read_url, config.get('DB_READ_STATEMENT_TIMEOUT_MS')),
+                                url=read_url)
+        config['SQLALCHEMY_BINDS'] = binds
+
+# Optional: cross-process locking is POSIX-only; on Windows writes are only
+# serialized within one process.
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Statements that make pysqlite open a write transaction, plus SAVEPOINT and
+# WITH ... INSERT/UPDATE/DELETE, which configure_sqlite_transactions opens one for
+_WRITE_STATEMENT = re.compile(
+    r'^\s*(?:(?:INSERT|UPDATE|DELETE|REPLACE|CREATE|DROP|ALTER|SAVEPOINT)\b'
+    r'|WITH\b.*\b(?:INSERT|UPDATE|DELETE|REPLACE)\b)', re.IGNORECASE | re.DOTALL)
+# Writes pysqlite runs without opening a transaction first
+_UNTRACKED_WRITE = re.compile(r'^\s*(?:SAVEPOINT\b|WITH\b.*\b(?:INSERT|UPDATE|DELETE|REPLACE)\b)',
+                              re.IGNORECASE | re.DOTALL)
+
+
+class SQLiteWriteLock:
+    """One-writer-at-a-time lock for a SQLite database file.
+
+    Acquired before a connection's first write statement (pysqlite only opens
+    the transaction at that point, so the writer always starts from a fresh
+    snapshot) and released when the connection goes back to the pool, i.e.
+    after the commit or rollback.
+
+    A thread holds it through one connection at a time. A second connection
+    writing from the thread that holds it could only wait on itself, so
+    acquire raises RuntimeError at once instead of timing out.
+    """
+    def __init__(self, lock_path, timeout):
+        self.lock_path = lock_path
+        self.timeout = timeout
+        self._thread_lock = threading.Lock()
+        self._owner = None
+        self._file = None
+
+    def acquire(self):
+        if self._owner == threading.get_ident():
+            raise RuntimeError("This thread already holds the SQLite write lock through another connection; "
+                               "commit or roll back that transaction before writing on a second connection")
+        deadline = time.monotonic() + self.timeout
+        if not self._thread_lock.acquire(timeout=self.timeout):
+            raise TimeoutError(f"Timed out after {self.timeout}s waiting for the SQLite write lock")
+        if fcntl is not None and self.lock_path is not None:
+            try:
+                if self._file is None:
+                    self._file = open(self.lock_path, 'a')
+                while True:
+                    try:
+                        fcntl.flock(self._file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                        break
+                    except BlockingIOError:
+                        if time.monotonic() >= deadline:
+                            raise TimeoutError(f"Timed out after {self.timeout}s waiting for the SQLite write lock")
+                        time.sleep(0.002)
+            except BaseException:
+                self._thread_lock.release()
+                raise
+        self._owner = threading.get_ident()
+
+    def release(self):
+        self._owner = None
+        if fcntl is not None and self._file is not None:
+            fcntl.flock(self._file, fcntl.LOCK_UN)
+        self._thread_lock.release()
+
+
+def _sqlite_pragmas(config, in_memory):
+    pragmas = []
+    if config.get('SQLITE_WAL', True) and not in_memory:
+        pragmas.append("PRAGMA journal_mode=WAL")
+    pragmas += [
+        f"PRAGMA synchronous={config.get('SQLITE_SYNCHRONOUS', 'NORMAL')}",
+        f"PRAGMA busy_timeout={int(config.get('SQLITE_BUSY_TIMEOUT_MS', 5000))}",
+        # Negative cache_size is in KiB
+        f"PRAGMA cache_size=-{int(config.get('SQLITE_CACHE_SIZE_KB', 65536))}",
+        f"PRAGMA mmap_size={int(config.get('SQLITE_MMAP_SIZE', 268435456))}",
+    ]
+    return pragmas
+
+
+def configure_sqlite(app, engine):
+    """Applies the SQLite profile (pragmas and write serialization) to an engine."""
+    database = engine.url.database
+    in_memory = not database or database == ':memory:' or database.startswith('file::memory:')
+    pragmas = _sqlite_pragmas(app.config, in_memory)
+
+    @event.listens_for(engine, 'connect')
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
+
+    if not app.config.get('SQLITE_SERIALIZE_WRITES', True):
+        return
+
+    write_lock = SQLiteWriteLock(None if in_memory else database + '.writelock',
+                                 app.config.get('SQLITE_WRITE_LOCK_TIMEOUT', 30))
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def take_write_lock(conn, cursor, statement, parameters, context, executemany):
+        if not conn.info.get('sqlite_write_lock') and _WRITE_STATEMENT.match(statement):
+            write_lock.acquire()
+            conn.info['sqlite_write_lock'] = True
+
+    @event.listens_for(engine, 'checkin')
+    def release_write_lock(dbapi_connection, connection_record):
+        if connection_record.info.pop('sqlite_write_lock', False):
+            write_lock.release()
+
+    # A connection invalidated mid-transaction never reaches checkin
+    @event.listens_for(engine, 'invalidate')
+    def release_write_lock_on_invalidate(dbapi_connection, connection_record, exception):
+        if connection_record.info.pop('sqlite_write_lock', False):
+            write_lock.release()
+
+
+def configure_sqlite_transactions(engine):
+    """Opens a transaction for writes pysqlite would run outside one.
+
+    pysqlite only emits BEGIN before statements starting with INSERT, UPDATE,
+    DELETE or REPLACE. A SAVEPOINT issued first opens the transaction itself,
+    so its RELEASE commits everything so far and session.begin_nested() is
+    not nested; a WITH ... INSERT/UPDATE/DELETE autocommits and cannot be
+    rolled back. Register after configure_sqlite so the write lock is already held.
+    """
+    @event.listens_for(engine, 'before_cursor_execute')
+    def begin_before_untracked_write(conn, cursor, statement, parameters, context, executemany):
+        if not conn.connection.dbapi_connection.in_transaction and _UNTRACKED_WRITE.match(statement):
+            cursor.execute('BEGIN IMMEDIATE')
+
+
+def init_app(app):
+    """Applies the per-connection profile to every engine. Call after db.init_app(app)."""
+    from . import db
+    with app.app_context():
+        for engine in db.engines.values():
+            if engine.dialect.name != 'sqlite':
+                continue
+            if app.config.get('SQLITE_TUNING', True):
+                configure_sqlite(app, engine)
+            configure_sqlite_transactions(engine)
@@ -0,0 +1,137 @@
+# backend/app/http_cache.py
+"""Conditional GET (ETag / Last-Modified) and response compression helpers."""
+import gzip
+import hashlib
+from flask import request, current_app
+from .serializers import wants_msgpack
+
+# Optional: brotli is preferred over gzip when the client accepts it
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = {'application/json', 'application/msgpack', 'text/html', 'text/plain'}
+
+
+def make_etag(*parts):
+    """Builds a strong ETag value from version components and the request's query/Accept.
+
+    The query string and negotiated representation are folded in so that
+    /cards?x=1 and /cards, or JSON and MessagePack, never share a validator.
+    The representation comes from wants_msgpack, which make_card_response uses.
+    """
+    representation = 'application/msgpack' if wants_msgpack() else 'application/json'
+    variant = f"{request.query_string.decode('utf-8', 'replace')}|{representation}"
+    suffix = hashlib.blake2b(variant.encode('utf-8'), digest_size=6).hexdigest()
+    return '-'.join(str(part) for part in parts) + '-' + suffix
+
+
+def encoded_etag(etag, encoding):
+    """The ETag of a response body sent with the given Content-Encoding (or None)."""
+    return f'{etag}-{encoding}' if encoding else etag
+
+
+def _matching_etag(etag):
+    # Compressed responses carry "<etag>-gzip"/"<etag>-br"; they validate the same resource
+    if_none_match = request.if_none_match
+    if not if_none_match:
+        return None
+    if if_none_match.star_tag:
+        return etag
+    for encoding in (None, 'gzip', 'br'):
+        candidate = encoded_etag(etag, encoding)
+        if if_none_match.contains(candidate):
+            return candidate
+    return None
+
+
+def not_modified_etag(etag, last_modified=None):
+    """The validator to send with a 304, or None if the client's copy is stale.
+
+    A 304 repeats the ETag the client matched, so a copy cached from a gzip or
+    brotli response keeps the encoding suffix it was stored under.
+    """
+    if request.if_none_match:
+        # If-None-Match takes precedence over If-Modified-Since (RFC 9110 13.2.2)
+        return _matching_etag(etag)
+    if last_modified and request.if_modified_since:
+        return etag if last_modified <= request.if_modified_since.replace(tzinfo=None) else None
+    return None
+
+
+def set_cache_validators(response, etag, last_modified=None):
+    """Adds ETag/Last-Modified and makes clients revalidate on every use."""
+    response.set_etag(etag)
+    if last_modified:
+        response.last_modified = last_modified
+    response.headers['Cache-Control'] = 'private, no-cache'
+    response.vary.add('Authorization')
+    response.vary.add('Accept')
+    return response
+
+
+def conditional_response(etag, last_modified, build_response):
+    """Returns 304 when the client's copy is current, otherwise builds the full response.
+
+    Args:
+        etag (str): Strong validator for the current version (see make_etag).
+        last_modified (datetime): Naive UTC modification time, or None.
+        build_response (callable): Produces the full response (any view return value);
+                                   only called on a miss.
+    """
+    matched_etag = not_modified_etag(etag, last_modified)
+    if matched_etag is not None:
+        response = current_app.response_class(status=304)
+        if current_app.config.get('COMPRESS_RESPONSES'):
+            response.vary.add('Accept-Encoding')
+        return set_cache_validators(response, matched_etag, last_modified)
+    response = current_app.make_response(build_response())
+    if response.status_code != 200:
+        # Errors must not be cached under the resource's validators
+        return response
+    return set_cache_validators(response, etag, last_modified)
+
+
+def _choose_encoding():
+    accepted = request.accept_encodings
+    if brotli is not None and accepted['br']:
+        return 'br'
+    if accepted['gzip']:
+        return 'gzip'
+    return None
+
+
+def compress_response(response):
+    """after_request hook: gzip/brotli-encode sizeable responses the client accepts."""
+    if (response.status_code != 200 or response.direct_passthrough
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+        return response
+
+    response.vary.add('Accept-Encoding')
+    body = response.get_data()
+    if len(body) < current_app.config['COMPRESS_MIN_SIZE']:
+        return response
+
+    encoding = _choose_encoding()
+    if encoding == 'br':
+        body = brotli.compress(body, quality=current_app.config['COMPRESS_BROTLI_QUALITY'])
+    elif encoding == 'gzip':
+        body = gzip.compress(body, compresslevel=current_app.config['COMPRESS_LEVEL'])
+    else:
+        return response
+
+    response.set_data(body)
+    response.headers['Content-Encoding'] = encoding
+    # A strong ETag must differ between encodings of the same resource
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(encoded_etag(etag, encoding))
+    return response
+
+
+def init_app(app):
+    """Registers response compression on the app."""
+    if app.config.get('COMPRESS_RESPONSES'):
+        app.after_request(compress_response)
@@ -0,0 +1,358 @@
+# backend/app/image_mirror.py
+"""Local copies of the remote card images (eBay listing photos) behind Card.image_url.
+
+Cards keep the eBay image URL they were mapped from. Hotlinking it is slow
+and the photo disappears with the listing, so when a card is saved its image
+is fetched in the background into IMAGE_MIRROR_FOLDER and payloads carry a
+stable image_mirror_url (/mirror/<key>, key = hash of the source URL). The
+URL's MirroredImage row is registered in the same transaction as the card
+(register_card_images), and payloads only carry image_mirror_url for images
+that have a row. Until the copy is on disk, or after it was evicted, that URL
+redirects to the source and queues a fetch.
+
+Fetches run on IMAGE_MIRROR_CONCURRENCY threads, since they wait on the
+network rather than the CPU, and only for hosts in IMAGE_MIRROR_HOSTS:
+image_url is user-editable, so anything else would let a client make the
+server fetch arbitrary URLs.
+
+The folder is kept under IMAGE_MIRROR_MAX_MB as a disk LRU. Serving a file
+touches its mtime; when a download takes the folder over budget, the least
+recently served files are deleted until it is back to
+IMAGE_MIRROR_EVICT_TO of the budget. Web processes share the folder, so each
+rescans it before evicting instead of trusting its own running total.
+"""
+import os
+import atexit
+import hashlib
+import threading
+from datetime import datetime
+from functools import lru_cache
+from urllib.parse import urlsplit
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from sqlalchemy import select
+from flask import current_app, has_app_context
+from . import db
+from .models import Card, MirroredImage
+from .engine import dialect_insert
+
+MIRROR_KEY_BYTES = 16
+MIRROR_LOOKUP_CHUNK = 500 # Keys per IN (...) when checking which card images are registered
+# Fraction of the budget left after an eviction pass, so every download does not trigger one
+IMAGE_MIRROR_EVICT_TO = 0.9
+# Content types stored, and the extension their files get
+MIRROR_CONTENT_TYPES = {'image/jpeg': 'jpg', 'image/png': 'png', 'image/webp': 'webp', 'image/gif': 'gif'}
+
+
+class MirrorFetchError(Exception):
+    """Raised when a source image cannot be mirrored (HTTP error, wrong type, too large)."""
+
+
+@lru_cache(maxsize=65536)
+def _mirror_key(url, hosts):
+    try:
+        parts = urlsplit(url)
+    except ValueError:
+        return None
+    hostname = (parts.hostname or '').lower()
+    if parts.scheme not in ('http', 'https') or not any(
+            hostname == host or hostname.endswith('.' + host) for host in hosts):
+        return None
+    return hashlib.blake2b(url.encode('utf-8'), digest_size=MIRROR_KEY_BYTES).hexdigest()
+
+
+def mirror_key(url, config=None):
+    """Mirror key of an image URL, or None if mirroring is off or the host is not allowed."""
+    if not url:
+        return None
+    if config is None:
+        if not has_app_context():
+            return None
+        config = current_app.config
+    if not config.get('IMAGE_MIRROR'):
+        return None
+    return _mirror_key(url, tuple(config['IMAGE_MIRROR_HOSTS']))
+
+
+def registered_mirror_paths(urls):
+    """API paths of the local copies of image URLs that have a MirroredImage row.
+
+    Unregistered images get no path, since /mirror/<key> would 404 for them.
+    Rows are looked up by key, in chunks of MIRROR_LOOKUP_CHUNK.
+
+    Returns:
+        dict: URL -> '/mirror/<key>'; empty when mirroring is off.
+    """
+    if not has_app_context() or not current_app.config.get('IMAGE_MIRROR'):
+        return {}
+    keys = {}
+    for url in urls:
+        if url and url not in keys:
+            keys[url] = mirror_key(url)
+    wanted = list({key for key in keys.values() if key})
+    registered = set()
+    for start in range(0, len(wanted), MIRROR_LOOKUP_CHUNK):
+        registered.update(db.session.scalars(
+            select(MirroredImage.key).where(MirroredImage.key.in_(wanted[start:start + MIRROR_LOOKUP_CHUNK]))))
+    return {url: f"/mirror/{key}" for url, key in keys.items() if key in registered}
+
+
+def mirror_relpath(key, content_type):
+    """Path of a mirrored file below IMAGE_MIRROR_FOLDER, fanned out by the key's first byte."""
+    return f"{key[:2]}/{key}.{MIRROR_CONTENT_TYPES[content_type]}"
+
+
+class ImageMirror:
+    """Background downloader and size-bounded store for mirrored images.
+
+    Args:
+        app: Flask app; fetch threads run in its app context.
+        folder (str): IMAGE_MIRROR_FOLDER.
+        concurrency (int): Simultaneous downloads.
+        max_bytes (int): Storage budget for the folder.
+        max_image_bytes (int): Largest source image accepted.
+        timeout (float): Connect/read timeout per request, in seconds.
+    """
+    def __init__(self, app, folder, concurrency=4, max_bytes=512 * 2 ** 20, max_image_bytes=5 * 2 ** 20,
+                 timeout=10.0):
+        self.app = app
+        self.folder = folder
+        self.concurrency = concurrency
+        self.max_bytes = max_bytes
+        self.max_image_bytes = max_image_bytes
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='image-mirror')
+        self._session = requests.Session()
+        self._lock = threading.Lock()
+        self._in_flight = set()
+        self._stored_bytes = None # Running total, rescanned before each eviction
+        self.fetched = 0
+        self.failed = 0
+        self.evicted = 0
+
+    def enqueue(self, key, url):
+        """Queues a download unless one for the key is already queued or running.
+
+        Returns:
+            Future: The download, or None if it was already in flight.
+        """
+        with self._lock:
+            if key in self._in_flight:
+                return None
+            self._in_flight.add(key)
+        return self._executor.submit(self._fetch_in_app_context, key, url)
+
+    def _fetch_in_app_context(self, key, url):
+        try:
+            with self.app.app_context():
+                return self.fetch(key, url)
+        finally:
+            with self._lock:
+                self._in_flight.discard(key)
+
+    def fetch(self, key, url):
+        """Downloads one image and records the outcome on its MirroredImage row.
+
+        The body is streamed to a temporary file and renamed into place, so a
+        concurrent request never serves a partial image.
+
+        Returns:
+            bool: True if the image is now stored.
+        """
+        image = MirroredImage.query.filter_by(key=key).first()
+        if image is None:
+            return False
+        temp_path = None
+        try:
+            with self._session.get(url, stream=True, timeout=self.timeout) as response:
+                response.raise_for_status()
+                content_type = response.headers.get('Content-Type', '').split(';')[0].strip().lower()
+                if content_type not in MIRROR_CONTENT_TYPES:
+                    raise MirrorFetchError(f"unsupported content type {content_type or 'none'}")
+                path = os.path.join(self.folder, mirror_relpath(key, content_type))
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                size = 0
+                with open(temp_path, 'wb') as f:
+                    for chunk in response.iter_content(chunk_size=1 << 16):
+                        size += len(chunk)
+                        if size > self.max_image_bytes:
+                            raise MirrorFetchError(f"larger than {self.max_image_bytes} bytes")
+                        f.write(chunk)
+            os.replace(temp_path, path)
+            temp_path = None
+        except (requests.exceptions.RequestException, MirrorFetchError, OSError) as e:
+            if temp_path and os.path.exists(temp_path):
+                os.remove(temp_path)
+            image.status = 'failed'
+            image.failures += 1
+            image.last_error = str(e)[:200]
+            db.session.commit()
+            self.failed += 1
+            print(f"Image mirror: could not fetch {url}: {e}")
+            return False
+
+        image.status = 'stored'
+        image.content_type = content_type
+        image.size = size
+        image.failures = 0
+        image.last_error = None
+        image.fetched_at = datetime.utcnow()
+        db.session.commit()
+        self.fetched += 1
+        self._account(size)
+        return True
+
+    def touch(self, path):
+        """Marks a file as just served, moving it to the young end of the LRU."""
+        try:
+            os.utime(path)
+        except OSError:
+            pass # Evicted between the existence check and now
+
+    def _scan(self):
+        entries = []
+        for dirpath, _, filenames in os.walk(self.folder):
+            for filename in filenames:
+                if filename.endswith('.tmp'):
+                    continue
+                path = os.path.join(dirpath, filename)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def _account(self, size):
+        with self._lock:
+            if self._stored_bytes is None:
+                self._stored_bytes = sum(entry[1] for entry in self._scan())
+            else:
+                self._stored_bytes += size
+            if self._stored_bytes > self.max_bytes:
+                self._stored_bytes = self._evict()
+
+    def _evict(self):
+        """Deletes least recently served files down to IMAGE_MIRROR_EVICT_TO of the budget.
+
+        Returns:
+            int: Bytes stored afterwards.
+        """
+        entries = sorted(self._scan())
+        total = sum(entry[1] for entry in entries)
+        target = self.max_bytes * IMAGE_MIRROR_EVICT_TO
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            self.evicted += 1
+        return total
+
+    def stats(self):
+        with self._lock:
+            in_flight = len(self._in_flight)
+            stored_bytes = self._stored_bytes
+        return {
+            'concurrency': self.concurrency,
+            'in_flight': in_flight,
+            'stored_bytes': stored_bytes,
+            'max_bytes': self.max_bytes,
+            'fetched': self.fetched,
+            'failed': self.failed,
+            'evicted': self.evicted,
+        }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+_mirror = None
+_mirror_lock = threading.Lock()
+
+
+def get_image_mirror():
+    """The process-wide ImageMirror, created from the app config on first use."""
+    global _mirror
+    with _mirror_lock:
+        if _mirror is None:
+            config = current_app.config
+            _mirror = ImageMirror(
+                current_app._get_current_object(),
+                config['IMAGE_MIRROR_FOLDER'],
+                concurrency=config['IMAGE_MIRROR_CONCURRENCY'],
+                max_bytes=config['IMAGE_MIRROR_MAX_MB'] * 2 ** 20,
+                max_image_bytes=config['IMAGE_MIRROR_MAX_IMAGE_MB'] * 2 ** 20,
+                timeout=config['IMAGE_MIRROR_TIMEOUT'],
+            )
+            atexit.register(_mirror.shutdown)
+        return _mirror
+
+
+def register_mirror_images(urls):
+    """Adds a pending MirroredImage row for each mirrorable URL that has none. Does not commit.
+
+    Returns:
+        dict: key -> source URL for the rows added.
+    """
+    wanted = {}
+    for url in urls:
+        key = mirror_key(url)
+        if key:
+            wanted[key] = url
+    if not wanted:
+        return {}
+    existing = set(db.session.scalars(select(MirroredImage.key).where(MirroredImage.key.in_(wanted))))
+    rows = [{'key': key, 'source_url': url, 'status': 'pending', 'failures': 0}
+            for key, url in wanted.items() if key not in existing]
+    if not rows:
+        return {}
+    # ON CONFLICT rather than savepoints: pysqlite's RELEASE would commit the caller's transaction.
+    # Keys a concurrent request registered first are not returned.
+    insert_stmt = dialect_insert(MirroredImage.__table__, db.session)
+    added = db.session.scalars(insert_stmt.values(rows).on_conflict_do_nothing(index_elements=['key'])
+                               .returning(MirroredImage.__table__.c.key))
+    return {key: wanted[key] for key in added}
+
+
+def register_card_images(urls):
+    """Registers the image URLs of cards being saved, in the caller's transaction. Does not commit.
+
+    Registering with the card means its image_mirror_url appears in the same
+    change as the card itself, so cached payloads (ETags) stay correct.
+
+    Returns:
+        dict: key -> source URL of the rows added; pass it to queue_mirror_downloads after the commit.
+    """
+    if not current_app.config.get('IMAGE_MIRROR'):
+        return {}
+    return register_mirror_images(urls)
+
+
+def queue_mirror_downloads(added):
+    """Queues the downloads of images registered by register_card_images. Call after the commit."""
+    if added:
+        mirror = get_image_mirror()
+        for key, url in added.items():
+            mirror.enqueue(key, url)
+
+
+def register_card_mirror_images(after_id, limit):
+    """Registers the image URLs of one keyset page of cards (migration job).
+
+    Existing cards are only registered; each image is fetched the first time
+    its /mirror URL is requested. Does not commit.
+
+    Returns:
+        tuple: (last card ID scanned or None when no cards remain, cards scanned, images registered).
+    """
+    rows = db.session.execute(select(Card.id, Card.image_url).where(Card.id > after_id)
+                              .order_by(Card.id).limit(limit)).all()
+    if not rows:
+        return None, 0, 0
+    added = register_mirror_images(row.image_url for row in rows)
+    return rows[-1].id, len(rows), len(added)
@@ -0,0 +1,228 @@
+# backend/app/image_pool.py
+"""Bounded process pool for CPU-bound OpenCV work (binder splitting, crop triage).
+
+Image work runs in separate processes so it never holds the GIL of the
+request threads. Each worker pins OpenCV to IMAGE_WORKER_CV_THREADS threads,
+so IMAGE_WORKERS processes use about IMAGE_WORKERS x that many cores instead
+of every process spinning up a thread per core.
+
+Submissions beyond IMAGE_QUEUE_SIZE (running + waiting tasks) block for up to
+IMAGE_SUBMIT_TIMEOUT seconds and then raise ImagePoolBusy, which views turn
+into a 503 so load sheds at the door instead of piling up behind the pool.
+A worker that dies (e.g. OOM-killed on a huge page) breaks its executor; the
+pool then starts a fresh one and run() reports the lost task as ImagePoolBusy.
+A task still running after IMAGE_TASK_TIMEOUT seconds is treated the same way:
+its executor's workers are terminated and the request gets ImagePoolBusy.
+
+Tasks normally take file paths and decode in the worker. Callers that already
+hold a decoded frame use submit_frame(), which hands it over through shared
+memory instead of pickling the pixels.
+"""
+import atexit
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, Future, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+import numpy as np
+from flask import current_app
+
+
+class ImagePoolBusy(Exception):
+    """Raised when the image queue stays full for longer than the submit timeout."""
+
+
+def _init_worker(cv_threads):
+    import cv2
+    cv2.setNumThreads(cv_threads)
+
+
+def _run_on_shared_frame(fn, name, shape, dtype, args, kwargs):
+    # fn must not return views of the frame: the block is closed afterwards
+    block = shared_memory.SharedMemory(name=name)
+    try:
+        frame = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+        try:
+            return fn(frame, *args, **kwargs)
+        finally:
+            del frame
+    finally:
+        block.close()
+
+
+class ImageWorkerPool:
+    """Process pool with a bounded queue for image tasks.
+
+    Args:
+        workers (int): Worker processes; 0 runs tasks inline in the caller.
+        cv_threads (int): cv2.setNumThreads value for each worker.
+        queue_size (int): Maximum running + waiting tasks (default 2 x workers).
+        submit_timeout (float): Seconds a submit waits for a free slot.
+        task_timeout (float): Seconds run() waits for a result; None or 0 waits forever.
+                              Inline tasks (workers=0) cannot be timed out.
+    """
+    def __init__(self, workers, cv_threads=1, queue_size=None, submit_timeout=5.0, task_timeout=None):
+        self.workers = workers
+        self.cv_threads = cv_threads
+        self.queue_size = queue_size or max(1, 2 * workers)
+        self.submit_timeout = submit_timeout
+        self.task_timeout = task_timeout or None
+        self._slots = threading.BoundedSemaphore(self.queue_size)
+        self._executor = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self.rejected = 0
+        self.timed_out = 0
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                # forkserver: workers start from a clean process, never a fork of a
+                # threaded server (spawn where fork servers are unavailable)
+                method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context(method),
+                    initializer=_init_worker, initargs=(self.cv_threads,))
+            return self._executor
+
+    def _discard_executor(self, executor, reason="a worker process died", terminate=False):
+        """Drops a broken executor so the next submit starts a new one.
+
+        terminate also kills its worker processes, for a task that is stuck
+        rather than dead; its futures then fail with BrokenProcessPool and
+        release their queue slots.
+        """
+        with self._lock:
+            if self._executor is not executor:
+                return # Already replaced
+            self._executor = None
+        print(f"Image pool: {reason}; restarting the pool")
+        if terminate:
+            # ProcessPoolExecutor has no public way to stop a running task
+            for process in list((getattr(executor, '_processes', None) or {}).values()):
+                process.terminate()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _check_broken(self, executor, future):
+        if not future.cancelled() and isinstance(future.exception(), BrokenProcessPool):
+            self._discard_executor(executor)
+
+    def _release(self, _future):
+        with self._lock:
+            self._in_flight -= 1
+        self._slots.release()
+
+    def submit(self, fn, *args, **kwargs):
+        """Queues fn(*args, **kwargs) on a worker and returns its Future.
+
+        fn and its arguments must be picklable (module-level functions).
+
+        Raises:
+            ImagePoolBusy: The queue stayed full for submit_timeout seconds.
+        """
+        return self._submit(fn, *args, **kwargs)[0]
+
+    def _submit(self, fn, *args, **kwargs):
+        # Returns (future, executor running it); executor is None for inline tasks
+        if self.workers <= 0:
+            future = Future()
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except Exception as e:
+                future.set_exception(e)
+            return future, None
+
+        if not self._slots.acquire(timeout=self.submit_timeout):
+            with self._lock:
+                self.rejected += 1
+            raise ImagePoolBusy(f"Image queue full ({self.queue_size} tasks)")
+        try:
+            executor = self._get_executor()
+            try:
+                future = executor.submit(fn, *args, **kwargs)
+            except BrokenProcessPool:
+                # Broke since the last task finished: retry once on a fresh executor
+                self._discard_executor(executor)
+                executor = self._get_executor()
+                future = executor.submit(fn, *args, **kwargs)
+        except BaseException:
+            self._slots.release()
+            raise
+        with self._lock:
+            self._in_flight += 1
+        future.add_done_callback(self._release)
+        future.add_done_callback(lambda done: self._check_broken(executor, done))
+        return future, executor
+
+    def submit_frame(self, fn, frame, *args, **kwargs):
+        """Like submit(fn, frame, ...), but passes the frame through shared memory.
+
+        The pixels are copied once into a shared block that the worker maps
+        directly; the block is released when the task finishes.
+        """
+        if self.workers <= 0:
+            return self.submit(fn, frame, *args, **kwargs)
+        block = shared_memory.SharedMemory(create=True, size=max(1, frame.nbytes))
+        try:
+            np.ndarray(frame.shape, dtype=frame.dtype, buffer=block.buf)[...] = frame
+            future = self.submit(_run_on_shared_frame, fn, block.name, frame.shape, frame.dtype.str, args, kwargs)
+        except BaseException:
+            block.close()
+            block.unlink()
+            raise
+
+        def release_block(_future):
+            block.close()
+            block.unlink()
+        future.add_done_callback(release_block)
+        return future
+
+    def run(self, fn, *args, **kwargs):
+        """Runs fn on a worker and waits for its result.
+
+        Raises:
+            ImagePoolBusy: The queue was full, the worker running the task died,
+                           or the task ran longer than task_timeout.
+        """
+        future, executor = self._submit(fn, *args, **kwargs)
+        try:
+            return future.result(timeout=self.task_timeout)
+        except BrokenProcessPool as e:
+            raise ImagePoolBusy("Image worker died while processing the task") from e
+        except FutureTimeoutError as e:
+            with self._lock:
+                self.timed_out += 1
+            self._discard_executor(executor, f"a task ran longer than {self.task_timeout}s", terminate=True)
+            raise ImagePoolBusy(f"Image task timed out after {self.task_timeout}s") from e
+
+    def stats(self):
+        with self._lock:
+            return {'workers': self.workers, 'cv_threads': self.cv_threads, 'queue_size': self.queue_size,
+                    'in_flight': self._in_flight, 'rejected': self.rejected, 'timed_out': self.timed_out}
+
+    def shutdown(self, wait=True):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_image_pool():
+    """Returns this process's image pool, created from the app config on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            config = current_app.config
+            workers = config.get('IMAGE_WORKERS')
+            _pool = ImageWorkerPool(
+                workers=2 if workers is None else workers,
+                cv_threads=config.get('IMAGE_WORKER_CV_THREADS', 1),
+                queue_size=config.get('IMAGE_QUEUE_SIZE') or None,
+                submit_timeout=config.get('IMAGE_SUBMIT_TIMEOUT', 5.0),
+                task_timeout=config.get('IMAGE_TASK_TIMEOUT'))
+            atexit.register(_pool.shutdown, wait=False)
+        return _pool
@@ -1,7 +1,10 @@
 import cv2
 import numpy as np
 import os
+import sys
 from flask import current_app
+from .image_hash import image_phash
+from .thumbnails import make_thumbnails
 
 # Default Constants (can be overridden by parameters)
 DEFAULT_BLUR_KERNEL = (5, 5)
@@ -13,6 +16,261 @@ DEFAULT_CARD_ASPECT_RATIO_MIN = 0.6
 DEFAULT_CARD_ASPECT_RATIO_MAX = 0.85
 DEFAULT_APPROX_POLY_EPSILON = 0.02
 DEFAULT_ROW_TOLERANCE_RATIO = 0.1 # Ratio of image height
+DEFAULT_DETECT_MAX_SIDE = 1280 # Longest side (px) of the copy used for contour detection
+EDGE_CLOSE_KERNEL = np.ones((3, 3), np.uint8)
+
+# Decode reductions OpenCV supports natively (JPEG is decoded straight at the reduced size)
+REDUCED_COLOR_FLAGS = {2: cv2.IMREAD_REDUCED_COLOR_2, 4: cv2.IMREAD_REDUCED_COLOR_4, 8: cv2.IMREAD_REDUCED_COLOR_8}
+REDUCED_GRAYSCALE_FLAGS = {2: cv2.IMREAD_REDUCED_GRAYSCALE_2, 4: cv2.IMREAD_REDUCED_GRAYSCALE_4,
+                           8: cv2.IMREAD_REDUCED_GRAYSCALE_8}
+# JPEG start-of-frame markers (carry the dimensions); C4, C8 and CC are other segments
+JPEG_SOF_MARKERS = set(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+
+def _jpeg_size(f):
+    f.seek(2)
+    while True:
+        marker = f.read(2)
+        if len(marker) < 2 or marker[0] != 0xFF:
+            return None
+        if marker[1] == 0xFF: # Fill byte before a marker
+            f.seek(-1, os.SEEK_CUR)
+            continue
+        if marker[1] in (0x01, 0xD8) or 0xD0 <= marker[1] <= 0xD7: # Markers without a length
+            continue
+        length = int.from_bytes(f.read(2), 'big')
+        if marker[1] in JPEG_SOF_MARKERS:
+            header = f.read(5)
+            if len(header) < 5:
+                return None
+            return int.from_bytes(header[3:5], 'big'), int.from_bytes(header[1:3], 'big')
+        if length < 2:
+            return None
+        f.seek(length - 2, os.SEEK_CUR)
+
+
+def read_image_size(image_path):
+    """Reads (width, height) from a PNG, JPEG or WebP header without decoding any pixels.
+
+    Returns:
+        tuple: (width, height), or None if the format is not recognised.
+    """
+    with open(image_path, 'rb') as f:
+        head = f.read(30)
+        if head[:8] == b'\x89PNG\r\n\x1a\n' and head[12:16] == b'IHDR':
+            return int.from_bytes(head[16:20], 'big'), int.from_bytes(head[20:24], 'big')
+        if head[:2] == b'\xff\xd8':
+            return _jpeg_size(f)
+        if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+            chunk = head[12:16]
+            if chunk == b'VP8 ' and head[23:26] == b'\x9d\x01\x2a':
+                return (int.from_bytes(head[26:28], 'little') & 0x3FFF,
+                        int.from_bytes(head[28:30], 'little') & 0x3FFF)
+            if chunk == b'VP8L' and head[20] == 0x2F:
+                bits = int.from_bytes(head[21:25], 'little')
+                return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+            if chunk == b'VP8X':
+                return int.from_bytes(head[24:27], 'little') + 1, int.from_bytes(head[27:30], 'little') + 1
+    return None
+
+
+def check_image_dimensions(image_path, max_pixels):
+    """Rejects decompression bombs before any decode, from the header alone.
+
+    Returns:
+        str: An error message, or None if the image may be decoded.
+    """
+    size = read_image_size(image_path)
+    if size is None:
+        return "Unrecognised or corrupt image header"
+    width, height = size
+    if width <= 0 or height <= 0:
+        return "Image has no pixels"
+    if width * height > max_pixels:
+        return f"Image is {width}x{height} ({width * height / 1e6:.0f} MP); the limit is {max_pixels / 1e6:.0f} MP"
+    return None
+
+
+def load_image(image_path, max_side=0, grayscale=False):
+    """Decodes an image at the coarsest 1/2, 1/4 or 1/8 scale that keeps its longest side >= max_side.
+
+    For JPEG the reduced decode never materialises the full-resolution frame;
+    other formats are decoded and then shrunk by OpenCV. A max_side of 0/None
+    (or an unreadable header) decodes at full resolution.
+
+    Returns:
+        numpy.ndarray: The image (BGR, or grayscale), or None if it cannot be read.
+    """
+    factor = 1
+    size = read_image_size(image_path) if max_side else None
+    if size:
+        while factor < 8 and max(size) // (factor * 2) >= max_side:
+            factor *= 2
+    if factor == 1:
+        return cv2.imread(image_path, cv2.IMREAD_GRAYSCALE if grayscale else cv2.IMREAD_COLOR)
+    return cv2.imread(image_path, (REDUCED_GRAYSCALE_FLAGS if grayscale else REDUCED_COLOR_FLAGS)[factor])
+
+
+def peak_rss_mb(reset=False):
+    """Peak resident memory of this process in MB (VmHWM; ru_maxrss where /proc is missing).
+
+    Args:
+        reset (bool): Reset the peak to the current RSS first (Linux only), so a
+                      later call reports the peak of the work in between.
+
+    Returns:
+        float: Peak RSS in MB, or None where neither source exists (Windows).
+    """
+    try:
+        if reset:
+            with open('/proc/self/clear_refs', 'w') as f:
+                f.write('5')
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (2 ** 20 if sys.platform == 'darwin' else 1024) # bytes on macOS, KB elsewhere
+
+
+def _detection_image(gray, max_side):
+    """Returns (image, scale): gray shrunk by the smallest integer factor that fits max_side.
+
+    An integer factor lets INTER_AREA average whole pixel blocks on its fast
+    path (like a pyramid level). A max_side of 0/None keeps full resolution.
+    """
+    img_height, img_width = gray.shape[:2]
+    factor = -(-max(img_height, img_width) // max_side) if max_side else 1
+    if factor <= 1:
+        return gray, 1.0
+    size = (max(1, img_width // factor), max(1, img_height // factor))
+    # Trim the < factor leftover pixels so the factor is exact (keeps the fast path)
+    gray = gray[:size[1] * factor, :size[0] * factor]
+    return cv2.resize(gray, size, interpolation=cv2.INTER_AREA), 1.0 / factor
+
+
+def _contour_geometry(contours):
+    """Area, perimeter and bounding box of every contour in a few numpy passes.
+
+    Equivalent to calling cv2.contourArea / cv2.arcLength(closed) /
+    cv2.boundingRect on each contour, without a Python loop per contour.
+
+    Returns:
+        tuple: (areas, perimeters, boxes) arrays; boxes rows are (x, y, w, h).
+    """
+    lengths = np.fromiter((len(c) for c in contours), dtype=np.intp, count=len(contours))
+    starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    points = np.concatenate(contours).reshape(-1, 2)
+    # Index of each point's successor, wrapping around within its own contour
+    following = np.arange(1, len(points) + 1)
+    following[starts + lengths - 1] = starts
+    x, y = points[:, 0].astype(np.float64), points[:, 1].astype(np.float64)
+    x_next, y_next = x[following], y[following]
+
+    areas = np.abs(np.add.reduceat(x * y_next - x_next * y, starts)) / 2
+    perimeters = np.add.reduceat(np.hypot(x_next - x, y_next - y), starts)
+    mins = np.minimum.reduceat(points, starts)
+    maxs = np.maximum.reduceat(points, starts)
+    boxes = np.hstack((mins, maxs - mins + 1))
+    return areas, perimeters, boxes
+
+
+def find_card_boxes(img,
+                    blur_kernel=DEFAULT_BLUR_KERNEL,
+                    canny_low=DEFAULT_CANNY_LOW, canny_high=DEFAULT_CANNY_HIGH,
+                    min_area_ratio=DEFAULT_MIN_CARD_AREA_RATIO, max_area_ratio=DEFAULT_MAX_CARD_AREA_RATIO,
+                    aspect_min=DEFAULT_CARD_ASPECT_RATIO_MIN, aspect_max=DEFAULT_CARD_ASPECT_RATIO_MAX,
+                    poly_epsilon=DEFAULT_APPROX_POLY_EPSILON,
+                    row_tolerance_ratio=DEFAULT_ROW_TOLERANCE_RATIO,
+                    detect_max_side=DEFAULT_DETECT_MAX_SIDE,
+                    debug_image_path=None):
+    """Finds card-shaped contours on a binder page and returns their full-resolution boxes.
+
+    Contours are detected on a copy downscaled to detect_max_side and mapped
+    back to the original pixel grid. All ratio parameters are relative to the
+    image, so they do not depend on the detection scale.
+
+    Args:
+        img (numpy.ndarray): BGR binder page image.
+        detect_max_side (int): Longest side, in pixels, of the image used for
+                               detection. 0 or None detects at full resolution.
+        debug_image_path (str): If set, saves the detection image with the
+                                accepted contours drawn to this path.
+        (other args: see split_binder_page)
+
+    Returns:
+        list: Up to 9 (x_start, y_start, x_end, y_end) boxes in reading order.
+    """
+    img_height, img_width = img.shape[:2]
+    # Grayscale first: shrinking one channel is several times cheaper than three
+    small, scale = _detection_image(cv2.cvtColor(img, cv2.COLOR_BGR2GRAY), detect_max_side)
+    small_height, small_width = small.shape[:2]
+    total_area = small_width * small_height
+
+    # --- Preprocessing (at detection resolution) ---
+    blurred = cv2.GaussianBlur(small, blur_kernel, 0)
+    edged = cv2.Canny(blurred, canny_low, canny_high)
+    # Close 1px gaps, which otherwise open up card outlines at reduced scale
+    edged = cv2.morphologyEx(edged, cv2.MORPH_CLOSE, EDGE_CLOSE_KERNEL)
+
+    # --- Find Contours ---
+    contours, _ = cv2.findContours(edged, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+
+    card_contours = []
+    if contours:
+        # --- Filter by Area (all contours at once) ---
+        areas, perimeters, _ = _contour_geometry(contours)
+        area_ratios = areas / total_area
+        candidates = np.flatnonzero((area_ratios > min_area_ratio) & (area_ratios < max_area_ratio))
+
+        # Only the few area survivors need a polygon approximation
+        for index in candidates:
+            approx = cv2.approxPolyDP(contours[index], poly_epsilon * perimeters[index], True)
+
+            # --- Filter by Shape ---
+            if len(approx) == 4:
+                (x, y, w, h) = cv2.boundingRect(approx)
+                # Avoid division by zero if height is 0
+                aspect_ratio = float(w) / h if h > 0 else 0
+
+                # --- Filter by Aspect Ratio ---
+                if aspect_min < aspect_ratio < aspect_max:
+                    card_contours.append(approx)
+
+    if debug_image_path:
+        # Built only on request, at detection resolution
+        debug_img = cv2.cvtColor(small, cv2.COLOR_GRAY2BGR)
+        cv2.drawContours(debug_img, card_contours, -1, (0, 255, 0), 2)
+        cv2.imwrite(debug_image_path, debug_img)
+        print(f"Saved debug image to {debug_image_path}")
+
+    if not card_contours:
+        return []
+
+    # --- Sort Contours ---
+    bounding_boxes = [cv2.boundingRect(c) for c in card_contours]
+    row_tolerance = small_height * row_tolerance_ratio
+    # Sort primarily by y-center, then x-center
+    bounding_boxes.sort(key=lambda box: (round((box[1] + box[3]/2) / row_tolerance), box[0] + box[2]/2))
+
+    # Limit to top 9 contours
+    print(f"Found {len(bounding_boxes)} valid card contours before limiting.")
+
+    # --- Map to full resolution ---
+    # One detection pixel covers 1/scale original pixels; pad by that too
+    padding = 2 + int(np.ceil(1 / scale)) - 1
+    return [(max(0, int(x / scale) - padding),
+             max(0, int(y / scale) - padding),
+             min(img_width, int(np.ceil((x + w) / scale)) + padding),
+             min(img_height, int(np.ceil((y + h) / scale)) + padding))
+            for x, y, w, h in bounding_boxes[:9]]
+
 
 def split_binder_page(image_path, output_dir,
                       blur_kernel=DEFAULT_BLUR_KERNEL,
@@ -21,9 +279,14 @@ def split_binder_page(image_path, output_dir,
                       aspect_min=DEFAULT_CARD_ASPECT_RATIO_MIN, aspect_max=DEFAULT_CARD_ASPECT_RATIO_MAX,
                       poly_epsilon=DEFAULT_APPROX_POLY_EPSILON,
                       row_tolerance_ratio=DEFAULT_ROW_TOLERANCE_RATIO,
-                      save_debug_image=True): # Add flag to save debug image
+                      save_debug_image=False,
+                      detect_max_side=DEFAULT_DETECT_MAX_SIDE,
+                      decode_max_side=0):
     """Splits a binder page image into individual card images using configurable parameters.
 
+    Detection runs on a downscaled copy (see find_card_boxes); the crops are
+    cut from the full-resolution image.
+
     Args:
         image_path (str): Path to the input binder page image.
         output_dir (str): Directory to save the extracted card images.
@@ -37,103 +300,44 @@ def split_binder_page(image_path, output_dir,
         poly_epsilon (float): Epsilon factor for cv2.approxPolyDP.
         row_tolerance_ratio (float): Ratio of image height used for sorting tolerance.
         save_debug_image (bool): Whether to save an image with contours drawn.
+        detect_max_side (int): Longest side of the detection image; 0 for full resolution.
+        decode_max_side (int): Decode the page reduced down to this longest side
+                               (see load_image); 0 for full resolution.
 
     Returns:
         list: A list of file paths for the extracted card images.
     """
     extracted_card_paths = []
-    debug_img = None # Initialize debug image
     try:
-        img = cv2.imread(image_path)
+        img = load_image(image_path, decode_max_side)
         if img is None:
             print(f"Error: Could not load image from {image_path}")
             return []
-        debug_img = img.copy() # Copy for drawing contours
 
-        img_height, img_width = img.shape[:2]
-        total_area = img_width * img_height
-
-        # --- Preprocessing ---
-        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-        blurred = cv2.GaussianBlur(gray, blur_kernel, 0)
-        edged = cv2.Canny(blurred, canny_low, canny_high)
-
-        # --- Find Contours ---
-        contours, _ = cv2.findContours(edged, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-
-        card_contours = []
-        for contour in contours:
-            area = cv2.contourArea(contour)
-            area_ratio = area / total_area
-
-            # --- Filter by Area ---
-            if min_area_ratio < area_ratio < max_area_ratio:
-                perimeter = cv2.arcLength(contour, True)
-                approx = cv2.approxPolyDP(contour, poly_epsilon * perimeter, True)
-
-                # --- Filter by Shape ---
-                if len(approx) == 4:
-                    (x, y, w, h) = cv2.boundingRect(approx)
-                    # Avoid division by zero if height is 0
-                    aspect_ratio = float(w) / h if h > 0 else 0
-
-                    # --- Filter by Aspect Ratio ---
-                    if aspect_min < aspect_ratio < aspect_max:
-                        card_contours.append(approx)
-                        # Draw accepted contour on debug image
-                        cv2.drawContours(debug_img, [approx], -1, (0, 255, 0), 2)
-                    # else: # Optional: Draw rejected aspect ratio contours in different color
-                    #     cv2.drawContours(debug_img, [approx], -1, (0, 0, 255), 1)
-                # else: # Optional: Draw rejected shape contours
-                #     cv2.drawContours(debug_img, [approx], -1, (255, 0, 0), 1)
-            # else: # Optional: Draw rejected area contours
-            #     cv2.drawContours(debug_img, [contour], -1, (0, 255, 255), 1)
-
-
-        # --- Sort Contours ---
-        if len(card_contours) > 0:
-            bounding_boxes = [cv2.boundingRect(c) for c in card_contours]
-            row_tolerance = img_height * row_tolerance_ratio
-            # Sort primarily by y-center, then x-center
-            # Use tuple unpacking directly in lambda for clarity
-            sorted_contours = sorted(zip(card_contours, bounding_boxes),
-                                   key=lambda item: (
-                                       round((item[1][1] + item[1][3]/2) / row_tolerance),
-                                       item[1][0] + item[1][2]/2
-                                   ))
-
-            # Limit to top 9 contours
-            print(f"Found {len(sorted_contours)} valid card contours before limiting.")
-            sorted_contours = sorted_contours[:9]
-
-            # --- Extract and Save ROIs ---
-            if not os.path.exists(output_dir):
-                os.makedirs(output_dir)
-
-            for i, (contour, (x, y, w, h)) in enumerate(sorted_contours):
-                padding = 2
-                y_start = max(0, y - padding)
-                y_end = min(img_height, y + h + padding)
-                x_start = max(0, x - padding)
-                x_end = min(img_width, x + w + padding)
-                card_roi = img[y_start:y_end, x_start:x_end]
-
-                if card_roi.size > 0:
-                    card_filename = f"card_{i+1}.png"
-                    card_save_path = os.path.join(output_dir, card_filename)
-                    cv2.imwrite(card_save_path, card_roi)
-                    extracted_card_paths.append(card_save_path)
-                    # print(f"Saved card {i+1} to {card_save_path}") # Reduce noise
-                else:
-                    print(f"Warning: Empty ROI detected for card {i+1}")
-        else:
-            print("No valid card contours found.")
+        if not os.path.exists(output_dir):
+            os.makedirs(output_dir)
 
-        # Save debugging image
-        if save_debug_image and debug_img is not None:
-            debug_img_path = os.path.join(output_dir, "_debug_contours.png")
-            cv2.imwrite(debug_img_path, debug_img)
-            print(f"Saved debug image to {debug_img_path}")
+        boxes = find_card_boxes(
+            img, blur_kernel=blur_kernel, canny_low=canny_low, canny_high=canny_high,
+            min_area_ratio=min_area_ratio, max_area_ratio=max_area_ratio,
+            aspect_min=aspect_min, aspect_max=aspect_max, poly_epsilon=poly_epsilon,
+            row_tolerance_ratio=row_tolerance_ratio, detect_max_side=detect_max_side,
+            debug_image_path=os.path.join(output_dir, "_debug_contours.png") if save_debug_image else None)
+
+        # --- Extract and Save ROIs ---
+        for i, (x_start, y_start, x_end, y_end) in enumerate(boxes):
+            card_roi = img[y_start:y_end, x_start:x_end]
+
+            if card_roi.size > 0:
+                card_filename = f"card_{i+1}.png"
+                card_save_path = os.path.join(output_dir, card_filename)
+                cv2.imwrite(card_save_path, card_roi)
+                extracted_card_paths.append(card_save_path)
+                # print(f"Saved card {i+1} to {card_save_path}") # Reduce noise
+            else:
+                print(f"Warning: Empty ROI detected for card {i+1}")
+        if not boxes:
+            print("No valid card contours found.")
 
     except Exception as e:
         print(f"Error processing image {image_path}: {e}")
@@ -141,7 +345,47 @@ def split_binder_page(image_path, output_dir,
     print(f"Extracted {len(extracted_card_paths)} card images.")
     return extracted_card_paths
 
-def split_binder_page_by_grid(image_path, output_dir, inner_crop_percent=5):
+def grid_card_boxes(img_width, img_height, inner_crop_percent=5):
+    """Cells of a fixed 3x3 grid, each cropped inwards by inner_crop_percent.
+
+    Returns:
+        list: (card number, (x_start, y_start, x_end, y_end)) per cell, in reading
+              order; cells the crop leaves empty are skipped.
+    """
+    cell_width = img_width // 3
+    cell_height = img_height // 3
+
+    # Calculate inwards crop amount based on percentage
+    crop_x = (cell_width * inner_crop_percent) // 100
+    crop_y = (cell_height * inner_crop_percent) // 100
+
+    boxes = []
+    card_index = 0
+    for r in range(3): # Rows
+        for c in range(3): # Columns
+            card_index += 1
+
+            # Define cell boundaries
+            y_start = r * cell_height
+            y_end = y_start + cell_height
+            x_start = c * cell_width
+            x_end = x_start + cell_width
+
+            # Apply inner crop
+            roi_y_start = y_start + crop_y
+            roi_y_end = y_end - crop_y
+            roi_x_start = x_start + crop_x
+            roi_x_end = x_end - crop_x
+
+            # Ensure coordinates are valid after cropping
+            if roi_y_start >= roi_y_end or roi_x_start >= roi_x_end:
+                print(f"Warning: Inner crop too large for card {card_index}, skipping.")
+                continue
+            boxes.append((card_index, (roi_x_start, roi_y_start, roi_x_end, roi_y_end)))
+    return boxes
+
+
+def split_binder_page_by_grid(image_path, output_dir, inner_crop_percent=5, decode_max_side=0):
     """Splits a binder page image by dividing it into a 3x3 grid.
 
     Args:
@@ -149,72 +393,366 @@ def split_binder_page_by_grid(image_path, output_dir, inner_crop_percent=5):
         output_dir (str): Directory to save the extracted card images.
         inner_crop_percent (int): Percentage to crop inwards from each grid cell border
                                 to remove binder edges (e.g., 5 = 5% crop from each side).
+        decode_max_side (int): Decode the page reduced down to this longest side
+                               (see load_image); 0 for full resolution.
 
     Returns:
         list: A list of file paths for the extracted card images.
     """
     extracted_card_paths = []
     try:
-        img = cv2.imread(image_path)
+        img = load_image(image_path, decode_max_side)
         if img is None:
             print(f"Error: Could not load image from {image_path}")
             return []
 
         img_height, img_width = img.shape[:2]
 
-        cell_width = img_width // 3
-        cell_height = img_height // 3
+        if not os.path.exists(output_dir):
+            os.makedirs(output_dir)
+
+        for card_index, (roi_x_start, roi_y_start, roi_x_end, roi_y_end) in grid_card_boxes(
+                img_width, img_height, inner_crop_percent):
+            # Extract ROI
+            card_roi = img[roi_y_start:roi_y_end, roi_x_start:roi_x_end]
+
+            if card_roi.size > 0:
+                card_filename = f"card_{card_index}.png"
+                card_save_path = os.path.join(output_dir, card_filename)
+                cv2.imwrite(card_save_path, card_roi)
+                extracted_card_paths.append(card_save_path)
+                # print(f"Saved card {card_index} to {card_save_path}") # Reduce noise
+            else:
+                print(f"Warning: Empty ROI detected for card {card_index}")
+
+    except Exception as e:
+        print(f"Error processing image {image_path} with grid method: {e}")
+
+    print(f"Extracted {len(extracted_card_paths)} card images using grid method.")
+    return extracted_card_paths
+
+# --- Projection-profile pocket detection ---
+# Pocket layouts as (rows, columns); names are columns x rows
+POCKET_LAYOUTS = {'2x2': (2, 2), '3x3': (3, 3), '4x3': (3, 4)}
+PAGE_MIN_AREA_RATIO = 0.4 # Smallest sheet outline accepted for perspective correction
+PROFILE_PEAK_MIN_RATIO = 1.5 # Outer sheet edges must exceed this multiple of the median profile
+PROFILE_OUTER_SEARCH = 0.1 # Fraction of the page searched for each outer sheet edge
+PROFILE_INNER_SEARCH = 0.2 # Fraction of a pocket searched on each side of an expected seam
+
 
-        # Calculate inwards crop amount based on percentage
-        crop_x = (cell_width * inner_crop_percent) // 100
-        crop_y = (cell_height * inner_crop_percent) // 100
+def _order_corners(points):
+    """Orders four (x, y) points as top-left, top-right, bottom-right, bottom-left."""
+    points = points.reshape(4, 2).astype(np.float32)
+    sums, diffs = points.sum(axis=1), np.diff(points, axis=1).ravel()
+    return np.array([points[np.argmin(sums)], points[np.argmin(diffs)],
+                     points[np.argmax(sums)], points[np.argmax(diffs)]], dtype=np.float32)
 
-        print(f"Image Size: {img_width}x{img_height}, Cell Size: {cell_width}x{cell_height}")
-        print(f"Cropping inwards by X:{crop_x}px, Y:{crop_y}px per side ({inner_crop_percent}%)")
+
+def _find_page_quad(gray):
+    """Returns the binder sheet's four corners (see _order_corners), or None if no clear outline."""
+    edged = cv2.Canny(cv2.GaussianBlur(gray, DEFAULT_BLUR_KERNEL, 0), DEFAULT_CANNY_LOW, DEFAULT_CANNY_HIGH)
+    edged = cv2.morphologyEx(edged, cv2.MORPH_CLOSE, EDGE_CLOSE_KERNEL)
+    contours, _ = cv2.findContours(edged, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    if not contours:
+        return None
+    hull = cv2.convexHull(max(contours, key=cv2.contourArea))
+    if cv2.contourArea(hull) < PAGE_MIN_AREA_RATIO * gray.shape[0] * gray.shape[1]:
+        return None
+    approx = cv2.approxPolyDP(hull, DEFAULT_APPROX_POLY_EPSILON * cv2.arcLength(hull, True), True)
+    return _order_corners(approx) if len(approx) == 4 else None
+
+
+def _rectified_size(corners):
+    top, right, bottom, left = (np.linalg.norm(corners[(i + 1) % 4] - corners[i]) for i in range(4))
+    return max(1, int(round(max(top, bottom)))), max(1, int(round(max(left, right))))
+
+
+def _edge_profiles(gray):
+    """Counts of vertical edge pixels per column and horizontal edge pixels per row.
+
+    Counting Canny pixels instead of summing gradients weights every edge by
+    its length alone, so long pocket and card borders outrank short,
+    high-contrast artwork. Profiles are smoothed and divided by their median.
+    """
+    blurred = cv2.GaussianBlur(gray, DEFAULT_BLUR_KERNEL, 0)
+    edges = cv2.Canny(blurred, DEFAULT_CANNY_LOW, DEFAULT_CANNY_HIGH) > 0
+    vertical = np.abs(cv2.Sobel(blurred, cv2.CV_16S, 1, 0)) > np.abs(cv2.Sobel(blurred, cv2.CV_16S, 0, 1))
+    columns = (edges & vertical).sum(axis=0, dtype=np.float64)
+    rows = (edges & ~vertical).sum(axis=1, dtype=np.float64)
+    profiles = []
+    for profile in (columns, rows):
+        window = max(3, len(profile) // 100) | 1
+        profile = np.convolve(profile, np.ones(window) / window, mode='same')
+        profiles.append(profile / max(np.median(profile), 1.0))
+    return profiles
+
+
+def _outer_edge(profile, lo, hi, outermost):
+    # The sheet edge is the outermost strong peak: card borders lie just inside it
+    window = profile[lo:hi]
+    strong = np.flatnonzero((window >= PROFILE_PEAK_MIN_RATIO) & (window >= 0.5 * window.max()))
+    if len(strong) == 0:
+        return None
+    return lo + (strong[0] if outermost == 'first' else strong[-1])
+
+
+def _profile_boundaries(profile, count):
+    """Finds count + 1 pocket boundaries along one axis of an edge profile.
+
+    Returns:
+        tuple: (boundary positions, inner seam strengths).
+    """
+    length = len(profile)
+    outer = int(length * PROFILE_OUTER_SEARCH)
+    start = _outer_edge(profile, 0, outer, 'first') or 0
+    end = _outer_edge(profile, length - 1 - outer, length - 1, 'last') or length - 1
+    pocket = (end - start) / count
+    reach = max(1, int(pocket * PROFILE_INNER_SEARCH))
+    boundaries, strengths = [start], []
+    for k in range(1, count):
+        expected = int(start + k * pocket)
+        lo, hi = max(0, expected - reach), min(len(profile), expected + reach + 1)
+        # Sheets have equal pockets: prefer peaks near the expected seam over
+        # card artwork (e.g. name plates) further away
+        prior = np.exp(-0.5 * ((np.arange(lo, hi) - expected) / (reach / 2)) ** 2)
+        seam = lo + int(np.argmax(profile[lo:hi] * prior))
+        boundaries.append(seam)
+        strengths.append(profile[seam])
+    boundaries.append(end)
+    return boundaries, strengths
+
+
+def find_pocket_grid(img, layout=None, inner_crop_percent=0, detect_max_side=DEFAULT_DETECT_MAX_SIDE):
+    """Locates binder pockets with edge projection profiles, after correcting perspective.
+
+    The sheet outline (if visible) gives one homography that rectifies the
+    page. Column and row sums of the intensity steps then peak at pocket
+    seams, so the grid is found in a single O(pixels) pass per axis.
+
+    Args:
+        img (numpy.ndarray): BGR binder page image.
+        layout (str): Key of POCKET_LAYOUTS, or None to pick the layout whose
+                      weakest seam is strongest (ties: strongest on average).
+        inner_crop_percent (int): Percentage to crop inwards from each pocket border.
+        detect_max_side (int): Longest side of the analysis image; 0 for full resolution.
+
+    Returns:
+        tuple: (layout name, list of pocket corner arrays (4x2, float32, TL/TR/BR/BL)
+               in full-resolution image coordinates, in reading order).
+    """
+    small, scale = _detection_image(cv2.cvtColor(img, cv2.COLOR_BGR2GRAY), detect_max_side)
+    corners = _find_page_quad(small)
+    if corners is None:
+        to_image = None
+        rectified = small
+    else:
+        width, height = _rectified_size(corners)
+        target = np.array([[0, 0], [width - 1, 0], [width - 1, height - 1], [0, height - 1]], dtype=np.float32)
+        rectified = cv2.warpPerspective(small, cv2.getPerspectiveTransform(corners, target), (width, height))
+        to_image = cv2.getPerspectiveTransform(target, corners)
+
+    column_profile, row_profile = _edge_profiles(rectified)
+    candidates = {layout: POCKET_LAYOUTS[layout]} if layout else POCKET_LAYOUTS
+    best = None
+    for name, (rows, cols) in candidates.items():
+        xs, column_strengths = _profile_boundaries(column_profile, cols)
+        ys, row_strengths = _profile_boundaries(row_profile, rows)
+        strengths = column_strengths + row_strengths
+        score = (min(strengths), sum(strengths) / len(strengths))
+        if best is None or score > best[0]:
+            best = (score, name, xs, ys)
+    _, name, xs, ys = best
+
+    quads = []
+    for r in range(len(ys) - 1):
+        for c in range(len(xs) - 1):
+            crop_x = (xs[c + 1] - xs[c]) * inner_crop_percent / 100
+            crop_y = (ys[r + 1] - ys[r]) * inner_crop_percent / 100
+            x0, y0, x1, y1 = xs[c] + crop_x, ys[r] + crop_y, xs[c + 1] - crop_x, ys[r + 1] - crop_y
+            quad = np.array([[x0, y0], [x1, y0], [x1, y1], [x0, y1]], dtype=np.float32)
+            if to_image is not None:
+                quad = cv2.perspectiveTransform(quad.reshape(-1, 1, 2), to_image).reshape(4, 2)
+            quads.append(quad / scale)
+    return name, quads
+
+
+def crop_quad(img, quad):
+    """Cuts a pocket out of the image, undoing its perspective.
+
+    Only the pocket's own pixels are resampled; axis-aligned pockets are
+    sliced without resampling.
+    """
+    quad = np.asarray(quad, dtype=np.float32)
+    width, height = _rectified_size(quad)
+    x_min, y_min = np.floor(quad.min(axis=0)).astype(int)
+    x_max, y_max = np.ceil(quad.max(axis=0)).astype(int)
+    if (x_max - x_min) - width <= 2 and (y_max - y_min) - height <= 2:
+        img_height, img_width = img.shape[:2]
+        return img[max(0, y_min):min(img_height, y_max), max(0, x_min):min(img_width, x_max)]
+    target = np.array([[0, 0], [width - 1, 0], [width - 1, height - 1], [0, height - 1]], dtype=np.float32)
+    return cv2.warpPerspective(img, cv2.getPerspectiveTransform(quad, target), (width, height))
+
+
+def split_binder_page_by_profile(image_path, output_dir, layout=None, inner_crop_percent=3,
+                                 detect_max_side=DEFAULT_DETECT_MAX_SIDE, decode_max_side=0):
+    """Splits a binder page into pockets found by projection profiles (see find_pocket_grid).
+
+    Handles 2x2, 3x3 and 4x3 pages and tolerates skewed or off-center photos,
+    unlike split_binder_page_by_grid.
+
+    Args:
+        image_path (str): Path to the input binder page image.
+        output_dir (str): Directory to save the extracted card images.
+        layout (str): '2x2', '3x3' or '4x3' (columns x rows); None detects it.
+        inner_crop_percent (int): Percentage to crop inwards from each pocket border.
+        detect_max_side (int): Longest side of the analysis image; 0 for full resolution.
+        decode_max_side (int): Decode the page reduced down to this longest side
+                               (see load_image); 0 for full resolution.
+
+    Returns:
+        list: A list of file paths for the extracted card images.
+    """
+    extracted_card_paths = []
+    try:
+        img = load_image(image_path, decode_max_side)
+        if img is None:
+            print(f"Error: Could not load image from {image_path}")
+            return []
+
+        layout, quads = find_pocket_grid(img, layout=layout, inner_crop_percent=inner_crop_percent,
+                                         detect_max_side=detect_max_side)
+        print(f"Detected {layout} pocket layout")
 
         if not os.path.exists(output_dir):
             os.makedirs(output_dir)
 
-        card_index = 0
-        for r in range(3): # Rows
-            for c in range(3): # Columns
-                card_index += 1
-
-                # Define cell boundaries
-                y_start = r * cell_height
-                y_end = y_start + cell_height
-                x_start = c * cell_width
-                x_end = x_start + cell_width
-
-                # Apply inner crop
-                roi_y_start = y_start + crop_y
-                roi_y_end = y_end - crop_y
-                roi_x_start = x_start + crop_x
-                roi_x_end = x_end - crop_x
-
-                # Ensure coordinates are valid after cropping
-                if roi_y_start >= roi_y_end or roi_x_start >= roi_x_end:
-                    print(f"Warning: Inner crop too large for card {card_index}, skipping.")
-                    continue
-
-                # Extract ROI
-                card_roi = img[roi_y_start:roi_y_end, roi_x_start:roi_x_end]
-
-                if card_roi.size > 0:
-                    card_filename = f"card_{card_index}.png"
-                    card_save_path = os.path.join(output_dir, card_filename)
-                    cv2.imwrite(card_save_path, card_roi)
-                    extracted_card_paths.append(card_save_path)
-                    # print(f"Saved card {card_index} to {card_save_path}") # Reduce noise
-                else:
-                    print(f"Warning: Empty ROI detected for card {card_index}")
+        for i, quad in enumerate(quads):
+            card_roi = crop_quad(img, quad)
+
+            if card_roi.size > 0:
+                card_filename = f"card_{i+1}.png"
+                card_save_path = os.path.join(output_dir, card_filename)
+                cv2.imwrite(card_save_path, card_roi)
+                extracted_card_paths.append(card_save_path)
+            else:
+                print(f"Warning: Empty ROI detected for card {i+1}")
 
     except Exception as e:
-        print(f"Error processing image {image_path} with grid method: {e}")
+        print(f"Error processing image {image_path} with profile method: {e}")
 
-    print(f"Extracted {len(extracted_card_paths)} card images using grid method.")
+    print(f"Extracted {len(extracted_card_paths)} card images using profile method.")
     return extracted_card_paths
 
+# --- Crop triage ---
+# Crops are scored on a grayscale copy with about this longest side
+TRIAGE_WORK_SIDE = 256
+TRIAGE_BORDER_RATIO = 0.05 # Ignored margin on each side, where pocket seams show
+TRIAGE_CLIP_LEVEL = 250 # Gray level treated as blown out by glare
+DEFAULT_TRIAGE_MIN_EDGE_DENSITY = 0.005
+DEFAULT_TRIAGE_MIN_SHARPNESS = 40.0
+DEFAULT_TRIAGE_MAX_CLIPPED = 0.2
+
+
+def crop_quality(gray):
+    """Cheap quality metrics for one card crop, each a single numpy/OpenCV pass.
+
+    Args:
+        gray (numpy.ndarray): Grayscale crop (any size).
+
+    Returns:
+        dict: edge_density (share of Canny edge pixels; near 0 for an empty
+              sleeve), sharpness (variance of the Laplacian; low when blurred)
+              and clipped (share of blown-out pixels; high under glare).
+    """
+    small, _ = _detection_image(gray, TRIAGE_WORK_SIDE)
+    height, width = small.shape[:2]
+    margin_y, margin_x = int(height * TRIAGE_BORDER_RATIO), int(width * TRIAGE_BORDER_RATIO)
+    small = small[margin_y:height - margin_y, margin_x:width - margin_x]
+    if small.size == 0:
+        return {'edge_density': 0.0, 'sharpness': 0.0, 'clipped': 0.0}
+    edges = cv2.Canny(small, DEFAULT_CANNY_LOW, DEFAULT_CANNY_HIGH)
+    return {
+        'edge_density': round(float(np.count_nonzero(edges)) / edges.size, 4),
+        'sharpness': round(float(cv2.Laplacian(small, cv2.CV_64F).var()), 1),
+        'clipped': round(float(np.count_nonzero(small >= TRIAGE_CLIP_LEVEL)) / small.size, 4),
+    }
+
+
+def triage_card_crops(card_paths,
+                      min_edge_density=DEFAULT_TRIAGE_MIN_EDGE_DENSITY,
+                      min_sharpness=DEFAULT_TRIAGE_MIN_SHARPNESS,
+                      max_clipped=DEFAULT_TRIAGE_MAX_CLIPPED):
+    """Separates crops worth an eBay lookup from empty, blurry or glare-washed ones.
+
+    Args:
+        card_paths (list): Crop image paths, as returned by the splitters.
+        min_edge_density (float): Below this the pocket is treated as empty.
+        min_sharpness (float): Below this the crop is too blurry to identify.
+        max_clipped (float): Above this glare covers too much of the card.
+
+    Returns:
+        tuple: (usable, rejected). usable is a list of (card number, path);
+               rejected is a list of dicts with card, source_image, reason and
+               the crop_quality metrics. Card numbers start at 1.
+    """
+    usable, rejected = [], []
+    for number, path in enumerate(card_paths, start=1):
+        gray = load_image(path, TRIAGE_WORK_SIDE, grayscale=True)
+        if gray is None:
+            metrics, reason = {}, 'unreadable'
+        else:
+            metrics = crop_quality(gray)
+            if metrics['edge_density'] < min_edge_density:
+                reason = 'empty'
+            elif metrics['clipped'] > max_clipped:
+                reason = 'glare'
+            elif metrics['sharpness'] < min_sharpness:
+                reason = 'blurry'
+            else:
+                reason = None
+        if reason is None:
+            usable.append((number, path))
+        else:
+            rejected.append(dict(card=number, source_image=os.path.basename(path), reason=reason, **metrics))
+    return usable, rejected
+
+def process_binder_page(image_path, output_dir, method='grid', inner_crop_percent=3, triage=None,
+                        decode_max_side=0, thumbnails=None):
+    """Splits a binder page, then triages, hashes and thumbnails the crops in one call (an image pool task).
+
+    Args:
+        image_path (str): Path to the binder page image.
+        output_dir (str): Directory for the card crops.
+        method (str): 'grid' or 'profile'.
+        inner_crop_percent (int): Inner crop passed to the splitter.
+        triage (dict): triage_card_crops keyword arguments, or None to skip triage.
+        decode_max_side (int): Passed to the splitter; 0 decodes at full resolution.
+        thumbnails (dict): make_thumbnails keyword arguments (thumbnails.thumbnail_settings),
+                           or None to skip thumbnails.
+
+    Returns:
+        tuple: (crop paths, usable (card number, path) list, rejected crop dicts,
+                {crop path: {'image_hash': pHash (see image_hash), 'image_key':
+                thumbnail key or None}}, peak RSS in MB of the process while
+                handling this page, or None). The peak is only per page when the
+                process handles one page at a time.
+    """
+    peak_rss_mb(reset=True)
+    if method == 'profile':
+        paths = split_binder_page_by_profile(image_path, output_dir, inner_crop_percent=inner_crop_percent,
+                                             decode_max_side=decode_max_side)
+    else:
+        paths = split_binder_page_by_grid(image_path, output_dir, inner_crop_percent=inner_crop_percent,
+                                          decode_max_side=decode_max_side)
+    if triage is None:
+        usable, rejected = list(enumerate(paths, start=1)), []
+    else:
+        usable, rejected = triage_card_crops(paths, **triage)
+    crops = {path: {'image_hash': image_phash(path),
+                    'image_key': make_thumbnails(path, **thumbnails) if thumbnails else None}
+             for path in paths}
+    return paths, usable, rejected, crops, peak_rss_mb()
+
 # Example usage (for testing standalone)
 # if __name__ == '__main__':
 #     test_image = 'path/to/your/test_binder_page.jpg'
@@ -0,0 +1,220 @@
+# backend/app/migration_jobs.py
+"""Resumable, chunked data migrations for large production tables.
+
+A job walks its table in primary-key (keyset) order. Each chunk is committed
+in its own short transaction together with the job's MigrationCheckpoint row,
+so a job interrupted at any point resumes after the last committed chunk and
+live requests never wait on a long-running statement.
+
+Run jobs with `flask migration-job <name>`; see JOBS for what is available.
+"""
+import time
+from datetime import datetime
+from sqlalchemy import select, update, func, text
+from sqlalchemy.exc import OperationalError
+from flask import current_app
+from . import db
+from .models import Card, MigrationCheckpoint
+from .collection import record_card_changes, ROLLUP_SOURCE_FIELDS
+from .services import load_reference_data_cache, resolve_reference_ids, backfill_card_reference_ids
+from .partitioning import COPY_JOB, copy_card_chunk, check_copy_target
+from .catalog import backfill_card_catalog
+from .image_mirror import register_card_mirror_images
+
+# Chunks that hit a lock/busy error are retried this many times with backoff
+MAX_CHUNK_RETRIES = 5
+# Seconds between progress lines
+PROGRESS_INTERVAL = 5.0
+
+# Team clean-ups from update_teams.sql (None clears a value that is not a team)
+TEAM_RENAMES = {
+    'Lakers': 'Los Angeles Lakers',
+    'Grizzlies': 'Memphis Grizzlies',
+    'Prizm': None,
+    'Shipping': None,
+}
+
+
+class MigrationJob:
+    """A named data fix applied to a table one keyset chunk at a time.
+
+    Args:
+        name (str): Job name, used as the checkpoint key.
+        description (str): One line shown by `flask migration-job`.
+        process_chunk (callable): (after_id, limit) -> (last ID scanned or None
+            when no rows remain, rows scanned, rows changed). Stages its writes
+            in the session without committing.
+        model: Model whose primary key the job walks (used for ETA estimates).
+        setup (callable): Optional; called once before the first chunk of a run.
+    """
+    def __init__(self, name, description, process_chunk, model=Card, setup=None):
+        self.name = name
+        self.description = description
+        self.process_chunk = process_chunk
+        self.model = model
+        self.setup = setup
+
+
+def rename_card_teams(after_id, limit):
+    """Applies TEAM_RENAMES to one chunk of cards, keeping facets and sync state current."""
+    columns = [Card.id, Card.owner_id] + [getattr(Card, field) for field in ROLLUP_SOURCE_FIELDS]
+    rows = db.session.execute(select(*columns).where(Card.id > after_id).order_by(Card.id).limit(limit)).all()
+    if not rows:
+        return None, 0, 0
+
+    changed_by_owner = {}
+    for row in rows:
+        if row.team in TEAM_RENAMES:
+            before = row._asdict()
+            changed_by_owner.setdefault(row.owner_id, []).append((before, dict(before, team=TEAM_RENAMES[row.team])))
+
+    changed = 0
+    for owner_id, changes in changed_by_owner.items():
+        db.session.execute(update(Card), [
+            {'id': after['id'], 'team': after['team'], 'team_id': resolve_reference_ids(after)['team_id']}
+            for _, after in changes
+        ])
+        record_card_changes(owner_id, removed=[before for before, _ in changes], added=[after for _, after in changes])
+        changed += len(changes)
+    return rows[-1].id, len(rows), changed
+
+
+JOBS = {job.name: job for job in (
+    MigrationJob('team-renames', 'Standardize team names on cards (update_teams.sql)',
+                 rename_card_teams, setup=load_reference_data_cache),
+    MigrationJob('card-reference-ids', 'Link cards to player/team/card set rows',
+                 backfill_card_reference_ids, setup=load_reference_data_cache),
+    MigrationJob('card-catalog', 'Link cards to shared catalog entries, creating entries as needed',
+                 backfill_card_catalog, setup=load_reference_data_cache),
+    MigrationJob('image-mirror', 'Register card image URLs for the local image mirror (fetched on first request)',
+                 register_card_mirror_images),
+    MigrationJob(COPY_JOB, 'Copy cards into the hash-partitioned table (PostgreSQL, see app/partitioning.py)',
+                 copy_card_chunk, setup=check_copy_target),
+)}
+
+
+def get_checkpoint(job_name):
+    checkpoint = MigrationCheckpoint.query.filter_by(job_name=job_name).first()
+    if checkpoint is None:
+        checkpoint = MigrationCheckpoint(job_name=job_name, last_id=0, rows_scanned=0, rows_changed=0,
+                                         status='pending')
+        db.session.add(checkpoint)
+        db.session.commit()
+    return checkpoint
+
+
+def _limit_lock_waits():
+    # A chunk that cannot get its row locks quickly gives up and is retried,
+    # instead of queueing live writes behind it (PostgreSQL only).
+    if db.engine.dialect.name == 'postgresql':
+        timeout_ms = int(current_app.config.get('MIGRATION_LOCK_TIMEOUT_MS', 2000))
+        db.session.execute(text(f"SET LOCAL lock_timeout = {timeout_ms}"))
+
+
+def _run_chunk(job, checkpoint, batch_size):
+    """Processes and commits one chunk plus the checkpoint, retrying on lock errors."""
+    for attempt in range(MAX_CHUNK_RETRIES + 1):
+        try:
+            _limit_lock_waits()
+            last_id, scanned, changed = job.process_chunk(checkpoint.last_id, batch_size)
+            if last_id is not None:
+                checkpoint.last_id = last_id
+                checkpoint.rows_scanned += scanned
+                checkpoint.rows_changed += changed
+            checkpoint.updated_at = datetime.utcnow()
+            db.session.commit()
+            return last_id, scanned
+        except OperationalError as e:
+            db.session.rollback()
+            if attempt == MAX_CHUNK_RETRIES:
+                raise
+            delay = 0.5 * 2 ** attempt
+            print(f"[{job.name}] chunk after id {checkpoint.last_id} hit {e.orig.__class__.__name__}; "
+                  f"retrying in {delay:.1f}s")
+            time.sleep(delay)
+
+
+def _format_duration(seconds):
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h{minutes:02d}m{seconds:02d}s" if hours else f"{minutes}m{seconds:02d}s"
+
+
+def run_job(name, batch_size=None, throttle=None, restart=False, max_chunks=None):
+    """Runs (or resumes) a migration job until its table is exhausted.
+
+    Args:
+        name (str): Key in JOBS.
+        batch_size (int): Rows per chunk; defaults to MIGRATION_BATCH_SIZE.
+        throttle (float): Seconds to sleep between chunks; defaults to MIGRATION_THROTTLE.
+        restart (bool): Ignore the stored checkpoint and start from the first row.
+        max_chunks (int): Stop after this many chunks (the job stays resumable).
+
+    Returns:
+        MigrationCheckpoint: The job's checkpoint after the run.
+    """
+    job = JOBS[name]
+    batch_size = batch_size or current_app.config.get('MIGRATION_BATCH_SIZE', 1000)
+    throttle = current_app.config.get('MIGRATION_THROTTLE', 0.05) if throttle is None else throttle
+
+    checkpoint = get_checkpoint(name)
+    if restart:
+        checkpoint.last_id = checkpoint.rows_scanned = checkpoint.rows_changed = 0
+        checkpoint.finished_at = None
+    elif checkpoint.status == 'completed':
+        print(f"[{name}] already completed at {checkpoint.finished_at}; use --restart to run it again.")
+        return checkpoint
+    if checkpoint.last_id:
+        print(f"[{name}] resuming after id {checkpoint.last_id} ({checkpoint.rows_scanned} rows already done)")
+
+    id_column = job.model.__mapper__.primary_key[0]
+    remaining = db.session.scalar(select(func.count()).select_from(job.model).where(id_column > checkpoint.last_id))
+    checkpoint.status, checkpoint.error = 'running', None
+    checkpoint.updated_at = datetime.utcnow()
+    if restart or checkpoint.started_at is None:
+        # Resumed runs keep the original start (the partition swap relies on it)
+        checkpoint.started_at = checkpoint.updated_at
+    db.session.commit()
+
+    if job.setup:
+        job.setup()
+
+    start = last_report = time.monotonic()
+    done = chunks = 0
+    try:
+        while max_chunks is None or chunks < max_chunks:
+            last_id, scanned = _run_chunk(job, checkpoint, batch_size)
+            if last_id is None:
+                checkpoint.status = 'completed'
+                checkpoint.finished_at = datetime.utcnow()
+                db.session.commit()
+                break
+            done += scanned
+            chunks += 1
+
+            now = time.monotonic()
+            if now - last_report >= PROGRESS_INTERVAL:
+                last_report = now
+                rate = done / (now - start)
+                left = max(remaining - done, 0)
+                eta = _format_duration(left / rate) if rate else '?'
+                print(f"[{name}] {done}/{remaining} rows ({100 * done / max(remaining, 1):.1f}%), "
+                      f"{checkpoint.rows_changed} changed, {rate:,.0f} rows/s, ETA {eta}, last id {checkpoint.last_id}")
+            if throttle:
+                time.sleep(throttle)
+        else:
+            checkpoint.status = 'pending'
+            db.session.commit()
+    except BaseException as e:
+        # Includes KeyboardInterrupt: record where the job stopped so it can resume
+        db.session.rollback()
+        checkpoint.status = 'failed'
+        checkpoint.error = f"{e.__class__.__name__}: {e}"
+        db.session.commit()
+        print(f"[{name}] stopped after id {checkpoint.last_id}: {checkpoint.error}")
+        raise
+
+    elapsed = time.monotonic() - start
+    print(f"[{name}] {checkpoint.status}: {done} rows scanned this run in {_format_duration(elapsed)}, "
+          f"{checkpoint.rows_changed} changed in total, last id {checkpoint.last_id}")
+    return checkpoint
@@ -19,6 +19,11 @@ class User(db.Model, UserMixin): # Inherit from UserMixin
     username = db.Column(db.String(64), index=True, unique=True, nullable=False)
     email = db.Column(db.String(120), index=True, unique=True, nullable=False)
     password_hash = db.Column(db.String(256))  # Increased length for stronger hashes
+    # Bumped on every card write; drives ETags for the collection endpoints
+    collection_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    collection_updated_at = db.Column(db.DateTime)
+    # Oldest sync cursor still answerable; raised when tombstones are purged
+    sync_floor_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
 
     # Relationship: One user has many cards
     # back_populates links this to the 'owner' relationship in Card
@@ -41,6 +46,9 @@ class Card(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     player_name = db.Column(db.String(100), nullable=False)
     card_year = db.Column(db.String(20), nullable=False)  # Changed from Integer to String to store YYYY-YY format
+    # First calendar year of the season (2023 for '2023-24'); the canonical value for
+    # filtering and sorting. NULL only when card_year could not be parsed.
+    season_start = db.Column(db.Integer)
     manufacturer = db.Column(db.String(100), nullable=False)
     card_number = db.Column(db.String(50))
     team = db.Column(db.String(100))
@@ -49,31 +57,164 @@ class Card(db.Model):
     notes = db.Column(db.Text)
     sport = db.Column(db.String(50))
     owner_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    # Links to the reference tables, resolved from the free-text fields above when
+    # they match (see services.resolve_reference_ids); NULL for unmatched values.
+    player_id = db.Column(db.Integer, db.ForeignKey('player.id'))
+    team_id = db.Column(db.Integer, db.ForeignKey('team.id'), index=True)
+    card_set_id = db.Column(db.Integer, db.ForeignKey('card_set.id'), index=True)
     date_added = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Owner's collection_version when this card was last written; the delta-sync cursor
+    change_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    # 64-bit pHash of the uploaded crop, stored signed (see image_hash); NULL for cards
+    # added by hand or before hashing existed
+    image_hash = db.Column(db.BigInteger)
+    # Content hash naming the uploaded crop's thumbnails (see app.thumbnails); NULL when
+    # the card has no stored crop
+    image_key = db.Column(db.String(32))
+    # Canonical identity shared with other collectors' copies (see app.catalog); NULL
+    # when the card's fields do not name one card exactly
+    catalog_card_id = db.Column(db.Integer, db.ForeignKey('catalog_card.id'), index=True)
 
     # Relationship: Many cards belong to one user
     # back_populates links this to the 'cards' relationship in User
     owner = db.relationship('User', back_populates='cards')
 
+    # Composite indexes matched to the hot queries in routes.py: every collection
+    # read is scoped by owner_id and the grid is sorted newest-first.
+    # Keep in sync with the index migrations under migrations/versions
+    __table_args__ = (
+        db.Index('ix_card_owner_id_date_added', owner_id, date_added.desc()),
+        db.Index('ix_card_owner_id_player_name', owner_id, player_name),
+        db.Index('ix_card_owner_id_change_version', owner_id, change_version),
+        db.Index('ix_card_owner_id_player_id', owner_id, player_id),
+        db.Index('ix_card_owner_id_season_start', owner_id, season_start),
+    )
+
     def to_dict(self):
-        return {
-            'id': self.id,
-            'player_name': self.player_name,
-            'card_year': self.card_year,
-            'manufacturer': self.manufacturer,
-            'card_number': self.card_number,
-            'team': self.team,
-            'grade': self.grade,
-            'image_url': self.image_url,
-            'notes': self.notes,
-            'sport': self.sport,
-            'owner_id': self.owner_id,
-            'date_added': self.date_added.isoformat() if self.date_added else None
-        }
+        from .serializers import card_to_dict  # Imported lazily: serializers imports this module
+        data = card_to_dict(self, include_owner=True)
+        data['date_added'] = self.date_added.isoformat() if self.date_added else None
+        return data
 
     def __repr__(self):
         return f'<Card {self.card_year} {self.manufacturer} {self.player_name} {self.card_number or ""}>'
 
+class CatalogCard(db.Model):
+    """Canonical identity of one printed card, shared by every collector who owns it.
+
+    Created the first time an upload identifies the card; later uploads resolve
+    to it locally by image hash or by their parsed fields (see app.catalog).
+    """
+    id = db.Column(db.Integer, primary_key=True)
+    # season_start|manufacturer|card number|player, lowercased (catalog.catalog_identity)
+    identity_key = db.Column(db.String(300), unique=True, nullable=False)
+    player_name = db.Column(db.String(100), nullable=False)
+    card_year = db.Column(db.String(20), nullable=False)
+    season_start = db.Column(db.Integer, nullable=False)
+    manufacturer = db.Column(db.String(100), nullable=False)
+    card_number = db.Column(db.String(50), nullable=False)
+    team = db.Column(db.String(100))
+    sport = db.Column(db.String(50))
+    image_url = db.Column(db.String(500))
+    player_id = db.Column(db.Integer, db.ForeignKey('player.id'))
+    team_id = db.Column(db.Integer, db.ForeignKey('team.id'))
+    card_set_id = db.Column(db.Integer, db.ForeignKey('card_set.id'))
+    source = db.Column(db.String(20), nullable=False)  # How it was first identified: image/keyword/ocr/backfill
+    reuse_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')  # Uploads resolved locally
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    hashes = db.relationship('CatalogCardHash', back_populates='catalog_card', lazy='dynamic')
+
+    def __repr__(self):
+        return f'<CatalogCard {self.identity_key}>'
+
+class CatalogCardHash(db.Model):
+    """A representative pHash of a catalog card (up to CATALOG_MAX_HASHES per card)."""
+    id = db.Column(db.Integer, primary_key=True)
+    catalog_card_id = db.Column(db.Integer, db.ForeignKey('catalog_card.id'), nullable=False, index=True)
+    image_hash = db.Column(db.BigInteger, nullable=False)  # Signed, as Card.image_hash
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    catalog_card = db.relationship('CatalogCard', back_populates='hashes')
+
+    def __repr__(self):
+        return f'<CatalogCardHash {self.catalog_card_id}>'
+
+class MirroredImage(db.Model):
+    """A remote card image copied to IMAGE_MIRROR_FOLDER (see app.image_mirror).
+
+    The row outlives the file: an evicted image keeps its row and is fetched
+    again the next time it is requested.
+    """
+    id = db.Column(db.Integer, primary_key=True)
+    key = db.Column(db.String(32), unique=True, nullable=False)  # blake2b of source_url
+    source_url = db.Column(db.String(500), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='pending')  # pending/stored/failed
+    content_type = db.Column(db.String(50))
+    size = db.Column(db.Integer)  # Bytes, as last fetched
+    failures = db.Column(db.Integer, nullable=False, default=0, server_default='0')  # Consecutive failed fetches
+    last_error = db.Column(db.String(200))
+    fetched_at = db.Column(db.DateTime)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<MirroredImage {self.key} {self.status}>'
+
+class CardTombstone(db.Model):
+    """Record of a deleted card so delta-sync clients can drop their copy."""
+    id = db.Column(db.Integer, primary_key=True)
+    owner_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    card_id = db.Column(db.Integer, nullable=False)  # No FK: the card row is gone
+    change_version = db.Column(db.Integer, nullable=False)
+    deleted_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('ix_card_tombstone_owner_id_change_version', 'owner_id', 'change_version'),
+    )
+
+    def __repr__(self):
+        return f'<CardTombstone card={self.card_id} v{self.change_version}>'
+
+class MigrationCheckpoint(db.Model):
+    """Progress of a chunked data migration job (see app.migration_jobs)."""
+    id = db.Column(db.Integer, primary_key=True)
+    job_name = db.Column(db.String(100), unique=True, nullable=False)
+    last_id = db.Column(db.Integer, nullable=False, default=0)  # Highest primary key already processed
+    rows_scanned = db.Column(db.Integer, nullable=False, default=0)
+    rows_changed = db.Column(db.Integer, nullable=False, default=0)
+    status = db.Column(db.String(20), nullable=False, default='pending')  # pending/running/failed/completed
+    error = db.Column(db.Text)
+    started_at = db.Column(db.DateTime)
+    updated_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+
+    def __repr__(self):
+        return f'<MigrationCheckpoint {self.job_name} {self.status} @{self.last_id}>'
+
+class CardFacet(db.Model):
+    """Per-user count of cards sharing a distinct value of one card field.
+
+    Maintained incrementally by app.collection on every card write so that
+    /autocomplete-options and /cards/stats never have to scan the user's cards.
+    """
+    id = db.Column(db.Integer, primary_key=True)
+    owner_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    field = db.Column(db.String(32), nullable=False)  # A card column from app.collection.ROLLUP_SOURCE_FIELDS, or 'total'
+    value = db.Column(db.String(100), nullable=False)
+    # Lowercased value for prefix search; byte-wise collation on Postgres so that
+    # prefix ranges are plain index range scans.
+    value_key = db.Column(db.String(100).with_variant(db.String(100, collation='C'), 'postgresql'), nullable=False)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        db.UniqueConstraint('owner_id', 'field', 'value', name='uq_card_facet_owner_field_value'),
+        db.Index('ix_card_facet_owner_field_key', 'owner_id', 'field', 'value_key'),
+    )
+
+    def __repr__(self):
+        return f'<CardFacet {self.field}={self.value!r} x{self.count}>'
+
 # Potentially add Player and Team models here later for validation/enrichment
 
 class Team(db.Model):
@@ -0,0 +1,198 @@
+# backend/app/partitioning.py
+"""Optional conversion of `card` into a PostgreSQL table hash-partitioned on owner_id.
+
+Every hot query is scoped by owner_id, so with N partitions each query (and
+its indexes) touches one partition of ~1/N of the rows, and vacuum works on
+small heaps. The conversion runs online in three steps:
+
+    flask partition-cards prepare --partitions 16    # empty card_partitioned + indexes
+    flask migration-job card-partition-copy          # batched, resumable copy
+    flask partition-cards swap                       # short write lock: catch up + rename
+
+`swap` keeps the old heap as card_unpartitioned for rollback; remove it with
+`flask partition-cards drop-old` once the new table has been verified.
+
+PostgreSQL requires the partition key in the primary key, so the partitioned
+table's key is (id, owner_id); ids still come from card_id_seq and stay unique.
+"""
+from datetime import timedelta
+from sqlalchemy import select, text
+from sqlalchemy.dialects import postgresql
+from . import db
+from .models import Card
+
+PARTITIONED_TABLE = 'card_partitioned'
+OLD_TABLE = 'card_unpartitioned'
+COPY_JOB = 'card-partition-copy'
+# Rows stamped shortly before the copy started are re-synced at swap time too
+SWAP_SAFETY_MARGIN = timedelta(minutes=5)
+
+# Foreign keys of card (LIKE does not copy them)
+FOREIGN_KEYS = (
+    ('owner_id', '"user"'),
+    ('player_id', 'player'),
+    ('team_id', 'team'),
+    ('card_set_id', 'card_set'),
+    ('catalog_card_id', 'catalog_card'),
+)
+
+
+def _require_postgresql():
+    if db.engine.dialect.name != 'postgresql':
+        raise RuntimeError("Card partitioning is only available on PostgreSQL")
+
+
+def _table_exists(name):
+    return db.session.scalar(text("SELECT to_regclass(:name) IS NOT NULL"), {'name': name})
+
+
+def is_partitioned():
+    """True if `card` is already a partitioned table."""
+    return bool(db.session.scalar(text(
+        "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass('card'))"
+    )))
+
+
+def card_index_definitions():
+    """(name, column list SQL) for every index declared on the Card model.
+
+    Derived from Card.__table__ so the partitioned table always matches the model.
+    """
+    dialect = postgresql.dialect()
+    definitions = []
+    for index in sorted(Card.__table__.indexes, key=lambda index: index.name):
+        columns = ', '.join(str(expression.compile(dialect=dialect, compile_kwargs={'include_table': False}))
+                            for expression in index.expressions)
+        definitions.append((index.name, columns))
+    return definitions
+
+
+def prepare_partitioned_table(partitions):
+    """Creates the empty hash-partitioned copy of `card` with its indexes and foreign keys.
+
+    Indexes are created on the parent, so PostgreSQL builds a local index on
+    every partition. Also resets the copy job's checkpoint. Commits.
+    """
+    _require_postgresql()
+    if is_partitioned():
+        raise RuntimeError("card is already partitioned")
+    if _table_exists(PARTITIONED_TABLE):
+        raise RuntimeError(f"{PARTITIONED_TABLE} already exists; drop it to start over")
+
+    statements = [
+        f"CREATE TABLE {PARTITIONED_TABLE} (LIKE card INCLUDING DEFAULTS INCLUDING CONSTRAINTS, "
+        f"CONSTRAINT {PARTITIONED_TABLE}_pkey PRIMARY KEY (id, owner_id)) PARTITION BY HASH (owner_id)",
+    ]
+    statements += [
+        f"CREATE TABLE {PARTITIONED_TABLE}_p{remainder} PARTITION OF {PARTITIONED_TABLE} "
+        f"FOR VALUES WITH (MODULUS {partitions}, REMAINDER {remainder})"
+        for remainder in range(partitions)
+    ]
+    statements += [
+        f"CREATE INDEX {name}_part ON {PARTITIONED_TABLE} ({columns})"
+        for name, columns in card_index_definitions()
+    ]
+    statements += [
+        f"ALTER TABLE {PARTITIONED_TABLE} ADD FOREIGN KEY ({column}) REFERENCES {target} (id)"
+        for column, target in FOREIGN_KEYS
+    ]
+    for statement in statements:
+        db.session.execute(text(statement))
+
+    from .migration_jobs import get_checkpoint  # migration_jobs imports this module
+    checkpoint = get_checkpoint(COPY_JOB)
+    checkpoint.last_id = checkpoint.rows_scanned = checkpoint.rows_changed = 0
+    checkpoint.status, checkpoint.error, checkpoint.finished_at = 'pending', None, None
+    # The swap re-syncs every row changed after this moment
+    checkpoint.started_at = db.session.scalar(text("SELECT now() AT TIME ZONE 'utc'"))
+    db.session.commit()
+    return len(statements)
+
+
+def check_copy_target():
+    """Setup hook for the copy job: fails early when the target table is missing."""
+    _require_postgresql()
+    if not _table_exists(PARTITIONED_TABLE):
+        raise RuntimeError(f"{PARTITIONED_TABLE} does not exist; run 'flask partition-cards prepare' first")
+
+
+def copy_card_chunk(after_id, limit):
+    """Copies one keyset chunk of card rows into the partitioned table (migration job)."""
+    ids = db.session.scalars(select(Card.id).where(Card.id > after_id).order_by(Card.id).limit(limit)).all()
+    if not ids:
+        return None, 0, 0
+    # Upsert, so a restarted copy also refreshes rows copied by an earlier run
+    updates = ', '.join(f"{column.name} = EXCLUDED.{column.name}"
+                        for column in Card.__table__.columns if column.name not in ('id', 'owner_id'))
+    copied = db.session.execute(text(
+        f"INSERT INTO {PARTITIONED_TABLE} SELECT * FROM card WHERE id > :after_id AND id <= :last_id "
+        f"ON CONFLICT (id, owner_id) DO UPDATE SET {updates}"
+    ), {'after_id': after_id, 'last_id': ids[-1]}).rowcount
+    return ids[-1], len(ids), copied
+
+
+def swap_partitioned_table(lock_timeout_ms=10000):
+    """Catches the partitioned copy up with `card` and renames it into place.
+
+    Runs in one transaction holding an EXCLUSIVE lock on `card`: reads continue,
+    writes wait until the commit. Rows changed since the copy last started from
+    the first row (by updated_at) are re-copied, rows deleted since then (by
+    tombstone) are removed, and rows past the copy's last ID are inserted.
+
+    Returns:
+        dict: Row counts for the catch-up steps.
+    """
+    _require_postgresql()
+    from .models import MigrationCheckpoint
+    checkpoint = MigrationCheckpoint.query.filter_by(job_name=COPY_JOB).first()
+    if checkpoint is None or checkpoint.status != 'completed':
+        raise RuntimeError(f"Run 'flask migration-job {COPY_JOB}' to completion before swapping")
+    since = checkpoint.started_at - SWAP_SAFETY_MARGIN
+    params = {'since': since, 'last_id': checkpoint.last_id}
+
+    db.session.execute(text(f"SET LOCAL lock_timeout = {int(lock_timeout_ms)}"))
+    db.session.execute(text("LOCK TABLE card IN EXCLUSIVE MODE"))
+
+    counts = {}
+    counts['deleted'] = db.session.execute(text(
+        f"DELETE FROM {PARTITIONED_TABLE} p USING card_tombstone t "
+        f"WHERE t.deleted_at >= :since AND p.id = t.card_id AND p.owner_id = t.owner_id"
+    ), params).rowcount
+    counts['refreshed'] = db.session.execute(text(
+        f"DELETE FROM {PARTITIONED_TABLE} p USING card c "
+        f"WHERE c.updated_at >= :since AND p.id = c.id AND p.owner_id = c.owner_id"
+    ), params).rowcount
+    counts['inserted'] = db.session.execute(text(
+        f"INSERT INTO {PARTITIONED_TABLE} SELECT * FROM card WHERE updated_at >= :since OR id > :last_id "
+        f"ON CONFLICT DO NOTHING"
+    ), params).rowcount
+
+    # Sanity check before the rename: both tables must hold the same rows
+    old_count = db.session.scalar(text("SELECT count(*) FROM card"))
+    new_count = db.session.scalar(text(f"SELECT count(*) FROM {PARTITIONED_TABLE}"))
+    if old_count != new_count:
+        db.session.rollback()
+        raise RuntimeError(f"Row count mismatch after catch-up (card={old_count}, {PARTITIONED_TABLE}={new_count})")
+
+    statements = [f"ALTER TABLE card RENAME TO {OLD_TABLE}",
+                  f"ALTER INDEX card_pkey RENAME TO {OLD_TABLE}_pkey"]
+    for name, _ in card_index_definitions():
+        statements += [f"ALTER INDEX IF EXISTS {name} RENAME TO {name}_unpartitioned",
+                       f"ALTER INDEX {name}_part RENAME TO {name}"]
+    statements += [f"ALTER TABLE {PARTITIONED_TABLE} RENAME TO card",
+                   f"ALTER INDEX {PARTITIONED_TABLE}_pkey RENAME TO card_pkey",
+                   "ALTER SEQUENCE card_id_seq OWNED BY card.id"]
+    for statement in statements:
+        db.session.execute(text(statement))
+    db.session.commit()
+    counts['rows'] = new_count
+    return counts
+
+
+def drop_unpartitioned_table():
+    """Drops the pre-partitioning heap kept by swap_partitioned_table. Commits."""
+    _require_postgresql()
+    if not is_partitioned():
+        raise RuntimeError("card is not partitioned; refusing to drop the old table")
+    db.session.execute(text(f"DROP TABLE IF EXISTS {OLD_TABLE}"))
+    db.session.commit()
@@ -1,20 +1,55 @@
-from flask import current_app, jsonify, request, send_from_directory
+from flask import current_app, jsonify, request, send_from_directory, redirect, session
 from flask_login import login_user, logout_user, login_required, current_user
 from . import db
-from .models import User, Card, Player, Team
+from .models import User, Card, Player, Team, MirroredImage
 from werkzeug.utils import secure_filename
-from .auth import token_required
+from werkzeug.exceptions import RequestEntityTooLarge
+from .auth import token_required, issue_access_token, principal_cache, Principal, get_bearer_token
+from .engine import use_read_engine, pool_metrics
 import os
+import re
+import hmac
 from datetime import datetime, timezone
-from .image_utils import split_binder_page, split_binder_page_by_grid
-from .ebay_client import find_card_on_ebay
-from .services import map_ebay_result_to_card_data, save_card_from_data, format_season_year, parse_season_year
+from .image_utils import process_binder_page, check_image_dimensions
+from .image_pool import get_image_pool, ImagePoolBusy
+from .image_hash import image_phash
+from .thumbnails import make_thumbnails, thumbnail_settings, thumbnail_relpath, THUMBNAIL_FORMATS
+from .card_identification import identify_card, record_identification
+from .catalog import find_catalog_card
+from .image_mirror import get_image_mirror, register_card_images, queue_mirror_downloads, mirror_relpath
+from .services import save_card_from_data, build_card_fields, bulk_create_cards, bulk_update_cards, \
+    bulk_delete_cards, resolve_reference_ids, REFERENCE_SOURCE_FIELDS, CATALOG_IDENTITY_FIELDS
+from .serializers import select_card_rows, fetch_card_row, card_to_dict, make_card_response
+from .http_cache import make_etag, conditional_response
+from .collection import record_card_changes, get_collection_version, get_sync_bounds, get_card_version, \
+    get_card_changes, get_facet_options, search_facet_values, get_collection_stats, compute_collection_stats, \
+    CollectionOwnerMissing, SyncCursor, FACET_FIELDS, ROLLUP_SOURCE_FIELDS, FACET_RESPONSE_KEYS
 
 # Helper function for uploads
 def allowed_file(filename):
     return '.' in filename and \
            filename.rsplit('.', 1)[1].lower() in current_app.config['ALLOWED_EXTENSIONS']
 
+def reject_oversized_image(save_path):
+    """Checks a saved upload's header dimensions; removes the file and returns a 400 response if too large."""
+    error = check_image_dimensions(save_path, current_app.config['MAX_IMAGE_PIXELS'])
+    if error is None:
+        return None
+    os.remove(save_path)
+    print(f"Rejected upload {save_path}: {error}")
+    return jsonify({'error': error}), 400
+
+@current_app.errorhandler(RequestEntityTooLarge)
+def request_too_large(e):
+    limit_mb = (current_app.config.get('MAX_CONTENT_LENGTH') or 0) / (1024 * 1024)
+    return jsonify({'error': f'Upload too large (max {limit_mb:.0f} MB)'}), 413
+
+@current_app.errorhandler(CollectionOwnerMissing)
+def collection_owner_missing(e):
+    # A still-valid token of a deleted user; nothing it wrote is kept
+    db.session.rollback()
+    return jsonify({'error': 'User no longer exists'}), 401
+
 # This registers routes with the app created in __init__.py
 # If using Blueprints, you would import and register the Blueprint instead.
 
@@ -71,19 +106,10 @@ def login():
         print("Login failed due to user being None or password check failure.") # Debug
         return jsonify({'error': 'Invalid username or password'}), 401
 
-    # Generate JWT token
-    import jwt
-    import datetime
-    
-    # Create token with user ID and expiration
-    token_payload = {
-        'user_id': user.id,
-        'exp': datetime.datetime.utcnow() + datetime.timedelta(days=1)  # Token expires in 1 day
-    }
-    
-    # Sign the token with the app's secret key
-    token = jwt.encode(token_payload, current_app.config['SECRET_KEY'], algorithm='HS256')
-    
+    # Generate JWT token carrying the identity claims handlers need
+    token = issue_access_token(user)
+    principal_cache.set(Principal.from_user(user), current_app.config['PRINCIPAL_CACHE_TTL'])
+
     # Still use Flask-Login for session management (dual auth during migration)
     login_user(user) # Sets the session cookie
     
@@ -98,7 +124,11 @@ def login():
 @token_required
 def logout(current_user=None):
     # Still call logout_user for cookie-based auth compatibility
-    logout_user() # Clears the session cookie
+    logout_user()
+    # Bearer requests never load the cookie session (BearerTokenSessionInterface),
+    # so clear it explicitly: the response then deletes the session cookie
+    session.clear()
+    session.modified = True
     return jsonify({"message": "Logout successful"}), 200
 
 @current_app.route('/user', methods=['GET'])
@@ -133,24 +163,30 @@ def upload_single_card_image(current_user=None):
         try:
             file.save(save_path)
             print(f"Single card saved to: {save_path}")
+            rejected = reject_oversized_image(save_path)
+            if rejected:
+                return rejected
 
-            # --- eBay Lookup ---
-            print(f"DEBUG: Triggering eBay lookup for single card: {save_path}")
-            ebay_result = find_card_on_ebay(save_path)
-            print(f"DEBUG: eBay lookup result: {ebay_result}")
-
-            # --- Data Mapping ---
-            mapped_data = None
-            if ebay_result:
-                mapped_data = map_ebay_result_to_card_data(ebay_result)
+            # --- Identify: OCR pre-pass, then eBay keyword or image search ---
+            mapped_data, identification = identify_card(save_path, owner_id=user_id,
+                                                        image_hash=image_phash(save_path))
+            if mapped_data:
+                mapped_data['image_key'] = make_thumbnails(save_path, **thumbnail_settings(current_app.config))
+            print(f"DEBUG: Identification for single card: {identification}")
 
             # --- Save Card to DB ---
             newly_saved_card = None
             save_error = None
             if mapped_data:
+                record_identification(mapped_data, identification['source'])
+                added_images = register_card_images([mapped_data.get('image_url')])
                 newly_saved_card = save_card_from_data(mapped_data, user_id)
-                if not newly_saved_card:
+                if newly_saved_card:
+                    queue_mirror_downloads(added_images)
+                else:
                     save_error = "Failed to save mapped data to database."
+            elif identification['duplicate_of']:
+                save_error = f"Duplicate of card {identification['duplicate_of']}."
             else:
                 print("Could not map eBay data to card fields, skipping save.")
                 save_error = "Could not map eBay data to card fields."
@@ -170,8 +206,13 @@ def upload_single_card_image(current_user=None):
                 'message': response_message,
                 'filename': unique_filename,
                 'mapped_data': mapped_data,
-                'saved_card_id': newly_saved_card.id if newly_saved_card else None
+                'saved_card_id': newly_saved_card.id if newly_saved_card else None,
+                'identified_by': identification['source'],
+                'duplicate_of': identification['duplicate_of'],
+                'api_calls': identification['api_calls']
             }), response_status
+        except CollectionOwnerMissing:
+            raise
         except Exception as e:
             print(f"Error saving or processing single card file: {e}")
             # Consider adding more specific error logging here
@@ -198,66 +239,156 @@ def upload_binder_image(current_user=None):
 
         processed_cards_results = [] # Store results for each card
         errors = []
+        rejected_crops = [] # Crops triage found empty, blurry or glare-washed
+        failed_saves = [] # Identified cards whose DB save failed, one entry per crop
+        lookups_saved = 0
+        api_calls = {'keyword': 0, 'image': 0} # eBay searches made for this page
+        duplicates = [] # Crops matching a card already in the user's collection
 
         try:
             file.save(save_path)
             print(f"Binder page saved to: {save_path}")
+            rejected = reject_oversized_image(save_path)
+            if rejected:
+                return rejected
 
-            # --- Call GRID image splitting (with 3% crop) --- 
+            # --- Split into cards (with 3% crop) and triage, on the image pool ---
             base_filename = os.path.splitext(unique_filename)[0]
             split_output_dir = os.path.join(current_app.config['UPLOAD_FOLDER'], base_filename + '_cards')
-            extracted_card_paths = split_binder_page_by_grid(save_path, split_output_dir, inner_crop_percent=3)
+            split_method = current_app.config.get('BINDER_SPLIT_METHOD', 'grid')
+            # Triage: report (flag) or skip crops that cannot be identified before paying for a lookup
+            triage_mode = current_app.config.get('CROP_TRIAGE', 'flag')
+            triage = None if triage_mode == 'off' else {
+                'min_edge_density': current_app.config['TRIAGE_MIN_EDGE_DENSITY'],
+                'min_sharpness': current_app.config['TRIAGE_MIN_SHARPNESS'],
+                'max_clipped': current_app.config['TRIAGE_MAX_CLIPPED'],
+            }
+            try:
+                extracted_card_paths, usable, rejected_crops, crops, peak_rss = get_image_pool().run(
+                    process_binder_page, save_path, split_output_dir, method=split_method,
+                    inner_crop_percent=3, triage=triage,
+                    decode_max_side=current_app.config.get('BINDER_DECODE_MAX_SIDE', 0),
+                    thumbnails=thumbnail_settings(current_app.config))
+            except ImagePoolBusy:
+                response = jsonify({'error': 'Image processing is busy, please retry shortly'})
+                response.headers['Retry-After'] = '5'
+                return response, 503
+
+            if peak_rss is not None:
+                print(f"Binder page image work peaked at {peak_rss:.0f} MB RSS")
 
             if not extracted_card_paths:
-                errors.append("Failed to extract any cards from the binder page image (using grid method).")
+                errors.append(f"Failed to extract any cards from the binder page image (using {split_method} method).")
             else:
                 print(f"Extracted {len(extracted_card_paths)} potential card images. Processing each...")
+                cards_to_look_up = list(enumerate(extracted_card_paths, start=1))
+                if triage is not None:
+                    if triage_mode == 'skip':
+                        cards_to_look_up = usable
+                        lookups_saved = len(rejected_crops)
+                    print(f"Triage ({triage_mode}): {len(rejected_crops)} of {len(extracted_card_paths)} crops "
+                          f"rejected, {lookups_saved} eBay lookups saved")
+
                 # --- Process Each Extracted Card Synchronously ---
-                for i, card_path in enumerate(extracted_card_paths):
-                    print(f"--- Processing card {i+1} from {card_path} ---")
+                pending_cards = [] # (card number, source path, mapped data, source) saved in one transaction below
+                for card_number, card_path in cards_to_look_up:
+                    print(f"--- Processing card {card_number} from {card_path} ---")
                     try:
-                        # 1. eBay Lookup
-                        ebay_result = find_card_on_ebay(card_path)
-                        if not ebay_result:
-                            errors.append(f"Card {i+1}: eBay lookup failed.")
-                            continue
-
-                        # 2. Data Mapping
-                        mapped_data = map_ebay_result_to_card_data(ebay_result)
+                        # 1. Identify: OCR pre-pass, then eBay keyword or image search
+                        crop = crops.get(card_path, {})
+                        mapped_data, identification = identify_card(card_path, owner_id=user_id,
+                                                                    image_hash=crop.get('image_hash'))
+                        for kind, calls in identification['api_calls'].items():
+                            api_calls[kind] += calls
+                        if identification['duplicate_of']:
+                            duplicates.append({'card': card_number,
+                                               'duplicate_of': identification['duplicate_of'],
+                                               'distance': identification['hash_distance'],
+                                               'action': 'reused' if mapped_data else 'skipped'})
+                            if not mapped_data:
+                                continue
                         if not mapped_data:
-                            errors.append(f"Card {i+1}: Failed to map data from eBay result.")
+                            errors.append(f"Card {card_number}: Could not identify card "
+                                          f"({identification['source']} lookup).")
                             continue
 
-                        # 3. Save to DB
-                        newly_saved_card = save_card_from_data(mapped_data, user_id)
-                        if newly_saved_card:
-                            processed_cards_results.append({
-                                'source_image': os.path.basename(card_path),
-                                'saved_card_id': newly_saved_card.id,
-                                'player_name': newly_saved_card.player_name
-                            })
-                        else:
-                            errors.append(f"Card {i+1}: Failed to save mapped data to database.")
+                        mapped_data['image_key'] = crop.get('image_key')
+                        pending_cards.append((card_number, card_path, mapped_data, identification['source']))
 
                     except Exception as card_e:
-                        error_msg = f"Card {i+1}: Unexpected error during processing: {card_e}"
+                        error_msg = f"Card {card_number}: Unexpected error during processing: {card_e}"
                         print(error_msg)
                         errors.append(error_msg)
                 # --- End Processing Loop ---
 
+                # 3. Save the page with one commit; each card gets its own savepoint so a
+                #    bad card is reported and skipped without losing the rest of the page
+                page_results = []
+                saved_images = []
+                for card_number, card_path, mapped_data, source in pending_cards:
+                    try:
+                        with db.session.begin_nested():
+                            # Catalog writes wait until here so no eBay call runs inside the transaction
+                            record_identification(mapped_data, source)
+                            newly_saved_card = save_card_from_data(mapped_data, user_id, commit=False)
+                    except CollectionOwnerMissing:
+                        raise
+                    except Exception as save_e:
+                        newly_saved_card, save_error = None, str(save_e)
+                    else:
+                        save_error = 'Missing required fields'
+                    if not newly_saved_card:
+                        error_msg = f"Card {card_number}: Failed to save mapped data to database: {save_error}"
+                        print(error_msg)
+                        errors.append(error_msg)
+                        failed_saves.append({'card': card_number, 'source_image': os.path.basename(card_path),
+                                             'error': save_error})
+                        continue
+                    page_results.append({
+                        'source_image': os.path.basename(card_path),
+                        'saved_card_id': newly_saved_card.id,
+                        'player_name': newly_saved_card.player_name,
+                        'identified_by': source,
+                        'catalog_card_id': newly_saved_card.catalog_card_id
+                    })
+                    if newly_saved_card.image_url:
+                        saved_images.append(newly_saved_card.image_url)
+                try:
+                    added_images = register_card_images(saved_images)
+                    db.session.commit()
+                    processed_cards_results.extend(page_results)
+                    queue_mirror_downloads(added_images)
+                except CollectionOwnerMissing:
+                    raise
+                except Exception as save_e:
+                    db.session.rollback()
+                    error_msg = f"Failed to save cards from binder page: {save_e}"
+                    print(error_msg)
+                    errors.append(error_msg)
+
             # Construct final response
             response_status = 201 if processed_cards_results else (202 if errors else 200)
             response_message = f"Binder processing complete. Saved {len(processed_cards_results)} cards."
             if errors:
                 response_message += f" Encountered {len(errors)} errors."
+            if lookups_saved:
+                response_message += f" Skipped {lookups_saved} unusable crops."
 
             return jsonify({
                 'message': response_message,
                 'original_filename': unique_filename,
                 'saved_cards': processed_cards_results,
-                'processing_errors': errors
+                'processing_errors': errors,
+                'rejected_crops': rejected_crops,
+                'failed_saves': failed_saves,
+                'lookups_saved': lookups_saved,
+                'api_calls': api_calls,
+                'duplicates': duplicates,
+                'peak_rss_mb': round(peak_rss, 1) if peak_rss is not None else None
             }), response_status
 
+        except CollectionOwnerMissing:
+            raise
         except Exception as e:
             # Handle exceptions during initial save or overall process
             print(f"Error saving or processing binder file: {e}")
@@ -265,10 +396,83 @@ def upload_binder_image(current_user=None):
     else:
         return jsonify({'error': 'File type not allowed'}), 400
 
+# --- Card Thumbnails ---
+
+THUMBNAIL_KEY_PATTERN = re.compile(r'[0-9a-f]{32}')
+
+@current_app.route('/thumbnails/<key>/<int:width>.<extension>', methods=['GET'])
+def get_thumbnail(key, width, extension):
+    """Serves a card crop thumbnail.
+
+    Public (keys are unguessable content hashes) and immutable, so it is cached
+    for THUMBNAIL_MAX_AGE without revalidation. Range requests and ETag/
+    If-Modified-Since revalidation are answered by send_file, or by the front
+    web server when THUMBNAIL_OFFLOAD hands it the file.
+    """
+    config = current_app.config
+    if (not THUMBNAIL_KEY_PATTERN.fullmatch(key) or width not in config['THUMBNAIL_SIZES']
+            or extension not in config['THUMBNAIL_FORMATS']):
+        return jsonify({'error': 'Thumbnail not found'}), 404
+    relpath = thumbnail_relpath(key, width, extension)
+    path = os.path.join(config['THUMBNAIL_FOLDER'], relpath)
+    if not os.path.isfile(path):
+        return jsonify({'error': 'Thumbnail not found'}), 404
+
+    mimetype = THUMBNAIL_FORMATS[extension][0]
+    etag = f"{key}-{width}-{extension}" # The content never changes for a given URL
+    if config.get('THUMBNAIL_OFFLOAD') == 'x-accel-redirect':
+        if request.if_none_match.contains(etag):
+            response = current_app.response_class(status=304)
+        else:
+            # nginx sends the file (ranges included) from its internal location
+            response = current_app.response_class(mimetype=mimetype)
+            response.headers['X-Accel-Redirect'] = config['THUMBNAIL_ACCEL_PREFIX'] + relpath
+        response.set_etag(etag)
+    else:
+        # USE_X_SENDFILE (THUMBNAIL_OFFLOAD='x-sendfile') makes this an X-Sendfile header
+        response = send_from_directory(config['THUMBNAIL_FOLDER'], relpath, mimetype=mimetype,
+                                       etag=etag, conditional=True)
+    response.headers['Cache-Control'] = f"public, max-age={config['THUMBNAIL_MAX_AGE']}, immutable"
+    return response
+
+MIRROR_KEY_PATTERN = re.compile(r'[0-9a-f]{32}')
+
+@current_app.route('/mirror/<key>', methods=['GET'])
+def get_mirrored_image(key):
+    """Serves the local copy of a card's remote image (image_mirror_url).
+
+    Public like the eBay URL it stands for. The file is cached for
+    IMAGE_MIRROR_MAX_AGE; until it is on disk, or after it was evicted, the
+    client is redirected to the source and the download is queued.
+    """
+    config = current_app.config
+    image = (MirroredImage.query.filter_by(key=key).first()
+             if config['IMAGE_MIRROR'] and MIRROR_KEY_PATTERN.fullmatch(key) else None)
+    if image is None:
+        return jsonify({'error': 'Image not found'}), 404
+
+    mirror = get_image_mirror()
+    if image.status == 'stored':
+        relpath = mirror_relpath(key, image.content_type)
+        path = os.path.join(config['IMAGE_MIRROR_FOLDER'], relpath)
+        if os.path.isfile(path):
+            mirror.touch(path)
+            response = send_from_directory(config['IMAGE_MIRROR_FOLDER'], relpath, mimetype=image.content_type,
+                                           etag=f"{key}-{image.size}", conditional=True)
+            response.headers['Cache-Control'] = f"public, max-age={config['IMAGE_MIRROR_MAX_AGE']}"
+            return response
+
+    if image.failures < config['IMAGE_MIRROR_MAX_FAILURES']:
+        mirror.enqueue(key, image.source_url)
+    response = redirect(image.source_url, 302)
+    response.headers['Cache-Control'] = 'no-store' # Come back for the local copy next time
+    return response
+
 # --- Card Management Routes (Flask-Login) ---
 
 @current_app.route('/cards', methods=['GET'])
 @token_required  # Use our custom JWT token decorator
+@use_read_engine
 def get_cards(current_user=None):
     # The token_required decorator already handles authentication and passes the user
     
@@ -276,34 +480,23 @@ def get_cards(current_user=None):
     print(f"User authenticated successfully, ID: {current_user.id}")
 
     user_id = current_user.id
-    user = User.query.get(user_id)
-    if not user:
-        print(f"User not found for ID: {user_id}")
-        return jsonify({"error": "User not found"}), 404 # Should not happen if auth is correct
 
-    # Using the relationship (lazy='dynamic' requires .all())
+    # Optional season range/sort: ?season_from=2015&season_to=2019-20&sort=-season
+    criteria, order_by, error = _card_list_query(user_id)
+    if error:
+        return jsonify({'error': error}), 400
+
+    # The authenticated principal is enough to scope the query; no User lookup needed
     try:
-        user_cards = user.cards.order_by(Card.date_added.desc()).all()
-
-        # Serialize the list of cards
-        cards_list = []
-        for card in user_cards:
-            cards_list.append({
-                'id': card.id,
-                'player_name': card.player_name,
-                'card_year': card.card_year,  # Use the string directly from DB
-                'manufacturer': card.manufacturer,
-                'card_number': card.card_number,
-                'team': card.team,
-                'grade': card.grade,
-                'image_url': card.image_url,
-                'date_added': card.date_added.isoformat(),
-                'notes': card.notes,
-                'sport': card.sport
-            })
-
-        print(f"Returning {len(cards_list)} cards for user {user_id}")
-        return jsonify(cards_list), 200
+        # Unchanged collection -> 304 without touching the card table
+        version, updated_at = get_collection_version(user_id)
+
+        def build_response():
+            cards_list = select_card_rows(*criteria, order_by=order_by)
+            print(f"Returning {len(cards_list)} cards for user {user_id}")
+            return make_card_response(cards_list, 200)
+
+        return conditional_response(make_etag('cards', user_id, version), updated_at, build_response)
     except Exception as e:
         # Print the full traceback to the backend console for debugging
         import traceback
@@ -311,6 +504,42 @@ def get_cards(current_user=None):
         traceback.print_exc() # Add this for detailed error logging
         return jsonify({"error": "Internal server error while fetching cards"}), 500
 
+# ?sort= values for GET /cards; each is served in (owner_id, ...) index order
+CARD_SORTS = {
+    'date_added': Card.date_added.asc(),
+    '-date_added': Card.date_added.desc(),
+    'season': Card.season_start.asc(),
+    '-season': Card.season_start.desc(),
+}
+
+def _parse_season_param(value):
+    """Season filter bound: a start year ('2019') or a season ('2019-20'). Returns None if invalid."""
+    if re.fullmatch(r'\d{4}', value):
+        return int(value)
+    if re.fullmatch(r'\d{4}-\d{2}', value):
+        return int(value[:4])
+    return None
+
+def _card_list_query(user_id):
+    """Turns GET /cards query arguments into (criteria, order_by, error)."""
+    criteria = [Card.owner_id == user_id]
+    for name in ('season_from', 'season_to'):
+        value = request.args.get(name)
+        if value is None:
+            continue
+        season_start = _parse_season_param(value)
+        if season_start is None:
+            return None, None, f"Invalid {name} '{value}'. Expected a year (2019) or a season (2019-20)"
+        if name == 'season_from':
+            criteria.append(Card.season_start >= season_start)
+        else:
+            criteria.append(Card.season_start <= season_start)
+
+    sort = request.args.get('sort', '-date_added')
+    if sort not in CARD_SORTS:
+        return None, None, f"Invalid sort '{sort}'. Expected one of: {', '.join(CARD_SORTS)}"
+    return criteria, CARD_SORTS[sort], None
+
 @current_app.route('/cards', methods=['POST'])
 @token_required
 def create_card(current_user=None):
@@ -319,78 +548,143 @@ def create_card(current_user=None):
     if not data or not data.get('player_name'):
         return jsonify({'error': 'Missing required card data (player_name)'}), 400
 
-    # Extract card details from request data
-    player_name = data.get('player_name')
-    card_year = parse_season_year(data.get('card_year'))
-    manufacturer = data.get('manufacturer')
-    card_number = data.get('card_number')
-    team = data.get('team')
-    grade = data.get('grade')
-    image_url = data.get('image_url')
-    notes = data.get('notes', '')
-    sport = data.get('sport')
-
-    # Validate required fields
-    if not all([player_name, card_year, manufacturer, card_number, team]):
-        return jsonify({'error': 'Missing required fields'}), 400
-
-    # Create new card
-    new_card = Card(
-        player_name=player_name,
-        card_year=card_year,
-        manufacturer=manufacturer,
-        card_number=card_number,
-        team=team,
-        grade=grade,
-        image_url=image_url,
-        notes=notes,
-        sport=sport,
-        owner_id=current_user.id,
-        date_added=datetime.utcnow()
-    )
+    fields, error = build_card_fields(data)
+    if error:
+        return jsonify({'error': error}), 400
+
+    # Create new card, linked to its catalog entry when one exists
+    catalog_card = find_catalog_card(fields)
+    new_card = Card(owner_id=current_user.id, date_added=datetime.utcnow(),
+                    catalog_card_id=catalog_card.id if catalog_card else None, **fields)
+    db.session.add(new_card)
+    record_card_changes(current_user.id, added=[new_card])
+    added_images = register_card_images([new_card.image_url])
+    db.session.commit()
+    queue_mirror_downloads(added_images)
 
     # Return card data in response
-    card_data = {
-        'id': new_card.id,
-        'player_name': new_card.player_name,
-        'card_year': format_season_year(new_card.card_year),
-        'manufacturer': new_card.manufacturer,
-        'card_number': new_card.card_number,
-        'team': new_card.team,
-        'grade': new_card.grade,
-        'image_url': new_card.image_url,
-        'date_added': new_card.date_added.isoformat(),
-        'notes': new_card.notes,
-        'sport': new_card.sport
-    }
-    return jsonify(card_data), 201 # 201 Created
+    return make_card_response(card_to_dict(new_card), 201) # 201 Created
+
+@current_app.route('/cards/bulk', methods=['POST'])
+@token_required
+def bulk_cards(current_user=None):
+    """Applies many card creates, patches and deletes in a single transaction.
+
+    Body: {"create": [{card fields}], "update": [{"id": 1, <fields>}], "delete": [1, 2]}
+    Each section is optional. Every item gets its own status entry; invalid items
+    are skipped without affecting the rest of the batch.
+    """
+    user_id = current_user.id
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({'error': 'Expected an object with create/update/delete arrays'}), 400
+
+    creates = data.get('create') or []
+    patches = data.get('update') or []
+    deletes = data.get('delete') or []
+    if not all(isinstance(section, list) for section in (creates, patches, deletes)):
+        return jsonify({'error': 'create, update and delete must be arrays'}), 400
+
+    max_items = current_app.config['BULK_MAX_ITEMS']
+    if len(creates) + len(patches) + len(deletes) > max_items:
+        return jsonify({'error': f'Too many items in one batch (max {max_items})'}), 413
+
+    try:
+        results = {
+            'created': bulk_create_cards(user_id, creates),
+            'updated': bulk_update_cards(user_id, patches),
+            'deleted': bulk_delete_cards(user_id, deletes),
+        }
+        added_images = register_card_images([item.get('image_url')
+                                             for items, section in ((creates, 'created'), (patches, 'updated'))
+                                             for item, result in zip(items, results[section])
+                                             if result['status'] < 400 and isinstance(item, dict)])
+        db.session.commit()
+    except CollectionOwnerMissing:
+        raise
+    except Exception as e:
+        db.session.rollback()
+        print(f"Error applying bulk card changes: {e}")
+        return jsonify({'error': 'Internal server error while applying bulk changes'}), 500
+    queue_mirror_downloads(added_images)
+
+    statuses = [item['status'] for section in results.values() for item in section]
+    failed = sum(1 for status in statuses if status >= 400)
+    # 207 Multi-Status when only part of the batch was applied
+    response_status = 200 if not failed else (400 if failed == len(statuses) else 207)
+    return jsonify(results), response_status
+
+@current_app.route('/cards/changes', methods=['GET'])
+@token_required
+@use_read_engine
+def get_card_changes_since(current_user=None):
+    """Delta sync: cards upserted and deleted since the client's cursor.
+
+    Query: ?since=<cursor>&limit=<n>. A missing or zero cursor pages through the
+    whole collection. Follow-up pages use the returned cursor while has_more is
+    true; pages hold at most `limit` changes and may end part-way through a
+    version. 410 means the cursor can no longer be answered and the client must resync.
+    """
+    user_id = current_user.id
+    limit = max(1, min(request.args.get('limit', 500, type=int), 5000))
+    cursor = SyncCursor.parse(request.args.get('since', '0'))
+    if cursor is None:
+        return jsonify({'error': 'Invalid cursor'}), 400
+
+    version, floor = get_sync_bounds(user_id)
+    if cursor.version == 0 and cursor.card_id is None:
+        cursor = SyncCursor.full(version)
+    elif cursor.version > version or cursor.guard < floor:
+        return jsonify({'error': 'Cursor expired, full resync required', 'cursor': str(version)}), 410
+    elif cursor.version == version and cursor.card_id is None:
+        # Steady state: nothing changed
+        return make_card_response({'cursor': str(version), 'has_more': False, 'upserts': [], 'deletes': []})
+
+    cards, deleted, cursor, has_more = get_card_changes(user_id, cursor, limit)
+    return make_card_response({'cursor': str(cursor), 'has_more': has_more, 'upserts': cards, 'deletes': deleted})
+
+@current_app.route('/cards/stats', methods=['GET'])
+@token_required
+@use_read_engine
+def get_card_stats(current_user=None):
+    """Counts by team, season, manufacturer and grade plus collection totals.
+
+    Served from the card_facet rollups (memoized per collection version);
+    ?source=live recomputes them with GROUP BY over the card table instead.
+    """
+    user_id = current_user.id
+    try:
+        version, updated_at = get_collection_version(user_id)
+
+        def build_response():
+            if request.args.get('source') == 'live':
+                return make_card_response(compute_collection_stats(user_id, version))
+            return make_card_response(get_collection_stats(user_id, version))
+
+        return conditional_response(make_etag('stats', user_id, version), updated_at, build_response)
+    except Exception as e:
+        print(f"Error computing collection stats: {e}")
+        return jsonify({"error": "Internal server error while computing collection stats"}), 500
 
 @current_app.route('/cards/<int:card_id>', methods=['GET'])
 @token_required
+@use_read_engine
 def get_card(card_id, current_user=None):
     user_id = current_user.id # Use Flask-Login proxy
-    card = Card.query.get_or_404(card_id)
-
-    # TODO: Add ownership check
-    if card.owner_id != user_id:
-        return jsonify({"error": "Not authorized to view this card"}), 403 # Forbidden
 
     # Serialize the card data
     try:
-        card_data = {
-            'id': card.id,
-            'player_name': card.player_name,
-            'card_year': card.card_year,  # Use the string directly from DB (already 'YYYY-YY' format)
-            'manufacturer': card.manufacturer,
-            'card_number': card.card_number,
-            'team': card.team,
-            'grade': card.grade,
-            'image_url': card.image_url,
-            'date_added': card.date_added.isoformat(),
-            'notes': card.notes,
-            'sport': card.sport
-        }
-        return jsonify(card_data), 200
+        # Validators come from the card's own change stamp; a hit costs one PK lookup
+        card_version = get_card_version(card_id)
+        if card_version is None:
+            return jsonify({"error": "Card not found"}), 404
+        owner_id, change_version, updated_at = card_version
+
+        if owner_id != user_id:
+            return jsonify({"error": "Not authorized to view this card"}), 403 # Forbidden
+
+        return conditional_response(make_etag('card', card_id, change_version), updated_at,
+                                    lambda: make_card_response(fetch_card_row(card_id)[1], 200))
     except Exception as e:
         import traceback
         print(f"Error fetching single card (ID: {card_id}): {e}")
@@ -403,47 +697,39 @@ def update_card(card_id, current_user=None):
     user_id = current_user.id # Use Flask-Login proxy
     card = Card.query.get_or_404(card_id)
 
-    # TODO: Add ownership check
     if card.owner_id != user_id:
         return jsonify({"error": "Not authorized to modify this card"}), 403 # Forbidden
 
     data = request.get_json()
     if not data:
         return jsonify({"error": "No update data provided"}), 400
+    fields, error = build_card_fields(data, partial=True)
+    if error:
+        return jsonify({'error': error}), 400
 
-    # Update fields if they are provided in the request data
-    card.player_name = data.get('player_name', card.player_name)
-    
-    # Handle card_year conversion from YYYY-YY to integer
-    if 'card_year' in data:
-        card.card_year = parse_season_year(data['card_year'])
-    
-    card.manufacturer = data.get('manufacturer', card.manufacturer)
-    card.card_number = data.get('card_number', card.card_number)
-    card.team = data.get('team', card.team)
-    card.grade = data.get('grade', card.grade)
-    card.image_url = data.get('image_url', card.image_url)
-    card.notes = data.get('notes', card.notes)
-    card.sport = data.get('sport', card.sport)
+    # Snapshot rolled-up values so the autocomplete/stats counts can be adjusted
+    previous_values = {field: getattr(card, field) for field in ROLLUP_SOURCE_FIELDS}
+    previous_image_url = card.image_url
+
+    # Only the supplied fields change; card_year also sets season_start
+    for column, value in fields.items():
+        setattr(card, column, value)
     # owner_id and date_added should generally not be updated here
 
+    reference_ids = resolve_reference_ids({field: getattr(card, field) for field in REFERENCE_SOURCE_FIELDS})
+    for column, value in reference_ids.items():
+        setattr(card, column, value)
+    if CATALOG_IDENTITY_FIELDS.intersection(fields):
+        catalog_card = find_catalog_card(card)
+        card.catalog_card_id = catalog_card.id if catalog_card else None
+
+    record_card_changes(user_id, removed=[previous_values], added=[card])
+    added_images = register_card_images([card.image_url]) if card.image_url != previous_image_url else {}
     db.session.commit()
+    queue_mirror_downloads(added_images)
 
     # Return updated card data
-    card_data = {
-        'id': card.id,
-        'player_name': card.player_name,
-        'card_year': format_season_year(card.card_year),  # Convert to YYYY-YY format
-        'manufacturer': card.manufacturer,
-        'card_number': card.card_number,
-        'team': card.team,
-        'grade': card.grade,
-        'image_url': card.image_url,
-        'date_added': card.date_added.isoformat(),
-        'notes': card.notes,
-        'sport': card.sport
-    }
-    return jsonify(card_data), 200
+    return make_card_response(card_to_dict(card), 200)
 
 @current_app.route('/cards/<int:card_id>', methods=['DELETE'])
 @token_required
@@ -451,44 +737,71 @@ def delete_card(card_id, current_user=None):
     user_id = current_user.id
     card = Card.query.get_or_404(card_id)
 
-    # TODO: Add ownership check
     if card.owner_id != user_id:
         return jsonify({"error": "Not authorized to delete this card"}), 403 # Forbidden
 
+    record_card_changes(user_id, removed=[card], deleted_ids=[card.id])
     db.session.delete(card)
     db.session.commit()
 
     return jsonify({"message": "Card deleted successfully"}), 200
 
+@current_app.route('/metrics/db-pool', methods=['GET'])
+def get_db_pool_metrics():
+    """Connection pool sizing, saturation and checkout wait times per engine.
+
+    Disabled unless METRICS_ENABLED; when METRICS_TOKEN is set the scraper
+    must send it as a bearer token.
+    """
+    config = current_app.config
+    if not config.get('METRICS_ENABLED'):
+        return jsonify({'error': 'Not found'}), 404
+    if config.get('METRICS_TOKEN') and not hmac.compare_digest(get_bearer_token(request) or '',
+                                                               config['METRICS_TOKEN']):
+        return jsonify({'error': 'Authentication required'}), 401
+    response = jsonify(pool_metrics(db.engines))
+    response.headers['Cache-Control'] = 'no-store'
+    return response
+
 @current_app.route('/autocomplete-options', methods=['GET'])
 @token_required
+@use_read_engine
 def get_autocomplete_options(current_user=None):
     user_id = current_user.id
-    
+    field = request.args.get('field')
+
     try:
-        # Get all cards for the current user
-        user_cards = Card.query.filter_by(owner_id=user_id).all()
-        
-        # Extract unique values for each field
-        player_names = sorted(list(set(card.player_name for card in user_cards if card.player_name)))
-        manufacturers = sorted(list(set(card.manufacturer for card in user_cards if card.manufacturer)))
-        teams = sorted(list(set(card.team for card in user_cards if card.team)))
-        grades = sorted(list(set(card.grade for card in user_cards if card.grade)))
-        
-        # Add some common grade options if not already present
-        common_grades = ["Raw", "PSA 10", "PSA 9", "PSA 8", "PSA 7", "BGS 10", "BGS 9.5", "BGS 9", "SGC 10", "SGC 9"]
-        for grade in common_grades:
-            if grade not in grades:
-                grades.append(grade)
-        
-        return jsonify({
-            'player_names': player_names,
-            'manufacturers': manufacturers,
-            'teams': teams,
-            'grades': grades
-        }), 200
+        version, updated_at = get_collection_version(user_id)
+        etag = make_etag('facets', user_id, version)
+        return conditional_response(etag, updated_at, lambda: _autocomplete_options(user_id, field))
     except Exception as e:
         print(f"Error fetching autocomplete options: {e}")
         return jsonify({"error": "Internal server error while fetching autocomplete options"}), 500
 
+def _autocomplete_options(user_id, field):
+    """Builds the /autocomplete-options payload from the facet table."""
+    # Prefix search on a single field: ?field=player_name&prefix=Ja
+    if field:
+        if field not in FACET_FIELDS:
+            return jsonify({'error': f"Unknown field '{field}'. Expected one of: {', '.join(FACET_FIELDS)}"}), 400
+        limit = max(1, min(request.args.get('limit', 20, type=int), 100))
+        prefix = request.args.get('prefix', '')
+        return jsonify({
+            'field': field,
+            'prefix': prefix,
+            'values': search_facet_values(user_id, field, prefix, limit)
+        }), 200
+
+    # Distinct values for every field, read from the facet table
+    options = get_facet_options(user_id)
+    grades = options['grade']
+
+    # Add some common grade options if not already present
+    common_grades = ["Raw", "PSA 10", "PSA 9", "PSA 8", "PSA 7", "BGS 10", "BGS 9.5", "BGS 9", "SGC 10", "SGC 9"]
+    for grade in common_grades:
+        if grade not in grades:
+            grades.append(grade)
+
+    return jsonify({FACET_RESPONSE_KEYS[f]: values for f, values in options.items()}), 200
+
 # Add more routes here as needed 
\ No newline at end of file
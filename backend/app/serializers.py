@@ -0,0 +1,161 @@
+# backend/app/serializers.py
+"""Single serialization path for Card payloads.
+
+Rows are built straight from selected column tuples (no ORM hydration) and
+encoded with orjson when it is installed. Player and team names are the card's
+stored columns, the same values facets, stats and ETags are built from.
+image_mirror_url is set for images registered with the image mirror. Clients
+that send `Accept: application/msgpack` get MessagePack instead of JSON.
+"""
+import json
+from datetime import date, datetime
+from flask import Response, request
+from sqlalchemy import select
+from . import db
+from .models import Card
+from .image_mirror import registered_mirror_paths
+
+# Optional fast encoders; fall back to the standard library when missing
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+MSGPACK_MIMETYPES = ('application/msgpack', 'application/x-msgpack')
+
+# Public card fields, in response order
+CARD_FIELDS = ('id', 'player_name', 'card_year', 'manufacturer', 'card_number', 'team',
+               'grade', 'image_url', 'date_added', 'updated_at', 'notes', 'sport',
+               'season_start', 'player_id', 'team_id', 'card_set_id', 'catalog_card_id',
+               'image_key')
+
+CARD_COLUMNS = tuple(getattr(Card, field) for field in CARD_FIELDS)
+CARD_SOURCE = Card.__table__
+_CARD_YEAR_INDEX = CARD_FIELDS.index('card_year')
+_SEASON_START_INDEX = CARD_FIELDS.index('season_start')
+
+
+def format_season(season_start):
+    """Formats a season start year as 'YYYY-YY' (2023 -> '2023-24')."""
+    return f"{season_start}-{(season_start + 1) % 100:02d}"
+
+
+def format_card_year(value):
+    """Returns card_year in 'YYYY-YY' form whether it was stored as a season or a plain end year."""
+    if value is None:
+        return None
+    value = str(value)
+    if value.isdigit():
+        year = int(value)
+        return f"{year - 1}-{str(year)[-2:]}"
+    return value
+
+
+def card_row_to_dict(row):
+    """Builds the public dict for one row of CARD_COLUMNS values.
+
+    date_added is left as a datetime; the encoders emit it in ISO 8601.
+    image_mirror_url starts as None; add_mirror_urls fills it in.
+    """
+    card = dict(zip(CARD_FIELDS, row))
+    season_start = row[_SEASON_START_INDEX]
+    if season_start is not None:
+        card['card_year'] = format_season(season_start)
+    else:
+        # Legacy value that could not be parsed into a season
+        card['card_year'] = format_card_year(row[_CARD_YEAR_INDEX])
+    card['image_mirror_url'] = None
+    return card
+
+
+def add_mirror_urls(cards):
+    """Sets image_mirror_url on card dicts whose image_url has a local copy (app.image_mirror).
+
+    image_url stays the source URL. Looks the images up by mirror key, and
+    not at all when mirroring is off.
+    """
+    paths = registered_mirror_paths(card['image_url'] for card in cards)
+    if paths:
+        for card in cards:
+            card['image_mirror_url'] = paths.get(card['image_url'])
+    return cards
+
+
+def card_to_dict(card, include_owner=False):
+    """Builds the public dict for an already loaded Card instance."""
+    data = add_mirror_urls([card_row_to_dict(tuple(getattr(card, field) for field in CARD_FIELDS))])[0]
+    if include_owner:
+        data['owner_id'] = card.owner_id
+    return data
+
+
+def card_rows_statement(*criteria, order_by=None):
+    """Builds the column-only SELECT behind select_card_rows (also used for EXPLAIN checks)."""
+    stmt = select(*CARD_COLUMNS).select_from(CARD_SOURCE).where(*criteria)
+    if order_by is not None:
+        stmt = stmt.order_by(order_by)
+    return stmt
+
+
+def select_card_rows(*criteria, order_by=None):
+    """Runs a column-only SELECT over cards and returns public dicts.
+
+    Args:
+        *criteria: SQLAlchemy filter expressions (e.g. Card.owner_id == 1).
+        order_by: Optional ORDER BY clause.
+
+    Returns:
+        list: One dict per card.
+    """
+    stmt = card_rows_statement(*criteria, order_by=order_by)
+    return add_mirror_urls([card_row_to_dict(row) for row in db.session.execute(stmt)])
+
+
+def fetch_card_row(card_id):
+    """Fetches one card's public dict plus its owner id in a single query.
+
+    Returns:
+        tuple: (owner_id, card dict), or None if the card does not exist.
+    """
+    row = db.session.execute(
+        select(Card.owner_id, *CARD_COLUMNS).select_from(CARD_SOURCE).where(Card.id == card_id)
+    ).first()
+    if row is None:
+        return None
+    return row[0], add_mirror_urls([card_row_to_dict(row[1:])])[0]
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def encode_json(payload):
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, default=_json_default, separators=(',', ':')).encode('utf-8')
+
+
+def encode_msgpack(payload):
+    return msgpack.packb(payload, default=_json_default, use_bin_type=True)
+
+
+def wants_msgpack():
+    """True if the client prefers MessagePack and the encoder is available."""
+    if msgpack is None:
+        return False
+    best = request.accept_mimetypes.best_match(('application/json',) + MSGPACK_MIMETYPES)
+    return best in MSGPACK_MIMETYPES
+
+
+def make_card_response(payload, status=200):
+    """Encodes a card payload according to the request's Accept header."""
+    if wants_msgpack():
+        return Response(encode_msgpack(payload), status=status, mimetype='application/msgpack')
+    return Response(encode_json(payload), status=status, mimetype='application/json')
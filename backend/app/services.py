@@ -1,8 +1,12 @@
 import re
+from sqlalchemy import select, insert, update, delete
 from thefuzz import process as fuzzy_process # Corrected import
+from thefuzz import fuzz
 from .models import Player, Team, Card
 from . import db
 from .cache import persistent_cache
+from .collection import record_card_changes, CollectionOwnerMissing, ROLLUP_SOURCE_FIELDS
+from .serializers import format_season
 from datetime import datetime
 
 # Simple regex patterns (can be improved)
@@ -14,6 +18,10 @@ NUMBER_PATTERN = re.compile(r'#([A-Za-z0-9]+)\b')
 # Ensure this runs within an app context if needed immediately, or load lazily
 _PLAYER_NAMES = []
 _TEAM_MAP = {}
+# Lowercased reference names -> primary keys, for Card.player_id/team_id/card_set_id
+_PLAYER_IDS = {}
+_TEAM_IDS = {}
+_CARD_SET_IDS = {}  # (season end year, manufacturer) -> id, only for unambiguous sets
 
 # Common basketball card manufacturers
 COMMON_MANUFACTURERS = [
@@ -30,8 +38,8 @@ COMMON_MANUFACTURERS = [
 ]
 
 def load_reference_data_cache():
-    """Loads player names and team map into memory. Requires app context."""
-    global _PLAYER_NAMES, _TEAM_MAP
+    """Loads player names, the team map and the reference ID maps into memory. Requires app context."""
+    global _PLAYER_NAMES, _TEAM_MAP, _PLAYER_IDS, _TEAM_IDS, _CARD_SET_IDS
     
     # Try to get from Redis cache first
     cached_players = persistent_cache.get_cached_players()
@@ -46,7 +54,10 @@ def load_reference_data_cache():
         _PLAYER_NAMES = [p.full_name for p in players]
         print(f"Loaded {len(_PLAYER_NAMES)} player names from database")
         # Cache for future use
-        persistent_cache.cache_players()
+        cached_players = persistent_cache.cache_players()
+    # Redis round-trips the dict through JSON, which turns the IDs into strings
+    _PLAYER_IDS = {player_data['full_name'].lower(): int(player_id)
+                   for player_id, player_data in cached_players.items()}
     
     if cached_teams:
         _TEAM_MAP = {
@@ -64,7 +75,46 @@ def load_reference_data_cache():
              _TEAM_MAP[t.name.lower()] = t.name
         print(f"Loaded {len(_TEAM_MAP)} team entries from database")
         # Cache for future use
-        persistent_cache.cache_teams()
+        cached_teams = persistent_cache.cache_teams()
+    _TEAM_IDS = {}
+    for team_id, team_data in cached_teams.items():
+        _TEAM_IDS[team_data['abbreviation'].lower()] = int(team_id)
+        _TEAM_IDS[team_data['name'].lower()] = int(team_id)
+
+    cached_card_sets = persistent_cache.get_cached_card_sets() or persistent_cache.cache_card_sets()
+    card_set_ids = {}
+    for card_set_id, card_set_data in cached_card_sets.items():
+        key = (card_set_data['year'], (card_set_data.get('manufacturer') or '').lower())
+        # Several sets per manufacturer and year can't be told apart from a card's fields
+        card_set_ids[key] = None if key in card_set_ids else int(card_set_id)
+    _CARD_SET_IDS = {key: card_set_id for key, card_set_id in card_set_ids.items() if card_set_id}
+
+# Card fields resolve_reference_ids reads
+REFERENCE_SOURCE_FIELDS = ('player_name', 'team', 'card_year', 'manufacturer')
+
+def resolve_reference_ids(values):
+    """Maps a card's free-text player, team and set fields to reference table IDs.
+
+    Matching is exact (case-insensitive) against the in-memory reference maps;
+    fuzzy normalization happens earlier, when eBay data is mapped.
+
+    Args:
+        values (dict): Card column values (for patches, the card after the patch).
+
+    Returns:
+        dict: player_id, team_id and card_set_id, each an ID or None.
+    """
+    player_name = values.get('player_name')
+    team = values.get('team')
+    manufacturer = values.get('manufacturer')
+    season_start = parse_season_start(values.get('card_year'))
+    return {
+        'player_id': _PLAYER_IDS.get(player_name.strip().lower()) if player_name else None,
+        'team_id': _TEAM_IDS.get(team.strip().lower()) if team else None,
+        # CardSet.year is the season end year, like the legacy integer card_year
+        'card_set_id': _CARD_SET_IDS.get((season_start + 1 if season_start is not None else None,
+                                          manufacturer.strip().lower() if manufacturer else '')),
+    }
 
 def normalize_player_name(extracted_name, min_score=85):
     """Finds the best match for the extracted player name in the DB using fuzzy matching.
@@ -226,6 +276,38 @@ def parse_season_year(year_str):
     except ValueError:
         return None
 
+def parse_season_start(card_year):
+    """
+    Returns the first year of the season for any accepted card_year form.
+
+    Args:
+        card_year (str or int): "2023-24", "23-24", a plain end year ("2024", 2024) or "24".
+
+    Returns:
+        int: The season start year (2023 for all of the above), or None if unparseable.
+    """
+    if card_year is None:
+        return None
+    try:
+        season = normalize_season_year(str(card_year))
+    except ValueError:
+        return None
+    if not re.fullmatch(r'\d{4}-\d{2}', season):
+        return None
+    return int(season[:4])
+
+def card_season_fields(card_year):
+    """
+    Returns the card_year/season_start column values for a supplied year.
+
+    Parseable years are stored as the canonical "YYYY-YY" string next to the
+    integer season_start; anything else is kept verbatim with no season_start.
+    """
+    season_start = parse_season_start(card_year)
+    if season_start is None:
+        return {'card_year': card_year, 'season_start': None}
+    return {'card_year': format_season(season_start), 'season_start': season_start}
+
 def normalize_manufacturer(extracted_name, min_score=85):
     """Finds the best match for the extracted manufacturer name using fuzzy matching.
 
@@ -249,6 +331,55 @@ def normalize_manufacturer(extracted_name, min_score=85):
         print(f"Warning: No good fuzzy match found for manufacturer '{extracted_name}' (Best: '{match}', Score: {score} < {min_score}).")
         return None
 
+def match_reference_names(lines, max_ngram=3, abbreviation_min_score=75):
+    """Best player, team and manufacturer for text lines (e.g. OCR output).
+
+    Every run of 1 to max_ngram words in a line is a candidate. Unlike the
+    normalize_* helpers this scores whole strings (fuzz.ratio), so a surname
+    alone does not match a full name, and it logs nothing.
+
+    Teams match on their full name. Stat headers (GP, MIN, PTS) are full of
+    words that are also team abbreviations, so an abbreviation only counts as
+    an upper-case word right before or after the matched player's name, and
+    only when no full team name was found.
+
+    Args:
+        lines (list): Word lists, one per line.
+        max_ngram (int): Longest run of words tried as a candidate.
+        abbreviation_min_score (int): Player score needed before a neighbouring abbreviation is trusted.
+
+    Returns:
+        dict: player_name, team and manufacturer, each a (value, score 0-100) tuple;
+              (None, 0) when nothing matched.
+    """
+    best = {'player_name': (None, 0), 'team': (None, 0), 'manufacturer': (None, 0)}
+    player_words = None # (line index, first word, word after the last) of the best player match
+    for line_index, words in enumerate(lines):
+        for size in range(1, max_ngram + 1):
+            for start in range(len(words) - size + 1):
+                candidate = ' '.join(words[start:start + size])
+                if _PLAYER_NAMES:
+                    match = fuzzy_process.extractOne(candidate, _PLAYER_NAMES, scorer=fuzz.ratio)
+                    if match and match[1] > best['player_name'][1]:
+                        best['player_name'] = match[:2]
+                        player_words = (line_index, start, start + size)
+                team = _TEAM_MAP.get(candidate.lower())
+                if team and best['team'][1] < 100:
+                    best['team'] = (team, 100)
+                match = fuzzy_process.extractOne(candidate, COMMON_MANUFACTURERS, scorer=fuzz.ratio)
+                if match and match[1] > best['manufacturer'][1]:
+                    best['manufacturer'] = match[:2]
+
+    if best['team'][0] is None and player_words and best['player_name'][1] >= abbreviation_min_score:
+        line_index, start, end = player_words
+        words = lines[line_index]
+        for word in words[max(start - 1, 0):start] + words[end:end + 1]:
+            team = _TEAM_MAP.get(word) if word.isupper() else None
+            if team:
+                best['team'] = (team, best['player_name'][1])
+                break
+    return best
+
 def map_ebay_result_to_card_data(ebay_result):
     """Parses the eBay API response (searchByImage) and maps to Card fields.
 
@@ -375,7 +506,18 @@ def map_ebay_result_to_card_data(ebay_result):
     print(f"Mapped Data: {mapped_data}")
     return mapped_data
 
-def save_card_from_data(data, user_id):
+def save_card_from_data(data, user_id, commit=True):
+    """Creates a Card for the user from mapped eBay data.
+
+    Args:
+        data (dict): Mapped card fields (see map_ebay_result_to_card_data).
+        user_id (int): Owner of the new card.
+        commit (bool): Commit immediately. Pass False to batch several cards into
+                       the caller's transaction; the card is flushed so its ID is set.
+
+    Returns:
+        Card: The new card, or None if required fields are missing.
+    """
     try:
         # Map the data to the correct fields
         mapped_data = {
@@ -388,6 +530,9 @@ def save_card_from_data(data, user_id):
             'image_url': data.get('image_url'),
             'notes': data.get('notes'),
             'sport': data.get('sport'),
+            'image_hash': data.get('image_hash'),
+            'catalog_card_id': data.get('catalog_card_id'),
+            'image_key': data.get('image_key'),
             'owner_id': user_id,
             'date_added': datetime.utcnow()
         }
@@ -405,16 +550,256 @@ def save_card_from_data(data, user_id):
 
         print(f"Saving card with data: player={mapped_data['player_name']}, year={mapped_data['card_year']}, manufacturer={mapped_data['manufacturer']}, owner_id={mapped_data['owner_id']}")
         
+        mapped_data.update(card_season_fields(mapped_data['card_year']))
+        mapped_data.update(resolve_reference_ids(mapped_data))
+
         # Create new card
         new_card = Card(**mapped_data)
         db.session.add(new_card)
-        db.session.commit()
+        record_card_changes(user_id, added=[new_card])
+        if commit:
+            db.session.commit()
+        else:
+            db.session.flush()
         print(f"Successfully saved card ID: {new_card.id}")
 
         return new_card
+    except CollectionOwnerMissing:
+        if commit:
+            db.session.rollback()
+        raise
     except Exception as e:
-        db.session.rollback()
+        # When batching, the caller owns the transaction and decides whether to roll back
+        if commit:
+            db.session.rollback()
         print(f"ERROR: Failed to save card: {str(e)}")
         raise Exception(f"Error saving card to database: {str(e)}")
 
-# TODO: Add function to create/save Card object from mapped_data
\ No newline at end of file
+def backfill_card_reference_ids(after_id, limit):
+    """Links one keyset page of cards (id > after_id) to the reference tables.
+
+    Only cards whose resolved IDs differ from the stored ones are written, so
+    re-running over already linked rows is read-only. Updated cards go through
+    record_card_changes to invalidate cached responses and reach delta-sync clients.
+    Call load_reference_data_cache() first. Does not commit.
+
+    Args:
+        after_id (int): Last card ID handled by the previous page (0 to start).
+        limit (int): Maximum number of cards to scan.
+
+    Returns:
+        tuple: (last card ID scanned or None when no cards remain, cards scanned, cards updated).
+    """
+    columns = [Card.id, Card.owner_id, Card.player_id, Card.team_id, Card.card_set_id] + \
+              [getattr(Card, field) for field in ROLLUP_SOURCE_FIELDS]
+    rows = db.session.execute(select(*columns).where(Card.id > after_id).order_by(Card.id).limit(limit)).all()
+    if not rows:
+        return None, 0, 0
+
+    changed_by_owner = {}
+    for row in rows:
+        current = row._asdict()
+        reference_ids = resolve_reference_ids(current)
+        if any(current[column] != value for column, value in reference_ids.items()):
+            changed_by_owner.setdefault(row.owner_id, []).append((current, reference_ids))
+
+    updated = 0
+    for owner_id, changes in changed_by_owner.items():
+        db.session.execute(update(Card), [dict(reference_ids, id=current['id']) for current, reference_ids in changes])
+        # Facet fields are unchanged, so passing the rows as both removed and added only stamps them
+        cards = [current for current, _ in changes]
+        record_card_changes(owner_id, removed=cards, added=cards)
+        updated += len(changes)
+    return rows[-1].id, len(rows), updated
+
+# --- Card payload validation (shared by the single and bulk card routes) ---
+
+# Fields a client may set on a card
+CARD_EDITABLE_FIELDS = ('player_name', 'card_year', 'manufacturer', 'card_number', 'team',
+                        'grade', 'image_url', 'notes', 'sport')
+# Columns derived from the editable fields (every new row carries them)
+CARD_DERIVED_FIELDS = ('season_start', 'player_id', 'team_id', 'card_set_id', 'catalog_card_id')
+CARD_REQUIRED_FIELDS = ('player_name', 'card_year', 'manufacturer', 'card_number', 'team')
+# Editable fields that decide which catalog entry a card links to (see app.catalog)
+CATALOG_IDENTITY_FIELDS = frozenset(('player_name', 'card_year', 'manufacturer', 'card_number'))
+
+def check_card_field_types(data):
+    """Returns an error message if an editable field in a card payload is not a string or null.
+
+    card_year may also be a plain year number (2024).
+    """
+    invalid = [field for field in CARD_EDITABLE_FIELDS
+               if data.get(field) is not None and not isinstance(data[field], str)
+               and not (field == 'card_year' and isinstance(data[field], int) and not isinstance(data[field], bool))]
+    if invalid:
+        return f"Fields must be strings: {', '.join(invalid)}"
+    return None
+
+def check_card_year(card_year):
+    """Returns an error message unless a client-supplied card_year is empty or a parseable season."""
+    if card_year and parse_season_start(card_year) is None:
+        return f"Invalid card_year {card_year!r}: expected a season such as 2023-24 or a year"
+    return None
+
+def build_card_fields(data, partial=False):
+    """Validates a client card payload and converts it to Card column values.
+
+    Args:
+        data (dict): Request payload for one card.
+        partial (bool): True for patches, where only the supplied fields are returned
+                        and required fields are not enforced.
+
+    Returns:
+        tuple: (fields dict, None) on success or (None, error message) on failure.
+    """
+    if not isinstance(data, dict):
+        return None, 'Card data must be an object'
+
+    error = check_card_field_types(data)
+    if error:
+        return None, error
+    fields = {field: data[field] for field in CARD_EDITABLE_FIELDS if field in data}
+    if 'card_year' in fields:
+        error = check_card_year(fields['card_year'])
+        if error:
+            return None, error
+        fields.update(card_season_fields(fields['card_year']))
+
+    if partial:
+        missing = [field for field in CARD_REQUIRED_FIELDS if field in fields and not fields[field]]
+    else:
+        fields.setdefault('notes', '')
+        missing = [field for field in CARD_REQUIRED_FIELDS if not fields.get(field)]
+    if missing:
+        return None, f"Missing required fields: {', '.join(missing)}"
+    if not partial:
+        # Patches are resolved by the caller against the card's current values
+        fields.update(resolve_reference_ids(fields))
+    return fields, None
+
+# --- Bulk card writes ---
+# Each helper stages its statements in the current session and returns a per-item
+# status list; the caller commits once for the whole batch.
+
+def bulk_create_cards(user_id, items):
+    """Inserts many cards with a single executemany INSERT.
+
+    Returns:
+        list: One {'index', 'status', 'id' | 'error'} dict per input item.
+    """
+    results = [None] * len(items)
+    rows, row_indexes = [], []
+    now = datetime.utcnow()
+    for index, item in enumerate(items):
+        fields, error = build_card_fields(item)
+        if error:
+            results[index] = {'index': index, 'status': 400, 'error': error}
+            continue
+        rows.append(dict({field: None for field in CARD_EDITABLE_FIELDS + CARD_DERIVED_FIELDS}, **fields,
+                         owner_id=user_id, date_added=now))
+        row_indexes.append(index)
+
+    if rows:
+        from .catalog import find_catalog_card_ids  # catalog imports this module
+        for row, catalog_card_id in zip(rows, find_catalog_card_ids(rows)):
+            row['catalog_card_id'] = catalog_card_id
+        new_ids = db.session.scalars(
+            insert(Card).returning(Card.id, sort_by_parameter_order=True), rows
+        ).all()
+        for index, row, card_id in zip(row_indexes, rows, new_ids):
+            row['id'] = card_id
+            results[index] = {'index': index, 'status': 201, 'id': card_id}
+        record_card_changes(user_id, added=rows)
+    return results
+
+def _load_owned_cards(user_id, card_ids, results, index_by_id):
+    """Fetches the rollup columns of the requested cards in one query and records
+    404/403 statuses for IDs that are missing or belong to someone else.
+
+    Returns:
+        dict: card ID -> row for the cards the user owns.
+    """
+    columns = [Card.id, Card.owner_id, Card.card_number] + [getattr(Card, field) for field in ROLLUP_SOURCE_FIELDS]
+    rows = {row.id: row for row in db.session.execute(select(*columns).where(Card.id.in_(card_ids)))}
+
+    owned = {}
+    for card_id in card_ids:
+        row = rows.get(card_id)
+        if row is None:
+            results[index_by_id[card_id]] = {'index': index_by_id[card_id], 'id': card_id,
+                                             'status': 404, 'error': 'Card not found'}
+        elif row.owner_id != user_id:
+            results[index_by_id[card_id]] = {'index': index_by_id[card_id], 'id': card_id,
+                                             'status': 403, 'error': 'Not authorized to modify this card'}
+        else:
+            owned[card_id] = row._asdict()
+    return owned
+
+def bulk_update_cards(user_id, patches):
+    """Applies partial updates ({'id': ..., <fields>}) with bulk UPDATE-by-primary-key.
+
+    Returns:
+        list: One {'index', 'id', 'status' [, 'error']} dict per patch.
+    """
+    results = [None] * len(patches)
+    index_by_id = {}
+    for index, patch in enumerate(patches):
+        card_id = patch.get('id') if isinstance(patch, dict) else None
+        if not isinstance(card_id, int) or isinstance(card_id, bool):
+            results[index] = {'index': index, 'status': 400, 'error': 'Missing integer card id'}
+        elif card_id in index_by_id:
+            results[index] = {'index': index, 'id': card_id, 'status': 400, 'error': 'Duplicate card id in batch'}
+        else:
+            index_by_id[card_id] = index
+
+    owned = _load_owned_cards(user_id, list(index_by_id), results, index_by_id) if index_by_id else {}
+
+    updates, before, after = [], [], []
+    for card_id, current in owned.items():
+        index = index_by_id[card_id]
+        fields, error = build_card_fields(patches[index], partial=True)
+        if error:
+            results[index] = {'index': index, 'id': card_id, 'status': 400, 'error': error}
+            continue
+        results[index] = {'index': index, 'id': card_id, 'status': 200}
+        if fields:
+            fields.update(resolve_reference_ids(dict(current, **fields)))
+            updates.append(dict(fields, id=card_id))
+            before.append(current)
+            after.append(dict(current, **fields))
+
+    # Edits to a card's identity move it to the matching catalog entry (or none)
+    relinked = [i for i, fields in enumerate(updates) if CATALOG_IDENTITY_FIELDS.intersection(fields)]
+    if relinked:
+        from .catalog import find_catalog_card_ids  # catalog imports this module
+        for i, catalog_card_id in zip(relinked, find_catalog_card_ids([after[i] for i in relinked])):
+            updates[i]['catalog_card_id'] = after[i]['catalog_card_id'] = catalog_card_id
+
+    if updates:
+        db.session.execute(update(Card), updates)
+        record_card_changes(user_id, removed=before, added=after)
+    return results
+
+def bulk_delete_cards(user_id, card_ids):
+    """Deletes the given cards with a single DELETE ... WHERE id IN (...).
+
+    Returns:
+        list: One {'index', 'id', 'status' [, 'error']} dict per ID.
+    """
+    results = [None] * len(card_ids)
+    index_by_id = {}
+    for index, card_id in enumerate(card_ids):
+        if not isinstance(card_id, int) or isinstance(card_id, bool):
+            results[index] = {'index': index, 'status': 400, 'error': 'Card id must be an integer'}
+        elif card_id in index_by_id:
+            results[index] = {'index': index, 'id': card_id, 'status': 400, 'error': 'Duplicate card id in batch'}
+        else:
+            index_by_id[card_id] = index
+
+    owned = _load_owned_cards(user_id, list(index_by_id), results, index_by_id) if index_by_id else {}
+    if owned:
+        db.session.execute(delete(Card).where(Card.id.in_(list(owned))), execution_options={'synchronize_session': False})
+        record_card_changes(user_id, removed=list(owned.values()), deleted_ids=list(owned))
+        for card_id in owned:
+            results[index_by_id[card_id]] = {'index': index_by_id[card_id], 'id': card_id, 'status': 200}
+    return results
\ No newline at end of file
@@ -0,0 +1,106 @@
+# backend/app/thumbnails.py
+"""Thumbnails of stored card crops for the card grid.
+
+Every crop saved with a card is shrunk to each THUMBNAIL_SIZES width in each
+THUMBNAIL_FORMATS format. The files are named after a hash of the crop's
+bytes (Card.image_key), so the content behind a thumbnail URL never changes:
+/thumbnails/<key>/<width>.<ext> is served with a one-year immutable
+Cache-Control and a browser downloads each image once.
+
+Keys are 128-bit content hashes and <img> requests carry no bearer token, so
+thumbnails are served without authentication, like the eBay image URLs.
+"""
+import os
+import hashlib
+import threading
+import cv2
+
+IMAGE_KEY_BYTES = 16
+# Extension -> (mimetype, OpenCV quality flag)
+THUMBNAIL_FORMATS = {
+    'webp': ('image/webp', cv2.IMWRITE_WEBP_QUALITY),
+    'jpg': ('image/jpeg', cv2.IMWRITE_JPEG_QUALITY),
+}
+
+
+def image_key(image_path):
+    """Hex content hash of an image file; names its thumbnails."""
+    digest = hashlib.blake2b(digest_size=IMAGE_KEY_BYTES)
+    with open(image_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def thumbnail_relpath(key, width, extension):
+    """Path of one thumbnail below THUMBNAIL_FOLDER, fanned out by the key's first byte."""
+    return f"{key[:2]}/{key}_{width}.{extension}"
+
+
+def check_thumbnail_formats(formats):
+    """Raises ValueError for THUMBNAIL_FORMATS entries without an encoder here.
+
+    Called when the app config is loaded, so a typo such as 'jpeg' stops
+    start-up instead of failing every upload and thumbnail request.
+    """
+    unsupported = [extension for extension in formats if extension not in THUMBNAIL_FORMATS]
+    if unsupported:
+        raise ValueError(f"Unsupported THUMBNAIL_FORMATS {', '.join(unsupported)}; "
+                         f"choose from {', '.join(THUMBNAIL_FORMATS)}")
+
+
+def thumbnail_settings(config):
+    """make_thumbnails options from the app config, as plain values for image pool workers."""
+    return {
+        'folder': config['THUMBNAIL_FOLDER'],
+        'widths': config['THUMBNAIL_SIZES'],
+        'formats': config['THUMBNAIL_FORMATS'],
+        'quality': config['THUMBNAIL_QUALITY'],
+    }
+
+
+def make_thumbnails(image_path, folder, widths, formats, quality=80):
+    """Writes the thumbnails of an image that do not exist yet.
+
+    Sizes are produced largest first, each shrunk from the previous one, and a
+    crop narrower than a width is stored at its own size rather than upscaled.
+    Files are written under a temporary name and renamed, so a concurrent
+    request never serves a partial file.
+
+    Args:
+        image_path (str): Path to the card crop.
+        folder (str): THUMBNAIL_FOLDER.
+        widths (list): Thumbnail widths in pixels.
+        formats (list): Extensions from THUMBNAIL_FORMATS.
+        quality (int): Encoder quality (0-100).
+
+    Returns:
+        str: The image key, or None if the image cannot be read.
+    """
+    key = image_key(image_path)
+    missing = [(width, extension) for width in widths for extension in formats
+               if not os.path.exists(os.path.join(folder, thumbnail_relpath(key, width, extension)))]
+    if not missing:
+        return key
+    img = cv2.imread(image_path, cv2.IMREAD_COLOR)
+    if img is None:
+        return None
+
+    os.makedirs(os.path.join(folder, key[:2]), exist_ok=True)
+    for width in sorted({width for width, _ in missing}, reverse=True):
+        if width < img.shape[1]:
+            height = max(1, round(img.shape[0] * width / img.shape[1]))
+            img = cv2.resize(img, (width, height), interpolation=cv2.INTER_AREA)
+        for extension in formats:
+            if (width, extension) not in missing:
+                continue
+            ok, encoded = cv2.imencode('.' + extension, img, [THUMBNAIL_FORMATS[extension][1], quality])
+            if not ok:
+                continue
+            path = os.path.join(folder, thumbnail_relpath(key, width, extension))
+            # Unique per process and thread, as in ImageMirror.fetch
+            temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temp_path, 'wb') as f:
+                f.write(encoded.tobytes())
+            os.replace(temp_path, path)
+    return key
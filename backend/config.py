@@ -22,6 +22,15 @@ class Config:
     REMEMBER_COOKIE_SECURE = True
     REMEMBER_COOKIE_HTTPONLY = True
     REMEMBER_COOKIE_SAMESITE = 'None'
+
+    # Token auth: opt in to trusting the identity claims carried by access tokens (no
+    # DB lookup). Tokens of deleted users then keep working until they expire (1 day);
+    # by default they stop once the cached principal expires (PRINCIPAL_CACHE_TTL)
+    JWT_TRUST_CLAIMS = os.environ.get('JWT_TRUST_CLAIMS', 'false').lower() == 'true'
+    # Seconds a cached principal is reused for cookie sessions and legacy tokens
+    PRINCIPAL_CACHE_TTL = int(os.environ.get('PRINCIPAL_CACHE_TTL', 300))
+    # Don't decode or re-issue the session cookie on bearer-token requests
+    AUTH_BEARER_SKIPS_SESSION = os.environ.get('AUTH_BEARER_SKIPS_SESSION', 'true').lower() == 'true'
     # eBay API Config from .env
     EBAY_APP_ID = os.environ.get('EBAY_APP_ID')
     EBAY_DEV_ID = os.environ.get('EBAY_DEV_ID')
@@ -31,7 +40,120 @@ class Config:
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or \
         'sqlite:///' + os.path.join(basedir, 'app.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Optional read replica for read-only endpoints (may point at the primary in tests)
+    READ_DATABASE_URL = os.environ.get('READ_DATABASE_URL')
+    # PostgreSQL engine profile: pool sizing and per-statement timeouts (ms, 0 disables)
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 10))
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 20))
+    DB_POOL_TIMEOUT = int(os.environ.get('DB_POOL_TIMEOUT', 30))
+    DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', 1800))
+    DB_POOL_PRE_PING = os.environ.get('DB_POOL_PRE_PING', 'true').lower() == 'true'
+    DB_STATEMENT_TIMEOUT_MS = int(os.environ.get('DB_STATEMENT_TIMEOUT_MS', 30000))
+    DB_READ_STATEMENT_TIMEOUT_MS = int(os.environ.get('DB_READ_STATEMENT_TIMEOUT_MS', 10000))
+    # Serve connection pool metrics at /metrics/db-pool (off by default: they expose
+    # pool internals). With METRICS_TOKEN set, requests need "Authorization: Bearer <token>"
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'false').lower() == 'true'
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+    # SQLite profile (ignored for other databases): WAL journaling and tuning pragmas on
+    # every connection, and write transactions serialized across threads and workers
+    SQLITE_TUNING = os.environ.get('SQLITE_TUNING', 'true').lower() == 'true'
+    SQLITE_WAL = os.environ.get('SQLITE_WAL', 'true').lower() == 'true'
+    SQLITE_SYNCHRONOUS = os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL')
+    SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000))
+    SQLITE_CACHE_SIZE_KB = int(os.environ.get('SQLITE_CACHE_SIZE_KB', 65536))
+    SQLITE_MMAP_SIZE = int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))
+    SQLITE_SERIALIZE_WRITES = os.environ.get('SQLITE_SERIALIZE_WRITES', 'true').lower() == 'true'
+    SQLITE_WRITE_LOCK_TIMEOUT = float(os.environ.get('SQLITE_WRITE_LOCK_TIMEOUT', 30))
     # Upload settings
     UPLOAD_FOLDER = os.path.join(basedir, 'uploads')
     ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'webp'}
+    # Card crop thumbnails (app/thumbnails.py): widths in px and formats written per crop,
+    # served from /thumbnails/<key>/<width>.<ext> with a long-lived immutable Cache-Control
+    THUMBNAIL_FOLDER = os.environ.get('THUMBNAIL_FOLDER') or os.path.join(basedir, 'uploads', 'thumbnails')
+    THUMBNAIL_SIZES = [int(width) for width in os.environ.get('THUMBNAIL_SIZES', '200,400,800').split(',')]
+    # Checked against the available encoders at start-up (app/thumbnails.py)
+    THUMBNAIL_FORMATS = [extension.strip().lower() for extension in
+                         os.environ.get('THUMBNAIL_FORMATS', 'webp,jpg').split(',') if extension.strip()]
+    THUMBNAIL_QUALITY = int(os.environ.get('THUMBNAIL_QUALITY', 80))
+    THUMBNAIL_MAX_AGE = int(os.environ.get('THUMBNAIL_MAX_AGE', 365 * 24 * 3600))
+    # Let the front web server send thumbnail files: 'x-sendfile' (Apache/lighttpd),
+    # 'x-accel-redirect' (nginx, internal location at THUMBNAIL_ACCEL_PREFIX) or 'off'
+    THUMBNAIL_OFFLOAD = os.environ.get('THUMBNAIL_OFFLOAD', 'off')
+    THUMBNAIL_ACCEL_PREFIX = os.environ.get('THUMBNAIL_ACCEL_PREFIX', '/protected-thumbnails/')
+    USE_X_SENDFILE = THUMBNAIL_OFFLOAD == 'x-sendfile' # Flask's send_file honours this
+    # Local mirror of remote card images (app/image_mirror.py): downloads run on
+    # IMAGE_MIRROR_CONCURRENCY threads, only from IMAGE_MIRROR_HOSTS (and their subdomains),
+    # and the least recently served files are evicted once the folder exceeds IMAGE_MIRROR_MAX_MB
+    IMAGE_MIRROR = os.environ.get('IMAGE_MIRROR', 'true').lower() == 'true'
+    IMAGE_MIRROR_FOLDER = os.environ.get('IMAGE_MIRROR_FOLDER') or os.path.join(basedir, 'uploads', 'mirror')
+    IMAGE_MIRROR_HOSTS = [host.strip().lower() for host in
+                          os.environ.get('IMAGE_MIRROR_HOSTS', 'ebayimg.com,ebaystatic.com').split(',') if host.strip()]
+    IMAGE_MIRROR_CONCURRENCY = int(os.environ.get('IMAGE_MIRROR_CONCURRENCY', 4))
+    IMAGE_MIRROR_MAX_MB = int(os.environ.get('IMAGE_MIRROR_MAX_MB', 1024))
+    IMAGE_MIRROR_MAX_IMAGE_MB = int(os.environ.get('IMAGE_MIRROR_MAX_IMAGE_MB', 5))
+    IMAGE_MIRROR_TIMEOUT = float(os.environ.get('IMAGE_MIRROR_TIMEOUT', 10))
+    IMAGE_MIRROR_MAX_FAILURES = int(os.environ.get('IMAGE_MIRROR_MAX_FAILURES', 3)) # Then only redirect to the source
+    IMAGE_MIRROR_MAX_AGE = int(os.environ.get('IMAGE_MIRROR_MAX_AGE', 7 * 24 * 3600))
+    # Request body limit (Flask answers larger requests with 413 before reading them)
+    MAX_CONTENT_LENGTH = int(os.environ.get('MAX_UPLOAD_MB', 25)) * 1024 * 1024
+    # Uploads whose header declares more pixels are rejected before decoding
+    # (decompression bombs); 64 MP leaves room for 48 MP phone photos
+    MAX_IMAGE_PIXELS = int(os.environ.get('MAX_IMAGE_PIXELS', 64_000_000))
+    # Binder pages are decoded at 1/2, 1/4 or 1/8 scale while the longest side stays
+    # at least this large (4000 = 12 MP pages at full size, 48 MP pages at half); 0 = full
+    BINDER_DECODE_MAX_SIDE = int(os.environ.get('BINDER_DECODE_MAX_SIDE', 4000))
+    # Binder page splitter for /upload-binder: 'grid' (fixed 3x3) or 'profile' (finds
+    # 2x2/3x3/4x3 pockets and corrects perspective)
+    BINDER_SPLIT_METHOD = os.environ.get('BINDER_SPLIT_METHOD', 'grid')
+    # Crop triage before eBay lookups: 'skip' drops empty/blurry/glare crops, 'flag'
+    # only reports them, 'off' disables scoring. The thresholds below come from
+    # synthetic crops, so the default only flags until they are tuned on real pages
+    CROP_TRIAGE = os.environ.get('CROP_TRIAGE', 'flag')
+    TRIAGE_MIN_EDGE_DENSITY = float(os.environ.get('TRIAGE_MIN_EDGE_DENSITY', 0.005))
+    TRIAGE_MIN_SHARPNESS = float(os.environ.get('TRIAGE_MIN_SHARPNESS', 40.0))
+    TRIAGE_MAX_CLIPPED = float(os.environ.get('TRIAGE_MAX_CLIPPED', 0.2))
+    # OCR pre-pass before eBay lookups (app/card_identification.py, needs pytesseract and
+    # tesseract): accept cards OCR reads confidently, use keyword search for likely ones
+    OCR_PREPASS = os.environ.get('OCR_PREPASS', 'true').lower() == 'true'
+    OCR_ACCEPT_SCORE = int(os.environ.get('OCR_ACCEPT_SCORE', 92))
+    OCR_KEYWORD_SCORE = int(os.environ.get('OCR_KEYWORD_SCORE', 75))
+    TESSERACT_CMD = os.environ.get('TESSERACT_CMD') # tesseract binary when it is not on PATH
+    # Near-duplicate crops by pHash (app/image_hash.py), checked before OCR and eBay: a
+    # match in the user's own cards is a duplicate ('reuse' copies its fields into the
+    # new card, 'skip' creates nothing, 'off' disables the check); a closer match to a
+    # catalog card's hashes takes that entry's fields. Distances are Hamming bits of 64.
+    DUPLICATE_POLICY = os.environ.get('DUPLICATE_POLICY', 'reuse')
+    DUPLICATE_MAX_DISTANCE = int(os.environ.get('DUPLICATE_MAX_DISTANCE', 10))
+    HASH_REUSE_MAX_DISTANCE = int(os.environ.get('HASH_REUSE_MAX_DISTANCE', 6))
+    # Owners whose card hashes a process keeps in memory (least recently used dropped first),
+    # and how often the catalog hash index looks for new representative hashes
+    HASH_INDEX_MAX_OWNERS = int(os.environ.get('HASH_INDEX_MAX_OWNERS', 256))
+    HASH_INDEX_REFRESH_SECONDS = float(os.environ.get('HASH_INDEX_REFRESH_SECONDS', 10))
+    # Shared card catalog (app/catalog.py): resolve uploads by catalog hash and OCR
+    # fields before eBay; each entry keeps up to CATALOG_MAX_HASHES crop hashes
+    CATALOG_LOOKUP = os.environ.get('CATALOG_LOOKUP', 'true').lower() == 'true'
+    CATALOG_MAX_HASHES = int(os.environ.get('CATALOG_MAX_HASHES', 8))
+    # Image process pool (app/image_pool.py). IMAGE_WORKERS=0 runs image work on the
+    # request thread. Each web worker process starts its own pool, so the OpenCV processes
+    # total web workers x IMAGE_WORKERS; keep that near the core count.
+    IMAGE_WORKERS = int(os.environ.get('IMAGE_WORKERS', 2))
+    IMAGE_WORKER_CV_THREADS = int(os.environ.get('IMAGE_WORKER_CV_THREADS', 1))
+    IMAGE_QUEUE_SIZE = int(os.environ.get('IMAGE_QUEUE_SIZE', 0))  # 0 = 2 x IMAGE_WORKERS
+    IMAGE_SUBMIT_TIMEOUT = float(os.environ.get('IMAGE_SUBMIT_TIMEOUT', 5))
+    # A task running longer is abandoned and its workers restarted (0 = wait forever)
+    IMAGE_TASK_TIMEOUT = float(os.environ.get('IMAGE_TASK_TIMEOUT', 120))
+    # Response compression (gzip, or brotli when installed) for bodies above COMPRESS_MIN_SIZE bytes
+    COMPRESS_RESPONSES = os.environ.get('COMPRESS_RESPONSES', 'true').lower() == 'true'
+    COMPRESS_MIN_SIZE = int(os.environ.get('COMPRESS_MIN_SIZE', 1024))
+    COMPRESS_LEVEL = int(os.environ.get('COMPRESS_LEVEL', 5))
+    COMPRESS_BROTLI_QUALITY = int(os.environ.get('COMPRESS_BROTLI_QUALITY', 4))
+    # Maximum creates + updates + deletes accepted by /cards/bulk in one request
+    BULK_MAX_ITEMS = int(os.environ.get('BULK_MAX_ITEMS', 1000))
+    # Data migration jobs (flask migration-job): rows per chunk, pause between chunks (seconds)
+    # and how long a chunk may wait for row locks before backing off (PostgreSQL)
+    MIGRATION_BATCH_SIZE = int(os.environ.get('MIGRATION_BATCH_SIZE', 1000))
+    MIGRATION_THROTTLE = float(os.environ.get('MIGRATION_THROTTLE', 0.05))
+    MIGRATION_LOCK_TIMEOUT_MS = int(os.environ.get('MIGRATION_LOCK_TIMEOUT_MS', 2000))
+    # Hash partitions created by 'flask partition-cards prepare' (PostgreSQL)
+    CARD_PARTITIONS = int(os.environ.get('CARD_PARTITIONS', 16))
     # Add other configuration variables as needed 
\ No newline at end of file
@@ -0,0 +1,125 @@
+"""Add integer card.season_start and normalize card_year
+
+Revision ID: 0b7e5d2c9f48
+Revises: f3a9c1d7e260
+Create Date: 2026-10-19 16:20:07.114592
+
+"""
+import re
+from datetime import datetime
+from collections import Counter
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0b7e5d2c9f48'
+down_revision = 'f3a9c1d7e260'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 5000
+
+
+def _season_start(card_year):
+    # Mirrors app.services.parse_season_start (migrations must not import the app):
+    # "2023-24"/"23-24" -> 2023, plain end years "2024"/"24" -> 2023
+    parts = re.sub(r'[^\d-]', '', str(card_year)).split('-')
+    first = parts[0]
+    if len(first) == 2:
+        first = '20' + first
+    if len(first) != 4 or not first.isdigit():
+        return None
+    return int(first) if len(parts) == 2 else int(first) - 1
+
+
+def _format_card_year(value):
+    # Mirrors app.serializers.format_card_year
+    value = str(value)
+    if value.isdigit():
+        year = int(value)
+        return f"{year - 1}-{str(year)[-2:]}"
+    return value
+
+
+def _rebuild_season_facets(bind):
+    # The card_year rollups (autocomplete/stats) still hold the old spellings
+    card_facet = sa.table('card_facet',
+        sa.column('owner_id', sa.Integer), sa.column('field', sa.String),
+        sa.column('value', sa.String), sa.column('value_key', sa.String), sa.column('count', sa.Integer))
+    op.execute("DELETE FROM card_facet WHERE field = 'card_year'")
+    seasons = Counter()
+    rows = bind.execute(sa.text(
+        "SELECT owner_id, card_year, count(*) FROM card "
+        "WHERE card_year IS NOT NULL AND card_year <> '' GROUP BY owner_id, card_year"
+    ))
+    for owner_id, card_year, count in rows:
+        seasons[(owner_id, _format_card_year(card_year))] += count
+    if seasons:
+        op.bulk_insert(card_facet, [
+            {'owner_id': owner_id, 'field': 'card_year', 'value': season, 'value_key': season.lower(), 'count': count}
+            for (owner_id, season), count in seasons.items()
+        ])
+
+
+def _bump_versions(bind, card, changed_by_owner):
+    # Rewritten cards get a new change_version so delta sync sends them, and
+    # their owners a new collection_version so cached ETags stop matching
+    user = sa.table('user', sa.column('id', sa.Integer), sa.column('collection_version', sa.Integer),
+                    sa.column('collection_updated_at', sa.DateTime))
+    now = datetime.utcnow().replace(microsecond=0)
+    for owner_id, card_ids in changed_by_owner.items():
+        version = bind.execute(
+            user.update().where(user.c.id == owner_id)
+            .values(collection_version=user.c.collection_version + 1, collection_updated_at=now)
+            .returning(user.c.collection_version)
+        ).scalar_one()
+        for i in range(0, len(card_ids), BATCH_SIZE):
+            bind.execute(card.update().where(card.c.id.in_(card_ids[i:i + BATCH_SIZE]))
+                         .values(change_version=version, updated_at=now))
+
+
+def upgrade():
+    with op.batch_alter_table('card', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('season_start', sa.Integer(), nullable=True))
+
+    # Convert in primary-key batches so no single statement holds the whole table
+    bind = op.get_bind()
+    card = sa.table('card', sa.column('id', sa.Integer), sa.column('owner_id', sa.Integer),
+                    sa.column('card_year', sa.String), sa.column('season_start', sa.Integer),
+                    sa.column('change_version', sa.Integer), sa.column('updated_at', sa.DateTime))
+    update = card.update().where(card.c.id == sa.bindparam('card_id')).values(
+        card_year=sa.bindparam('new_card_year'), season_start=sa.bindparam('new_season_start'))
+    changed_by_owner = {}
+    last_id = 0
+    while True:
+        rows = bind.execute(sa.select(card.c.id, card.c.owner_id, card.c.card_year)
+                            .where(card.c.id > last_id).order_by(card.c.id).limit(BATCH_SIZE)).all()
+        if not rows:
+            break
+        params = []
+        for card_id, owner_id, card_year in rows:
+            season_start = _season_start(card_year)
+            if season_start is not None:
+                new_card_year = f"{season_start}-{(season_start + 1) % 100:02d}"
+                params.append({'card_id': card_id, 'new_season_start': season_start,
+                               'new_card_year': new_card_year})
+                if new_card_year != card_year:
+                    changed_by_owner.setdefault(owner_id, []).append(card_id)
+        if params:
+            bind.execute(update, params)
+        last_id = rows[-1][0]
+
+    if changed_by_owner:
+        _rebuild_season_facets(bind)
+        _bump_versions(bind, card, changed_by_owner)
+
+    with op.batch_alter_table('card', schema=None) as batch_op:
+        batch_op.create_index('ix_card_owner_id_season_start', ['owner_id', 'season_start'], unique=False)
+
+
+def downgrade():
+    # card_year keeps the normalized 'YYYY-YY' strings
+    with op.batch_alter_table('card', schema=None) as batch_op:
+        batch_op.drop_index('ix_card_owner_id_season_start')
+        batch_op.drop_column('season_start')
@@ -0,0 +1,71 @@
+"""Add catalog_card/catalog_card_hash tables and card.catalog_card_id
+
+Revision ID: 4f8a2d6b1e37
+Revises: 9e3b7c1a5d26
+Create Date: 2026-10-19 20:31:07.114928
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4f8a2d6b1e37'
+down_revision = '9e3b7c1a5d26'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('catalog_card',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('identity_key', sa.String(length=300), nullable=False),
+        sa.Column('player_name', sa.String(length=100), nullable=False),
+        sa.Column('card_year', sa.String(length=20), nullable=False),
+        sa.Column('season_start', sa.Integer(), nullable=False),
+        sa.Column('manufacturer', sa.String(length=100), nullable=False),
+        sa.Column('card_number', sa.String(length=50), nullable=False),
+        sa.Column('team', sa.String(length=100), nullable=True),
+        sa.Column('sport', sa.String(length=50), nullable=True),
+        sa.Column('image_url', sa.String(length=500), nullable=True),
+        sa.Column('player_id', sa.Integer(), nullable=True),
+        sa.Column('team_id', sa.Integer(), nullable=True),
+        sa.Column('card_set_id', sa.Integer(), nullable=True),
+        sa.Column('source', sa.String(length=20), nullable=False),
+        sa.Column('reuse_count', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['player_id'], ['player.id'], ),
+        sa.ForeignKeyConstraint(['team_id'], ['team.id'], ),
+        sa.ForeignKeyConstraint(['card_set_id'], ['card_set.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('identity_key')
+    )
+    op.create_table('catalog_card_hash',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('catalog_card_id', sa.Integer(), nullable=False),
+        sa.Column('image_hash', sa.BigInteger(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['catalog_card_id'], ['catalog_card.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('catalog_card_hash', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_catalog_card_hash_catalog_card_id'), ['catalog_card_id'], unique=False)
+
+    # Starts out NULL; link existing cards with `flask migration-job card-catalog`
+    with op.batch_alter_table('card', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('catalog_card_id', sa.Integer(), nullable=True))
+        batch_op.create_foreign_key('fk_card_catalog_card_id_catalog_card', 'catalog_card', ['catalog_card_id'], ['id'])
+        batch_op.create_index(batch_op.f('ix_card_catalog_card_id'), ['catalog_card_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('card', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_card_catalog_card_id'))
+        batch_op.drop_constraint('fk_card_catalog_card_id_catalog_card', type_='foreignkey')
+        batch_op.drop_column('catalog_card_id')
+
+    with op.batch_alter_table('catalog_card_hash', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_catalog_card_hash_catalog_card_id'))
+
+    op.drop_table('catalog_card_hash')
+    op.drop_table('catalog_card')
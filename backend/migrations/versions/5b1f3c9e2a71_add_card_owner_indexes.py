@@ -0,0 +1,30 @@
+"""Add composite owner indexes to card
+
+Revision ID: 5b1f3c9e2a71
+Revises: 036c0cc04463
+Create Date: 2026-10-19 09:12:44.102931
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5b1f3c9e2a71'
+down_revision = '036c0cc04463'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Every collection, autocomplete and ownership query filters on owner_id;
+    # the collection grid additionally sorts on date_added DESC.
+    with op.batch_alter_table('card', schema=None) as batch_op:
+        batch_op.create_index('ix_card_owner_id_date_added', ['owner_id', sa.text('date_added DESC')], unique=False)
+        batch_op.create_index('ix_card_owner_id_player_name', ['owner_id', 'player_name'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('card', schema=None) as batch_op:
+        batch_op.drop_index('ix_card_owner_id_player_name')
+        batch_op.drop_index('ix_card_owner_id_date_added')
@@ -0,0 +1,37 @@
+"""Add migration_checkpoint table for resumable data migration jobs
+
+Revision ID: 6c2d8a4f1e93
+Revises: 0b7e5d2c9f48
+Create Date: 2026-10-19 16:58:30.402117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6c2d8a4f1e93'
+down_revision = '0b7e5d2c9f48'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('migration_checkpoint',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('job_name', sa.String(length=100), nullable=False),
+    sa.Column('last_id', sa.Integer(), nullable=False),
+    sa.Column('rows_scanned', sa.Integer(), nullable=False),
+    sa.Column('rows_changed', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('started_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('job_name')
+    )
+
+
+def downgrade():
+    op.drop_table('migration_checkpoint')
@@ -0,0 +1,50 @@
+"""Add card_facet table for autocomplete options
+
+Revision ID: 8d4e2f7a1c90
+Revises: 5b1f3c9e2a71
+Create Date: 2026-10-19 10:03:17.554120
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8d4e2f7a1c90'
+down_revision = '5b1f3c9e2a71'
+branch_labels = None
+depends_on = None
+
+FACET_FIELDS = ('player_name', 'manufacturer', 'team', 'grade')
+
+
+def upgrade():
+    op.create_table('card_facet',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('owner_id', sa.Integer(), nullable=False),
+    sa.Column('field', sa.String(length=32), nullable=False),
+    sa.Column('value', sa.String(length=100), nullable=False),
+    sa.Column('value_key', sa.String(length=100).with_variant(sa.String(length=100, collation='C'), 'postgresql'), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['owner_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('owner_id', 'field', 'value', name='uq_card_facet_owner_field_value')
+    )
+    with op.batch_alter_table('card_facet', schema=None) as batch_op:
+        batch_op.create_index('ix_card_facet_owner_field_key', ['owner_id', 'field', 'value_key'], unique=False)
+
+    # Backfill counts from existing cards
+    for field in FACET_FIELDS:
+        op.execute(
+            f"INSERT INTO card_facet (owner_id, field, value, value_key, count) "
+            f"SELECT owner_id, '{field}', {field}, lower({field}), count(*) FROM card "
+            f"WHERE {field} IS NOT NULL AND {field} <> '' "
+            f"GROUP BY owner_id, {field}"
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('card_facet', schema=None) as batch_op:
+        batch_op.drop_index('ix_card_facet_owner_field_key')
+
+    op.drop_table('card_facet')
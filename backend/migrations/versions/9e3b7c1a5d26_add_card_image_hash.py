@@ -0,0 +1,27 @@
+"""Add card.image_hash for near-duplicate detection
+
+Revision ID: 9e3b7c1a5d26
+Revises: 6c2d8a4f1e93
+Create Date: 2026-10-19 19:42:51.630284
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9e3b7c1a5d26'
+down_revision = '6c2d8a4f1e93'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Nullable, no default: existing cards have no stored crop to hash
+    with op.batch_alter_table('card', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('image_hash', sa.BigInteger(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('card', schema=None) as batch_op:
+        batch_op.drop_column('image_hash')
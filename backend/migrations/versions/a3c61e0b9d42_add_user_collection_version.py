@@ -0,0 +1,28 @@
+"""Add collection version columns to user
+
+Revision ID: a3c61e0b9d42
+Revises: 8d4e2f7a1c90
+Create Date: 2026-10-19 11:26:05.381447
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a3c61e0b9d42'
+down_revision = '8d4e2f7a1c90'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('collection_version', sa.Integer(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('collection_updated_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.drop_column('collection_updated_at')
+        batch_op.drop_column('collection_version')
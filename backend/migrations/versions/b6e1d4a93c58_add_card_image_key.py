@@ -0,0 +1,27 @@
+"""Add card.image_key for crop thumbnails
+
+Revision ID: b6e1d4a93c58
+Revises: 4f8a2d6b1e37
+Create Date: 2026-10-19 21:08:44.207361
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b6e1d4a93c58'
+down_revision = '4f8a2d6b1e37'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Nullable: existing cards have no crop on record to thumbnail
+    with op.batch_alter_table('card', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('image_key', sa.String(length=32), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('card', schema=None) as batch_op:
+        batch_op.drop_column('image_key')
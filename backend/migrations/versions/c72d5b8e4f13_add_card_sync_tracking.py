@@ -0,0 +1,56 @@
+"""Add card updated_at/change_version and card_tombstone for delta sync
+
+Revision ID: c72d5b8e4f13
+Revises: a3c61e0b9d42
+Create Date: 2026-10-19 13:48:51.207634
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c72d5b8e4f13'
+down_revision = 'a3c61e0b9d42'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('card', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('updated_at', sa.DateTime(), nullable=True))
+        batch_op.add_column(sa.Column('change_version', sa.Integer(), server_default='0', nullable=False))
+        batch_op.create_index('ix_card_owner_id_change_version', ['owner_id', 'change_version'], unique=False)
+
+    # Existing cards have never been edited as far as we know
+    op.execute("UPDATE card SET updated_at = date_added")
+
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('sync_floor_version', sa.Integer(), server_default='0', nullable=False))
+
+    op.create_table('card_tombstone',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('owner_id', sa.Integer(), nullable=False),
+    sa.Column('card_id', sa.Integer(), nullable=False),
+    sa.Column('change_version', sa.Integer(), nullable=False),
+    sa.Column('deleted_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['owner_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('card_tombstone', schema=None) as batch_op:
+        batch_op.create_index('ix_card_tombstone_owner_id_change_version', ['owner_id', 'change_version'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('card_tombstone', schema=None) as batch_op:
+        batch_op.drop_index('ix_card_tombstone_owner_id_change_version')
+
+    op.drop_table('card_tombstone')
+
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.drop_column('sync_floor_version')
+
+    with op.batch_alter_table('card', schema=None) as batch_op:
+        batch_op.drop_index('ix_card_owner_id_change_version')
+        batch_op.drop_column('change_version')
+        batch_op.drop_column('updated_at')
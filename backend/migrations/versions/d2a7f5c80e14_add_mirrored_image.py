@@ -0,0 +1,38 @@
+"""Add mirrored_image table for local copies of remote card images
+
+Revision ID: d2a7f5c80e14
+Revises: b6e1d4a93c58
+Create Date: 2026-10-19 21:52:16.530842
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd2a7f5c80e14'
+down_revision = 'b6e1d4a93c58'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Starts empty; register existing cards' images with `flask migration-job image-mirror`
+    op.create_table('mirrored_image',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('key', sa.String(length=32), nullable=False),
+        sa.Column('source_url', sa.String(length=500), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('content_type', sa.String(length=50), nullable=True),
+        sa.Column('size', sa.Integer(), nullable=True),
+        sa.Column('failures', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('last_error', sa.String(length=200), nullable=True),
+        sa.Column('fetched_at', sa.DateTime(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('key')
+    )
+
+
+def downgrade():
+    op.drop_table('mirrored_image')
@@ -0,0 +1,56 @@
+"""Backfill season and total rollups in card_facet for /cards/stats
+
+Revision ID: e18f4a6c2b57
+Revises: c72d5b8e4f13
+Create Date: 2026-10-19 15:02:39.880216
+
+"""
+from collections import Counter
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e18f4a6c2b57'
+down_revision = 'c72d5b8e4f13'
+branch_labels = None
+depends_on = None
+
+
+def _format_card_year(value):
+    # Mirrors app.serializers.format_card_year (migrations must not import the app)
+    value = str(value)
+    if value.isdigit():
+        year = int(value)
+        return f"{year - 1}-{str(year)[-2:]}"
+    return value
+
+
+def upgrade():
+    bind = op.get_bind()
+    card_facet = sa.table('card_facet',
+        sa.column('owner_id', sa.Integer), sa.column('field', sa.String),
+        sa.column('value', sa.String), sa.column('value_key', sa.String), sa.column('count', sa.Integer))
+
+    op.execute(
+        "INSERT INTO card_facet (owner_id, field, value, value_key, count) "
+        "SELECT owner_id, 'total', '*', '*', count(*) FROM card GROUP BY owner_id"
+    )
+
+    # Seasons are stored in mixed formats, so fold them in Python
+    seasons = Counter()
+    rows = bind.execute(sa.text(
+        "SELECT owner_id, card_year, count(*) FROM card "
+        "WHERE card_year IS NOT NULL AND card_year <> '' GROUP BY owner_id, card_year"
+    ))
+    for owner_id, card_year, count in rows:
+        seasons[(owner_id, _format_card_year(card_year))] += count
+    if seasons:
+        op.bulk_insert(card_facet, [
+            {'owner_id': owner_id, 'field': 'card_year', 'value': season, 'value_key': season.lower(), 'count': count}
+            for (owner_id, season), count in seasons.items()
+        ])
+
+
+def downgrade():
+    op.execute("DELETE FROM card_facet WHERE field IN ('total', 'card_year')")
@@ -0,0 +1,43 @@
+"""Add card player_id/team_id/card_set_id foreign keys
+
+Revision ID: f3a9c1d7e260
+Revises: e18f4a6c2b57
+Create Date: 2026-10-19 15:41:12.508317
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3a9c1d7e260'
+down_revision = 'e18f4a6c2b57'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Columns start out NULL; fill them with `flask migration-job card-reference-ids`
+    with op.batch_alter_table('card', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('player_id', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('team_id', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('card_set_id', sa.Integer(), nullable=True))
+        batch_op.create_foreign_key('fk_card_player_id_player', 'player', ['player_id'], ['id'])
+        batch_op.create_foreign_key('fk_card_team_id_team', 'team', ['team_id'], ['id'])
+        batch_op.create_foreign_key('fk_card_card_set_id_card_set', 'card_set', ['card_set_id'], ['id'])
+        batch_op.create_index('ix_card_owner_id_player_id', ['owner_id', 'player_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_card_team_id'), ['team_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_card_card_set_id'), ['card_set_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('card', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_card_card_set_id'))
+        batch_op.drop_index(batch_op.f('ix_card_team_id'))
+        batch_op.drop_index('ix_card_owner_id_player_id')
+        batch_op.drop_constraint('fk_card_card_set_id_card_set', type_='foreignkey')
+        batch_op.drop_constraint('fk_card_team_id_team', type_='foreignkey')
+        batch_op.drop_constraint('fk_card_player_id_player', type_='foreignkey')
+        batch_op.drop_column('card_set_id')
+        batch_op.drop_column('team_id')
+        batch_op.drop_column('player_id')
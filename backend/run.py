@@ -26,6 +26,64 @@ def create_user(username, email, password):
     print(f'User "{username}" created successfully with ID: {user.id}')
 # --- End of temporary command ---
 
+@app.cli.command('rebuild-facets')
+@click.option('--user-id', type=int, default=None, help='Only rebuild facets for this user.')
+def rebuild_facets(user_id):
+    """Recomputes autocomplete facet counts from the card table."""
+    from app.collection import rebuild_card_facets
+    rebuild_card_facets(user_id)
+    print(f'Rebuilt card facets for {"user " + str(user_id) if user_id else "all users"}.')
+
+@app.cli.command('purge-tombstones')
+@click.option('--days', type=int, default=90, help='Keep deletion records for this many days.')
+def purge_tombstones(days):
+    """Removes old card deletion records used by /cards/changes."""
+    from datetime import datetime, timedelta
+    from app.collection import purge_card_tombstones
+    removed = purge_card_tombstones(datetime.utcnow() - timedelta(days=days))
+    print(f'Purged {removed} card tombstones older than {days} days.')
+
+@app.cli.command('migration-job')
+@click.argument('name', required=False)
+@click.option('--batch-size', type=int, default=None, help='Rows per chunk (default: MIGRATION_BATCH_SIZE).')
+@click.option('--throttle', type=float, default=None, help='Seconds between chunks (default: MIGRATION_THROTTLE).')
+@click.option('--restart', is_flag=True, help='Ignore the saved checkpoint and start over.')
+@click.option('--max-chunks', type=int, default=None, help='Stop after this many chunks (resume later).')
+def migration_job(name, batch_size, throttle, restart, max_chunks):
+    """Runs a resumable data migration job, or lists jobs and their checkpoints."""
+    from app.migration_jobs import JOBS, run_job
+    from app.models import MigrationCheckpoint
+    if not name:
+        checkpoints = {c.job_name: c for c in MigrationCheckpoint.query.all()}
+        for job in JOBS.values():
+            c = checkpoints.get(job.name)
+            state = f'{c.status}, last id {c.last_id}, {c.rows_changed} changed' if c else 'never run'
+            print(f'{job.name:<22} {job.description} [{state}]')
+        return
+    if name not in JOBS:
+        print(f'Error: Unknown job "{name}". Available: {", ".join(JOBS)}')
+        return
+    run_job(name, batch_size=batch_size, throttle=throttle, restart=restart, max_chunks=max_chunks)
+
+@app.cli.command('partition-cards')
+@click.argument('step', type=click.Choice(['prepare', 'swap', 'drop-old']))
+@click.option('--partitions', type=int, default=None, help='Hash partitions to create (default: CARD_PARTITIONS).')
+@click.option('--lock-timeout-ms', type=int, default=10000, help='Give up the swap if card cannot be locked in time.')
+def partition_cards(step, partitions, lock_timeout_ms):
+    """Converts the card table to hash partitions on owner_id (PostgreSQL only)."""
+    from app import partitioning
+    if step == 'prepare':
+        partitions = partitions or app.config['CARD_PARTITIONS']
+        partitioning.prepare_partitioned_table(partitions)
+        print(f'Created {partitioning.PARTITIONED_TABLE} with {partitions} partitions. '
+              f'Next: flask migration-job {partitioning.COPY_JOB}')
+    elif step == 'swap':
+        counts = partitioning.swap_partitioned_table(lock_timeout_ms)
+        print(f'card is now partitioned ({counts}). Old table kept as {partitioning.OLD_TABLE}.')
+    else:
+        partitioning.drop_unpartitioned_table()
+        print(f'Dropped {partitioning.OLD_TABLE}.')
+
 if __name__ == '__main__':
     # Run the app in debug mode for development
     # Host='0.0.0.0' makes it accessible on the network
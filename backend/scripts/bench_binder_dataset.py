@@ -0,0 +1,310 @@
+# backend/scripts/bench_binder_dataset.py
+"""Speed, memory and accuracy of the binder splitters on a labeled photo set, with a JSON report.
+
+Every image in the dataset directory needs a sidecar label file with the same
+name plus .json (page.jpg -> page.jpg.json) listing the true card outlines in
+full-resolution pixels, as boxes or as four (x, y) corners:
+
+    {"cards": [[x0, y0, x1, y1], [[x, y], [x, y], [x, y], [x, y]], ...]}
+
+Each image runs through each configuration (method + parameters) stage by
+stage, the way the split_binder_page* functions do:
+
+    decode  load_image (decode_max_side)
+    detect  grid_card_boxes / find_card_boxes / find_pocket_grid
+    crop    cut and write the card PNGs
+    triage  triage_card_crops on the written crops
+
+and is scored with IoU and recall against the labels. Peak memory is the
+process's peak RSS above its level before the run (Linux; blank elsewhere).
+The report (--report) holds every measurement plus per-configuration
+medians; pass an earlier report as --baseline to fail (exit 1) on slowdowns
+or accuracy drops.
+
+No photos at hand? --write-synthetic DIR renders a labeled set to start with.
+
+Usage:
+    python scripts/bench_binder_dataset.py --write-synthetic ../CV_testing/synthetic
+    python scripts/bench_binder_dataset.py ../CV_testing/synthetic --report report.json
+    python scripts/bench_binder_dataset.py path/to/labeled --config profile-2k:profile:detect_max_side=2048
+    python scripts/bench_binder_dataset.py path/to/labeled --baseline report.json --max-slowdown 1.25
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import contextlib
+import statistics
+
+# Adjust path to import from app
+backend_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, backend_dir)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import cv2
+import numpy as np
+from app.image_utils import load_image, read_image_size, find_card_boxes, find_pocket_grid, grid_card_boxes, \
+    crop_quad, triage_card_crops, peak_rss_mb, POCKET_LAYOUTS
+from bench_binder_splitters import render_page, score, FRAMINGS
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp')
+STAGES = ('decode', 'detect', 'crop', 'triage')
+# (name, method, parameters); /upload-binder uses inner_crop_percent=3
+DEFAULT_CONFIGS = (
+    ('grid', 'grid', {'inner_crop_percent': 3}),
+    ('contour', 'contour', {}),
+    ('contour-full', 'contour', {'detect_max_side': 0}),
+    ('profile', 'profile', {'inner_crop_percent': 3}),
+    ('profile-decode4k', 'profile', {'inner_crop_percent': 3, 'decode_max_side': 4000}),
+)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark binder splitters on labeled photos.")
+    parser.add_argument("dataset", nargs='?', help="Directory of binder photos with .json labels.")
+    parser.add_argument("--config", action='append', default=[], metavar="NAME:METHOD[:key=value,...]",
+                        help="Configuration to run (repeatable), e.g. profile-2k:profile:detect_max_side=2048. "
+                             "Default: " + ", ".join(name for name, _, _ in DEFAULT_CONFIGS))
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per image and configuration. Default: 3")
+    parser.add_argument("--iou-threshold", type=float, default=0.8, help="IoU counted as recovered. Default: 0.8")
+    parser.add_argument("--report", default="binder_split_report.json", help="JSON report path. Default: %(default)s")
+    parser.add_argument("--baseline", help="Earlier report to compare against; exits 1 on regressions.")
+    parser.add_argument("--max-slowdown", type=float, default=1.2,
+                        help="Allowed total-time ratio vs. the baseline. Default: 1.2")
+    parser.add_argument("--max-accuracy-drop", type=float, default=0.02,
+                        help="Allowed drop in mean IoU or recall vs. the baseline. Default: 0.02")
+    parser.add_argument("--write-synthetic", metavar="DIR",
+                        help="Render a labeled synthetic set (all layouts and framings) into DIR and exit.")
+    parser.add_argument("--megapixels", type=float, default=12, help="Synthetic photo size. Default: 12")
+    return parser.parse_args()
+
+
+def parse_config(spec):
+    """'name:method:key=value,...' -> (name, method, {key: int value})."""
+    parts = spec.split(':')
+    if len(parts) < 2 or parts[1] not in ('grid', 'contour', 'profile'):
+        raise SystemExit(f"Bad --config {spec!r}: expected NAME:grid|contour|profile[:key=value,...]")
+    params = {}
+    if len(parts) > 2 and parts[2]:
+        for pair in parts[2].split(','):
+            key, _, value = pair.partition('=')
+            params[key.strip()] = int(value)
+    return parts[0], parts[1], params
+
+
+def write_synthetic(out_dir, megapixels):
+    os.makedirs(out_dir, exist_ok=True)
+    for layout in POCKET_LAYOUTS:
+        for framing_name, framing in FRAMINGS:
+            img, quads = render_page(layout, framing, megapixels)
+            path = os.path.join(out_dir, f"{layout}_{framing_name}.jpg")
+            cv2.imwrite(path, img, [cv2.IMWRITE_JPEG_QUALITY, 92])
+            with open(path + '.json', 'w') as f:
+                json.dump({'layout': layout, 'cards': [quad.round(1).tolist() for quad in quads]}, f)
+            print(f"Wrote {path} ({len(quads)} cards)")
+
+
+def load_labels(label_path):
+    with open(label_path) as f:
+        cards = json.load(f)['cards']
+    quads = []
+    for card in cards:
+        if len(card) == 4 and not isinstance(card[0], list):
+            x0, y0, x1, y1 = card
+            card = [[x0, y0], [x1, y0], [x1, y1], [x0, y1]]
+        quads.append(np.array(card, dtype=np.float32))
+    return quads
+
+
+def box_quad(x0, y0, x1, y1):
+    return np.array([[x0, y0], [x1, y0], [x1, y1], [x0, y1]], dtype=np.float32)
+
+
+def detect(img, method, params):
+    """Card outlines as quads in the decoded image's coordinates."""
+    if method == 'grid':
+        height, width = img.shape[:2]
+        return [box_quad(*box) for _, box in grid_card_boxes(width, height, params.get('inner_crop_percent', 5))]
+    if method == 'contour':
+        kwargs = {'detect_max_side': params['detect_max_side']} if 'detect_max_side' in params else {}
+        return [box_quad(*box) for box in find_card_boxes(img, **kwargs)]
+    kwargs = {key: params[key] for key in ('detect_max_side',) if key in params}
+    _, quads = find_pocket_grid(img, inner_crop_percent=params.get('inner_crop_percent', 3), **kwargs)
+    return quads
+
+
+def crop_and_write(img, quads, method, out_dir):
+    paths = []
+    for i, quad in enumerate(quads):
+        if method == 'profile':
+            roi = crop_quad(img, quad)
+        else:
+            x0, y0 = quad[0].astype(int)
+            x1, y1 = quad[2].astype(int)
+            roi = img[y0:y1, x0:x1]
+        if roi.size:
+            path = os.path.join(out_dir, f"card_{i + 1}.png")
+            cv2.imwrite(path, roi)
+            paths.append(path)
+    return paths
+
+
+def run_once(image_path, method, params, out_dir):
+    """One pass through every stage; returns ({stage: ms}, quads in full-resolution pixels, crop count)."""
+    timings = {}
+    start = time.perf_counter()
+    img = load_image(image_path, params.get('decode_max_side', 0))
+    timings['decode'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    quads = detect(img, method, params)
+    timings['detect'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    paths = crop_and_write(img, quads, method, out_dir)
+    timings['crop'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    triage_card_crops(paths)
+    timings['triage'] = time.perf_counter() - start
+
+    # Reduced decodes: map the outlines back to full-resolution pixels for scoring
+    size = read_image_size(image_path)
+    scale = size[0] / img.shape[1] if size else 1.0
+    quads = [quad * scale for quad in quads]
+    return {stage: seconds * 1000 for stage, seconds in timings.items()}, quads, len(paths)
+
+
+def measure(image_path, truth, method, params, repeat, iou_threshold, work_dir):
+    samples = {stage: [] for stage in STAGES}
+    baseline = peak_rss_mb(reset=True)
+    # Silence the per-call progress prints
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        for _ in range(repeat):
+            out_dir = tempfile.mkdtemp(dir=work_dir)
+            timings, quads, crops = run_once(image_path, method, params, out_dir)
+            shutil.rmtree(out_dir, ignore_errors=True)
+            for stage, ms in timings.items():
+                samples[stage].append(ms)
+    peak = peak_rss_mb()
+    mean_iou, recall = score(truth, quads, iou_threshold) if truth else (0.0, 0.0)
+    stages = {stage: round(statistics.median(values), 2) for stage, values in samples.items()}
+    return {
+        'stages_ms': stages,
+        'total_ms': round(sum(stages.values()), 2),
+        'peak_rss_mb': round(peak - baseline, 1) if peak is not None and baseline is not None else None,
+        'iou': round(mean_iou, 4),
+        'recall': round(recall, 4),
+        'cards': len(truth),
+        'crops': crops,
+    }
+
+
+def summarize(results):
+    """Per-configuration medians (times, memory) and means (accuracy) over all images."""
+    summary = {}
+    for name in dict.fromkeys(row['config'] for row in results):
+        rows = [row for row in results if row['config'] == name]
+        peaks = [row['peak_rss_mb'] for row in rows if row['peak_rss_mb'] is not None]
+        summary[name] = {
+            'stages_ms': {stage: round(statistics.median(row['stages_ms'][stage] for row in rows), 2)
+                          for stage in STAGES},
+            'total_ms': round(statistics.median(row['total_ms'] for row in rows), 2),
+            'peak_rss_mb': max(peaks) if peaks else None,
+            'iou': round(statistics.mean(row['iou'] for row in rows), 4),
+            'recall': round(statistics.mean(row['recall'] for row in rows), 4),
+            'images': len(rows),
+        }
+    return summary
+
+
+def compare(summary, baseline, max_slowdown, max_accuracy_drop):
+    """Regression messages for configurations present in both reports."""
+    problems = []
+    for name, current in summary.items():
+        before = baseline.get('summary', {}).get(name)
+        if not before:
+            continue
+        if before['total_ms'] and current['total_ms'] > before['total_ms'] * max_slowdown:
+            problems.append(f"{name}: total {current['total_ms']:.1f} ms vs. {before['total_ms']:.1f} ms "
+                            f"(x{current['total_ms'] / before['total_ms']:.2f})")
+        for key in ('iou', 'recall'):
+            if current[key] < before[key] - max_accuracy_drop:
+                problems.append(f"{name}: {key} {current[key]:.3f} vs. {before[key]:.3f}")
+    return problems
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.write_synthetic:
+        write_synthetic(args.write_synthetic, args.megapixels)
+        sys.exit(0)
+    if not args.dataset or not os.path.isdir(args.dataset):
+        sys.exit("Give a dataset directory (or --write-synthetic DIR to create one).")
+
+    configs = [parse_config(spec) for spec in args.config] or list(DEFAULT_CONFIGS)
+    images = sorted(name for name in os.listdir(args.dataset) if name.lower().endswith(IMAGE_EXTENSIONS))
+    labeled = [(name, os.path.join(args.dataset, name)) for name in images
+               if os.path.isfile(os.path.join(args.dataset, name + '.json'))]
+    if not labeled:
+        sys.exit(f"No labeled images in {args.dataset} (expected page.jpg + page.jpg.json).")
+    skipped = len(images) - len(labeled)
+
+    work_dir = tempfile.mkdtemp(prefix='bench_binder_dataset_')
+    results = []
+    print(f"\n--- Binder splitting benchmark: {len(labeled)} labeled images"
+          f"{f' ({skipped} unlabeled skipped)' if skipped else ''} ---")
+    header = f"{'image':<24} {'config':<18} " + " ".join(f"{stage:>8}" for stage in STAGES) + \
+             f" {'total':>9} {'peak MB':>8} {'IoU':>6} {'recall':>7}"
+    print(header)
+    try:
+        for image_name, image_path in labeled:
+            truth = load_labels(image_path + '.json')
+            for name, method, params in configs:
+                row = measure(image_path, truth, method, params, args.repeat, args.iou_threshold, work_dir)
+                row.update(image=image_name, config=name, method=method, params=params)
+                results.append(row)
+                peak = f"{row['peak_rss_mb']:>8.1f}" if row['peak_rss_mb'] is not None else f"{'':>8}"
+                print(f"{image_name[:24]:<24} {name[:18]:<18} "
+                      + " ".join(f"{row['stages_ms'][stage]:>8.1f}" for stage in STAGES)
+                      + f" {row['total_ms']:>9.1f} {peak} {row['iou']:>6.3f} {row['recall']:>6.0%}")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    summary = summarize(results)
+    print(f"\n{'overall (median ms)':<43} " + " ".join(f"{stage:>8}" for stage in STAGES)
+          + f" {'total':>9} {'peak MB':>8} {'IoU':>6} {'recall':>7}")
+    for name, _, _ in configs:
+        values = summary[name]
+        peak = f"{values['peak_rss_mb']:>8.1f}" if values['peak_rss_mb'] is not None else f"{'':>8}"
+        print(f"{name[:43]:<43} " + " ".join(f"{values['stages_ms'][stage]:>8.1f}" for stage in STAGES)
+              + f" {values['total_ms']:>9.1f} {peak} {values['iou']:>6.3f} {values['recall']:>6.0%}")
+
+    report = {
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'environment': {'python': platform.python_version(), 'opencv': cv2.__version__, 'numpy': np.__version__,
+                        'platform': platform.platform(), 'cpus': os.cpu_count()},
+        'dataset': os.path.abspath(args.dataset),
+        'repeat': args.repeat,
+        'iou_threshold': args.iou_threshold,
+        'configs': {name: {'method': method, 'params': params} for name, method, params in configs},
+        'summary': summary,
+        'results': results,
+    }
+    with open(args.report, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nReport written to {args.report}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            problems = compare(summary, json.load(f), args.max_slowdown, args.max_accuracy_drop)
+        if problems:
+            print("\nRegressions vs. baseline:")
+            for problem in problems:
+                print(f"  {problem}")
+            sys.exit(1)
+        print("No regressions vs. baseline.")
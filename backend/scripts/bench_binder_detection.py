@@ -0,0 +1,90 @@
+# backend/scripts/bench_binder_detection.py
+"""Latency and peak memory of binder page contour detection, full resolution vs. downscaled.
+
+Uses a synthetic 3x3 binder page unless image paths are given. Peak memory is
+measured with tracemalloc, which sees the numpy arrays OpenCV returns but not
+OpenCV's internal scratch buffers.
+
+Usage:
+    python scripts/bench_binder_detection.py
+    python scripts/bench_binder_detection.py path/to/page1.jpg path/to/page2.jpg --repeat 10
+"""
+import os
+import sys
+import time
+import argparse
+import contextlib
+import statistics
+import tracemalloc
+
+# Adjust path to import from app
+backend_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, backend_dir)
+
+import cv2
+import numpy as np
+from app.image_utils import find_card_boxes, DEFAULT_DETECT_MAX_SIDE
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark binder page contour detection.")
+    parser.add_argument("images", nargs='*', help="Binder page photos. Default: a synthetic page.")
+    parser.add_argument("--width", type=int, default=4000, help="Synthetic page width. Default: 4000 (12 MP)")
+    parser.add_argument("--height", type=int, default=3000, help="Synthetic page height. Default: 3000")
+    parser.add_argument("--max-sides", type=int, nargs='+', default=[0, DEFAULT_DETECT_MAX_SIDE],
+                        help=f"detect_max_side values to compare (0 = full resolution). "
+                             f"Default: 0 {DEFAULT_DETECT_MAX_SIDE}")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per image. Default: 5")
+    return parser.parse_args()
+
+
+def synthetic_page(width, height):
+    """A noisy dark page with nine card-shaped rectangles in a 3x3 grid."""
+    rng = np.random.default_rng(0)
+    page = np.full((height, width, 3), 40, np.uint8) + rng.integers(0, 20, (height, width, 3), dtype=np.uint8)
+    card_height = int(height / 3 * 0.85)
+    card_width = int(card_height * 0.71)
+    for row in range(3):
+        for col in range(3):
+            x = int(width / 3 * col + (width / 3 - card_width) / 2)
+            y = int(height / 3 * row + (height / 3 - card_height) / 2)
+            cv2.rectangle(page, (x, y), (x + card_width, y + card_height), (200, 180, 160), -1)
+    return page
+
+
+def measure(img, max_side, repeat):
+    # Silence the per-call progress prints
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        return _measure(img, max_side, repeat)
+
+
+def _measure(img, max_side, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        boxes = find_card_boxes(img, detect_max_side=max_side)
+        samples.append((time.perf_counter() - start) * 1000)
+    tracemalloc.start()
+    find_card_boxes(img, detect_max_side=max_side)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return statistics.median(samples), peak / 2 ** 20, boxes
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.images:
+        pages = [(os.path.basename(path), cv2.imread(path)) for path in args.images]
+    else:
+        pages = [(f"synthetic {args.width}x{args.height}", synthetic_page(args.width, args.height))]
+
+    print(f"\n--- Binder page detection benchmark ---")
+    print(f"{'image':<28} {'max side':>9} {'median':>10} {'peak mem':>10} {'cards':>6}")
+    for name, img in pages:
+        if img is None:
+            print(f"{name:<28} could not be read")
+            continue
+        for max_side in args.max_sides:
+            median, peak, boxes = measure(img, max_side, args.repeat)
+            label = max_side or 'full'
+            print(f"{name[:28]:<28} {label:>9} {median:>7.1f} ms {peak:>7.1f} MB {len(boxes):>6}")
@@ -0,0 +1,154 @@
+# backend/scripts/bench_binder_splitters.py
+"""Speed and crop accuracy of the three binder page splitters on synthetic pages.
+
+Renders 2x2, 3x3 and 4x3 binder sheets on a table background, framed
+straight, offset, and with perspective skew, and knows where every card is.
+Each method's crops are mapped back to the photo and scored against the
+true card outlines:
+
+    IoU     mean best intersection-over-union per card
+    recall  share of cards recovered with IoU >= --iou-threshold
+
+Usage:
+    python scripts/bench_binder_splitters.py
+    python scripts/bench_binder_splitters.py --megapixels 24 --repeat 5
+"""
+import os
+import sys
+import time
+import argparse
+import contextlib
+import statistics
+
+# Adjust path to import from app
+backend_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, backend_dir)
+
+import cv2
+import numpy as np
+from app.image_utils import find_card_boxes, find_pocket_grid, grid_card_boxes, POCKET_LAYOUTS
+
+# Inner crop used by /upload-binder for the grid method
+INNER_CROP_PERCENT = 3
+# Share of the pocket (per side) covered by the card in synthetic pages
+CARD_FILL = 0.94
+# Photo framings: (name, page corners as fractions of the photo, clockwise from top-left)
+FRAMINGS = (
+    ('straight', ((0.0, 0.0), (1.0, 0.0), (1.0, 1.0), (0.0, 1.0))),
+    ('offset', ((0.08, 0.06), (0.97, 0.06), (0.97, 0.98), (0.08, 0.98))),
+    ('skewed', ((0.06, 0.03), (0.95, 0.08), (0.98, 0.97), (0.02, 0.93))),
+)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark binder page splitters for speed and crop accuracy.")
+    parser.add_argument("--megapixels", type=float, default=12, help="Photo size. Default: 12")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per page and method. Default: 3")
+    parser.add_argument("--iou-threshold", type=float, default=0.8, help="IoU counted as recovered. Default: 0.8")
+    return parser.parse_args()
+
+
+def render_page(layout, framing, megapixels, seed=0):
+    """Draws a binder sheet photo and returns (image, layout, true card quads in photo coordinates).
+
+    Pockets are sized to the cards they hold (a 3x3 sheet is portrait), and the
+    photo has the sheet's aspect ratio.
+    """
+    rng = np.random.default_rng(seed)
+    rows, cols = POCKET_LAYOUTS[layout]
+    pocket_w, pocket_h = 0.71 / CARD_FILL, 1.0 / CARD_FILL
+    unit = (megapixels * 1e6 / (cols * pocket_w * rows * pocket_h)) ** 0.5
+    pocket_w, pocket_h = pocket_w * unit, pocket_h * unit
+    card_w, card_h = pocket_w * CARD_FILL, pocket_h * CARD_FILL
+    width, height = int(cols * pocket_w), int(rows * pocket_h)
+    sheet = np.full((height, width, 3), 215, np.uint8)
+    cards = []
+    for r in range(rows):
+        for c in range(cols):
+            # Cards sit loosely in their pockets
+            x0 = int(c * pocket_w + (pocket_w - card_w) * rng.uniform(0.2, 0.8))
+            y0 = int(r * pocket_h + (pocket_h - card_h) * rng.uniform(0.2, 0.8))
+            x1, y1 = int(x0 + card_w), int(y0 + card_h)
+            cv2.rectangle(sheet, (x0, y0), (x1, y1), tuple(int(v) for v in rng.integers(30, 200, 3)), -1)
+            # Artwork: a photo window and some text-like bars
+            inset = int(card_w * 0.08)
+            cv2.rectangle(sheet, (x0 + inset, y0 + inset), (x1 - inset, int(y0 + card_h * 0.75)),
+                          tuple(int(v) for v in rng.integers(0, 255, 3)), -1)
+            for _ in range(4):
+                bar_y = int(y0 + card_h * rng.uniform(0.8, 0.95))
+                cv2.line(sheet, (x0 + inset, bar_y), (int(x0 + card_w * rng.uniform(0.3, 0.9)), bar_y), (20, 20, 20), 3)
+            cards.append(np.array([[x0, y0], [x1, y0], [x1, y1], [x0, y1]], dtype=np.float32))
+    # Pocket seams
+    for r in range(1, rows):
+        cv2.line(sheet, (0, int(r * pocket_h)), (width, int(r * pocket_h)), (150, 150, 150), 4)
+    for c in range(1, cols):
+        cv2.line(sheet, (int(c * pocket_w), 0), (int(c * pocket_w), height), (150, 150, 150), 4)
+
+    corners = (np.array(framing) * [width, height]).astype(np.float32)
+    source = np.array([[0, 0], [width, 0], [width, height], [0, height]], dtype=np.float32)
+    homography = cv2.getPerspectiveTransform(source, corners)
+    photo = cv2.warpPerspective(sheet, homography, (width, height), borderValue=(45, 35, 30))
+    photo = cv2.add(photo, rng.integers(0, 12, photo.shape, dtype=np.uint8))
+    quads = [cv2.perspectiveTransform(card.reshape(-1, 1, 2), homography).reshape(4, 2) for card in cards]
+    return photo, quads
+
+
+def box_quad(x0, y0, x1, y1):
+    return np.array([[x0, y0], [x1, y0], [x1, y1], [x0, y1]], dtype=np.float32)
+
+
+def grid_method(img):
+    height, width = img.shape[:2]
+    return [box_quad(*box) for _, box in grid_card_boxes(width, height, INNER_CROP_PERCENT)]
+
+
+def contour_method(img):
+    return [box_quad(*box) for box in find_card_boxes(img)]
+
+
+def profile_method(img):
+    _, quads = find_pocket_grid(img, inner_crop_percent=INNER_CROP_PERCENT)
+    return quads
+
+
+METHODS = (('grid', grid_method), ('contour', contour_method), ('profile', profile_method))
+
+
+def iou(a, b):
+    intersection, _ = cv2.intersectConvexConvex(a, b)
+    union = cv2.contourArea(a) + cv2.contourArea(b) - intersection
+    return intersection / union if union > 0 else 0.0
+
+
+def score(truth, predicted, threshold):
+    best = [max((iou(card, quad) for quad in predicted), default=0.0) for card in truth]
+    return statistics.mean(best), sum(value >= threshold for value in best) / len(best)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    totals = {name: {'ms': [], 'iou': [], 'recall': []} for name, _ in METHODS}
+
+    print(f"\n--- Binder splitter benchmark ({args.megapixels:g} MP photos) ---")
+    print(f"{'page':<16} {'method':<8} {'median':>10} {'IoU':>6} {'recall':>7}")
+    for layout in POCKET_LAYOUTS:
+        for framing_name, framing in FRAMINGS:
+            img, truth = render_page(layout, framing, args.megapixels)
+            for name, method in METHODS:
+                samples = []
+                # Silence the per-call progress prints
+                with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+                    for _ in range(args.repeat):
+                        start = time.perf_counter()
+                        predicted = method(img)
+                        samples.append((time.perf_counter() - start) * 1000)
+                mean_iou, recall = score(truth, predicted, args.iou_threshold)
+                median = statistics.median(samples)
+                for key, value in (('ms', median), ('iou', mean_iou), ('recall', recall)):
+                    totals[name][key].append(value)
+                print(f"{layout + ' ' + framing_name:<16} {name:<8} {median:>7.1f} ms {mean_iou:>6.3f} {recall:>6.0%}")
+
+    print(f"\n{'overall':<16} {'method':<8} {'median':>10} {'IoU':>6} {'recall':>7}")
+    for name, values in totals.items():
+        print(f"{'':<16} {name:<8} {statistics.median(values['ms']):>7.1f} ms "
+              f"{statistics.mean(values['iou']):>6.3f} {statistics.mean(values['recall']):>6.0%}")
@@ -0,0 +1,141 @@
+# backend/scripts/bench_bulk_cards.py
+"""Rows-per-second benchmark for per-card commits vs. the bulk card helpers.
+
+Usage:
+    python scripts/bench_bulk_cards.py --cards 5000
+    python scripts/bench_bulk_cards.py --database-url postgresql://... --cards 20000
+"""
+import os
+import sys
+import io
+import time
+import argparse
+import tempfile
+import contextlib
+
+# Adjust path to import from app
+backend_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, backend_dir)
+
+from sqlalchemy import select, delete
+from config import Config
+from app import create_app, db
+from app.models import User, Card, CardFacet
+from app.services import save_card_from_data, bulk_create_cards, bulk_update_cards, bulk_delete_cards
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark per-card vs. bulk card writes.")
+    parser.add_argument("--database-url", default=None,
+                        help="Database to benchmark against. Default: a temporary SQLite file.")
+    parser.add_argument("--cards", type=int, default=2000, help="Cards written per scenario. Default: 2000")
+    return parser.parse_args()
+
+
+def make_card(i):
+    return {
+        'player_name': f"Player {i % 50}",
+        'card_year': '2023-24',
+        'manufacturer': 'Panini',
+        'card_number': str(i),
+        'team': f"Team {i % 30}",
+        'grade': 'Raw',
+    }
+
+
+def reset(user_id):
+    db.session.execute(delete(Card).where(Card.owner_id == user_id))
+    db.session.execute(delete(CardFacet).where(CardFacet.owner_id == user_id))
+    db.session.commit()
+
+
+def timed(label, rows, fn):
+    # save_card_from_data logs every card; keep the benchmark output readable
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+    print(f"{label:<42} {rows:>7} rows {elapsed:8.3f}s {rows / elapsed:12,.0f} rows/s")
+    return elapsed
+
+
+def run_benchmark(count):
+    user = User.query.filter_by(username='bench_bulk').first()
+    if not user:
+        user = User(username='bench_bulk', email='bench_bulk@example.com')
+        user.set_password('bench')
+        db.session.add(user)
+        db.session.commit()
+    user_id = user.id
+    cards = [make_card(i) for i in range(count)]
+
+    # --- Creates ---
+    reset(user_id)
+    timed("create: commit per card (legacy)", count,
+          lambda: [save_card_from_data(card, user_id) for card in cards])
+
+    reset(user_id)
+    def batched_saves():
+        for card in cards:
+            save_card_from_data(card, user_id, commit=False)
+        db.session.commit()
+    timed("create: save_card_from_data, one commit", count, batched_saves)
+
+    reset(user_id)
+    def bulk_create():
+        bulk_create_cards(user_id, cards)
+        db.session.commit()
+    timed("create: bulk_create_cards, one commit", count, bulk_create)
+
+    card_ids = db.session.scalars(select(Card.id).where(Card.owner_id == user_id)).all()
+
+    # --- Updates ---
+    def per_card_updates():
+        for card_id in card_ids:
+            card = db.session.get(Card, card_id)
+            card.grade = 'PSA 9'
+            db.session.commit()
+    timed("update: commit per card (legacy)", len(card_ids), per_card_updates)
+
+    def bulk_update():
+        bulk_update_cards(user_id, [{'id': card_id, 'grade': 'PSA 10'} for card_id in card_ids])
+        db.session.commit()
+    timed("update: bulk_update_cards, one commit", len(card_ids), bulk_update)
+
+    # --- Deletes ---
+    half = len(card_ids) // 2
+    def per_card_deletes():
+        for card_id in card_ids[:half]:
+            db.session.delete(db.session.get(Card, card_id))
+            db.session.commit()
+    timed("delete: commit per card (legacy)", half, per_card_deletes)
+
+    def bulk_delete():
+        bulk_delete_cards(user_id, card_ids[half:])
+        db.session.commit()
+    timed("delete: bulk_delete_cards, one commit", len(card_ids) - half, bulk_delete)
+
+    reset(user_id)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    temp_dir = None
+    database_url = args.database_url
+    if not database_url:
+        temp_dir = tempfile.TemporaryDirectory()
+        database_url = 'sqlite:///' + os.path.join(temp_dir.name, 'bench_bulk.db')
+
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = database_url
+
+    app = create_app(BenchConfig)
+    with app.app_context():
+        db.create_all()
+        print(f"\n--- Bulk card write benchmark ({db.engine.dialect.name}, {args.cards} cards) ---")
+        run_benchmark(args.cards)
+        db.session.remove()
+
+    if temp_dir:
+        temp_dir.cleanup()
@@ -0,0 +1,120 @@
+# backend/scripts/bench_card_serializer.py
+"""Micro-benchmark of the /cards payload path: ORM + jsonify vs. app.serializers.
+
+Usage:
+    python scripts/bench_card_serializer.py --cards 10000 --repeat 5
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+from datetime import datetime, timedelta
+
+# Adjust path to import from app
+backend_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, backend_dir)
+
+from flask import jsonify
+from sqlalchemy import insert
+from config import Config
+from app import create_app, db
+from app.models import User, Card
+from app import serializers
+from app.serializers import select_card_rows, encode_json, encode_msgpack
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark card list serialization.")
+    parser.add_argument("--cards", type=int, default=10000, help="Cards in the payload. Default: 10000")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed repetitions (best is reported). Default: 5")
+    return parser.parse_args()
+
+
+def seed(count):
+    user = User(username='bench_serializer', email='bench_serializer@example.com')
+    user.set_password('bench')
+    db.session.add(user)
+    db.session.commit()
+    start = datetime(2024, 1, 1)
+    db.session.execute(insert(Card), [{
+        'player_name': f"Player {i % 400}",
+        'card_year': '2023-24',
+        'manufacturer': 'Panini',
+        'card_number': str(i),
+        'team': f"Team {i % 30}",
+        'grade': 'PSA 9' if i % 3 else None,
+        'image_url': f"https://i.ebayimg.com/images/g/{i:08d}/s-l225.jpg",
+        'notes': '',
+        'sport': 'Basketball',
+        'owner_id': user.id,
+        'date_added': start + timedelta(minutes=i),
+    } for i in range(count)])
+    db.session.commit()
+    return user.id
+
+
+def legacy_payload(user_id):
+    """The pre-serializer get_cards body: hydrate ORM objects, build dicts, jsonify."""
+    user = db.session.get(User, user_id)
+    cards_list = []
+    for card in user.cards.order_by(Card.date_added.desc()).all():
+        cards_list.append({
+            'id': card.id,
+            'player_name': card.player_name,
+            'card_year': card.card_year,
+            'manufacturer': card.manufacturer,
+            'card_number': card.card_number,
+            'team': card.team,
+            'grade': card.grade,
+            'image_url': card.image_url,
+            'date_added': card.date_added.isoformat(),
+            'notes': card.notes,
+            'sport': card.sport
+        })
+    return jsonify(cards_list).get_data()
+
+
+def rows_payload(user_id, encoder):
+    return encoder(select_card_rows(Card.owner_id == user_id, order_by=Card.date_added.desc()))
+
+
+def best_of(repeat, fn):
+    timings = []
+    for _ in range(repeat):
+        db.session.expunge_all()  # Start every run with a cold identity map
+        start = time.perf_counter()
+        body = fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings), len(body)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    temp_dir = tempfile.TemporaryDirectory()
+
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = 'sqlite:///' + os.path.join(temp_dir.name, 'bench_serializer.db')
+
+    app = create_app(BenchConfig)
+    with app.test_request_context():
+        db.create_all()
+        user_id = seed(args.cards)
+
+        scenarios = [("legacy: ORM objects + jsonify", lambda: legacy_payload(user_id))]
+        json_label = "orjson" if serializers.orjson else "json (orjson not installed)"
+        scenarios.append((f"serializer: column rows + {json_label}", lambda: rows_payload(user_id, encode_json)))
+        if serializers.msgpack:
+            scenarios.append(("serializer: column rows + msgpack", lambda: rows_payload(user_id, encode_msgpack)))
+        else:
+            print("msgpack not installed, skipping MessagePack scenario")
+
+        print(f"\n--- Card serializer benchmark ({args.cards} cards, best of {args.repeat}) ---")
+        baseline = None
+        for label, fn in scenarios:
+            elapsed, size = best_of(args.repeat, fn)
+            baseline = baseline or elapsed
+            print(f"{label:<48} {elapsed * 1000:9.1f} ms {size / 1024:9.0f} KiB  x{baseline / elapsed:5.2f}")
+        db.session.remove()
+
+    temp_dir.cleanup()
@@ -0,0 +1,116 @@
+# backend/scripts/bench_collection_stats.py
+"""Latency benchmark for /cards/stats: live GROUP BY vs. the card_facet rollups.
+
+Usage:
+    python scripts/bench_collection_stats.py
+    python scripts/bench_collection_stats.py --sizes 1000 10000 100000 --repeat 20
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+import statistics
+
+# Adjust path to import from app
+backend_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, backend_dir)
+
+from sqlalchemy import insert, delete
+from config import Config
+from app import create_app, db
+from app.models import User, Card
+from app.collection import (rebuild_card_facets, compute_collection_stats, get_collection_stats,
+                            stats_cache)
+
+TEAMS = [f"Team {i}" for i in range(30)]
+MANUFACTURERS = ["Panini", "Topps", "Upper Deck", "Fleer", "Donruss", "Hoops"]
+GRADES = [None, "Raw", "PSA 10", "PSA 9", "BGS 9.5"]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark live vs. rolled-up collection stats.")
+    parser.add_argument("--database-url", default=None,
+                        help="Database to benchmark against. Default: a temporary SQLite file.")
+    parser.add_argument("--sizes", type=int, nargs='+', default=[1000, 10000, 100000],
+                        help="Collection sizes to measure. Default: 1000 10000 100000")
+    parser.add_argument("--repeat", type=int, default=10, help="Timed calls per scenario. Default: 10")
+    return parser.parse_args()
+
+
+def seed(user_id, count):
+    rng = random.Random(count)
+    db.session.execute(delete(Card).where(Card.owner_id == user_id))
+    rows = [{
+        'player_name': f"Player {rng.randint(0, 500)}",
+        'card_year': rng.choice([f"{year}-{(year + 1) % 100:02d}" for year in range(1990, 2025)] + ['2024']),
+        'manufacturer': rng.choice(MANUFACTURERS),
+        'card_number': str(i),
+        'team': rng.choice(TEAMS),
+        'grade': rng.choice(GRADES),
+        'owner_id': user_id,
+    } for i in range(count)]
+    for start in range(0, count, 10000):
+        db.session.execute(insert(Card), rows[start:start + 10000])
+    db.session.commit()
+    rebuild_card_facets(user_id)
+
+
+def median_ms(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+        db.session.rollback()
+    return statistics.median(samples)
+
+
+def run_benchmark(sizes, repeat):
+    user = User.query.filter_by(username='bench_stats').first()
+    if not user:
+        user = User(username='bench_stats', email='bench_stats@example.com')
+        user.set_password('bench')
+        db.session.add(user)
+        db.session.commit()
+    user_id = user.id
+
+    print(f"{'cards':>8} {'live GROUP BY':>15} {'rollup read':>13} {'memoized':>10}")
+    for size in sizes:
+        seed(user_id, size)
+        live = median_ms(lambda: compute_collection_stats(user_id), repeat)
+
+        def rollup_read():
+            stats_cache.set(user_id, None, None)  # force a miss
+            get_collection_stats(user_id, size)
+        rollup = median_ms(rollup_read, repeat)
+        memoized = median_ms(lambda: get_collection_stats(user_id, size), repeat)
+        print(f"{size:>8} {live:>12.2f} ms {rollup:>10.2f} ms {memoized:>7.3f} ms")
+
+    db.session.execute(delete(Card).where(Card.owner_id == user_id))
+    db.session.commit()
+    rebuild_card_facets(user_id)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    temp_dir = None
+    database_url = args.database_url
+    if not database_url:
+        temp_dir = tempfile.TemporaryDirectory()
+        database_url = 'sqlite:///' + os.path.join(temp_dir.name, 'bench_stats.db')
+
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = database_url
+
+    app = create_app(BenchConfig)
+    with app.app_context():
+        db.create_all()
+        print(f"\n--- Collection stats benchmark ({db.engine.dialect.name}) ---")
+        run_benchmark(args.sizes, args.repeat)
+        db.session.remove()
+
+    if temp_dir:
+        temp_dir.cleanup()
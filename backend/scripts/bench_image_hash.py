@@ -0,0 +1,149 @@
+# backend/scripts/bench_image_hash.py
+"""pHash vs. dHash on re-photographed cards, and index vs. linear-scan lookup time.
+
+Part 1 renders synthetic card fronts, then "re-photographs" each one several
+ways (crop jitter, slight rotation, brightness/contrast, blur, JPEG) and
+compares the Hamming distance between copies of the same card with the
+distance between different cards. The table shows, per threshold, how many
+re-photographed copies are still caught (recall) and how many different-card
+pairs would be wrongly matched; DUPLICATE_MAX_DISTANCE and
+HASH_REUSE_MAX_DISTANCE were chosen from it.
+
+Part 2 fills a MultiIndexHash with --index-size hashes and times radius
+searches against a linear scan over the same list, in Python and vectorised
+with numpy. The stored hashes are variations of the rendered cards' pHashes,
+so they cluster the way real card hashes do.
+
+Usage:
+    python scripts/bench_image_hash.py
+    python scripts/bench_image_hash.py --cards 300 --index-size 100000 --queries 200
+"""
+import os
+import sys
+import time
+import argparse
+import numpy as np
+
+# Adjust path to import from app
+backend_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, backend_dir)
+
+import cv2
+from app.image_hash import phash, dhash, hamming, MultiIndexHash, HASH_BITS
+
+CARD_SIZE = (500, 700) # width, height of a rendered card crop
+THRESHOLDS = (4, 6, 8, 10, 12)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark perceptual hashes and the BK-tree index.")
+    parser.add_argument("--cards", type=int, default=200, help="Distinct cards to render. Default: 200")
+    parser.add_argument("--copies", type=int, default=6, help="Re-photographed copies per card. Default: 6")
+    parser.add_argument("--index-size", type=int, default=100000, help="Hashes in the search index. Default: 100000")
+    parser.add_argument("--queries", type=int, default=200, help="Searches per radius. Default: 200")
+    return parser.parse_args()
+
+
+def render_card(rng):
+    """A card front: a smooth 'photo' window, a border and a name plate with text."""
+    width, height = CARD_SIZE
+    card = np.full((height, width, 3), rng.integers(30, 220, 3), np.uint8)
+    noise = rng.random((height // 40, width // 40, 3)).astype(np.float32) * 255
+    photo = cv2.GaussianBlur(cv2.resize(noise, (width - 60, int(height * 0.7))), (0, 0), 6)
+    card[30:30 + photo.shape[0], 30:width - 30] = photo.astype(np.uint8)
+    name = ''.join(chr(c) for c in rng.integers(65, 91, rng.integers(8, 14)))
+    cv2.putText(card, name, (40, height - 70), cv2.FONT_HERSHEY_SIMPLEX, 1.3, (20, 20, 20), 3)
+    cv2.putText(card, str(rng.integers(1, 700)), (40, height - 25), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (20, 20, 20), 2)
+    return card
+
+
+def rephotograph(card, rng):
+    """The same card as another binder photo would crop it."""
+    height, width = card.shape[:2]
+    # Crop jitter and a slight rotation, as the splitter's quad would vary
+    angle = rng.uniform(-2, 2)
+    scale = rng.uniform(0.96, 1.04)
+    matrix = cv2.getRotationMatrix2D((width / 2, height / 2), angle, scale)
+    matrix[:, 2] += rng.uniform(-0.03, 0.03, 2) * (width, height)
+    img = cv2.warpAffine(card, matrix, (width, height), borderMode=cv2.BORDER_REPLICATE)
+    # Lighting, focus and the camera's own compression
+    img = cv2.convertScaleAbs(img, alpha=rng.uniform(0.75, 1.25), beta=rng.uniform(-30, 30))
+    if rng.random() < 0.5:
+        img = cv2.GaussianBlur(img, (0, 0), rng.uniform(0.5, 2.0))
+    # Photos come at different resolutions
+    side = rng.uniform(0.4, 1.5)
+    img = cv2.resize(img, None, fx=side, fy=side, interpolation=cv2.INTER_AREA)
+    ok, encoded = cv2.imencode('.jpg', img, [cv2.IMWRITE_JPEG_QUALITY, int(rng.integers(50, 95))])
+    return cv2.imdecode(encoded, cv2.IMREAD_GRAYSCALE)
+
+
+def hash_distances(cards, copies, rng):
+    """Same-card and different-card Hamming distances for each hash function."""
+    hashes = {'phash': [], 'dhash': []}
+    for card in cards:
+        versions = [cv2.cvtColor(card, cv2.COLOR_BGR2GRAY)] + [rephotograph(card, rng) for _ in range(copies)]
+        hashes['phash'].append([phash(v) for v in versions])
+        hashes['dhash'].append([dhash(v) for v in versions])
+    results = {}
+    for name, per_card in hashes.items():
+        same = [hamming(versions[0], other) for versions in per_card for other in versions[1:]]
+        originals = [versions[0] for versions in per_card]
+        different = [hamming(a, b) for i, a in enumerate(originals) for b in originals[i + 1:]]
+        results[name] = (np.array(same), np.array(different))
+    return results, [versions[0] for versions in hashes['phash']]
+
+
+def time_searches(search, queries, radius):
+    start = time.perf_counter()
+    hits = sum(len(search(query, radius)) for query in queries)
+    return (time.perf_counter() - start) / len(queries) * 1000, hits
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    rng = np.random.default_rng(0)
+
+    cards = [render_card(rng) for _ in range(args.cards)]
+    results, card_hashes = hash_distances(cards, args.copies, rng)
+    print(f"\n--- Hash robustness: {args.cards} cards x {args.copies} re-photographed copies ---")
+    print(f"{'hash':<7} {'same p50':>9} {'same p95':>9} {'same max':>9} {'diff min':>9} {'diff p1':>8} {'diff p50':>9}")
+    for name, (same, different) in results.items():
+        print(f"{name:<7} {np.median(same):>9.0f} {np.percentile(same, 95):>9.0f} {same.max():>9} "
+              f"{different.min():>9} {np.percentile(different, 1):>8.0f} {np.median(different):>9.0f}")
+    print(f"\n{'hash':<7} {'distance':>9} {'recall':>8} {'false pairs':>12}")
+    for name, (same, different) in results.items():
+        for threshold in THRESHOLDS:
+            print(f"{name:<7} {threshold:>9} {np.mean(same <= threshold):>8.1%} "
+                  f"{int(np.sum(different <= threshold)):>6} / {len(different)}")
+
+    # Grow the index from the rendered hashes by flipping a few bits, so it keeps
+    # the spread of real card hashes rather than uniform noise
+    index_hashes = []
+    while len(index_hashes) < args.index_size:
+        base = card_hashes[int(rng.integers(len(card_hashes)))]
+        flips = rng.choice(HASH_BITS, int(rng.integers(8, 20)), replace=False)
+        index_hashes.append(base ^ int(sum(1 << int(bit) for bit in flips)))
+    index = MultiIndexHash()
+    start = time.perf_counter()
+    for i, value in enumerate(index_hashes):
+        index.add(value, i)
+    build_s = time.perf_counter() - start
+    queries = [index_hashes[int(i)] ^ (1 << int(rng.integers(HASH_BITS)))
+               for i in rng.integers(len(index_hashes), size=args.queries)]
+    packed = np.array(index_hashes, dtype=np.uint64)
+
+    def linear_search(value, radius):
+        return [(d, i) for i, h in enumerate(index_hashes) if (d := hamming(value, h)) <= radius]
+
+    def numpy_search(value, radius):
+        return np.flatnonzero(np.bitwise_count(packed ^ np.uint64(value)) <= radius)
+
+    print(f"\n--- Index lookup: {len(index_hashes)} hashes, {args.queries} queries "
+          f"(index built in {build_s:.1f} s) ---")
+    print(f"{'radius':>6} {'linear ms':>10} {'numpy ms':>9} {'index ms':>9} {'hits/query':>11}")
+    for radius in (4, 6, 10):
+        linear_ms, linear_hits = time_searches(linear_search, queries, radius)
+        numpy_ms, numpy_hits = time_searches(numpy_search, queries, radius)
+        index_ms, index_hits = time_searches(index.search, queries, radius)
+        assert linear_hits == numpy_hits == index_hits, "index and linear scan disagree"
+        print(f"{radius:>6} {linear_ms:>10.2f} {numpy_ms:>9.2f} {index_ms:>9.2f} {index_hits / len(queries):>11.1f}")
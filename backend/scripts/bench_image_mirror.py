@@ -0,0 +1,136 @@
+# backend/scripts/bench_image_mirror.py
+"""Image mirror throughput, serving cost and LRU eviction against a local eBay stand-in.
+
+Starts scripts/ebay_image_standin.py on 127.0.0.1 with --latency-ms per
+response and a temporary database and mirror folder, then:
+
+1. Mirrors --images images at each concurrency in --concurrency and reports
+   images/s, i.e. what IMAGE_MIRROR_CONCURRENCY buys when the source is slow.
+2. Loads a grid of those images through GET /mirror/<key> on the Flask test
+   client (local copies) and straight from the stand-in (hotlinking).
+3. Sets the budget to --budget-share of the bytes mirrored and keeps
+   mirroring new images while a hot set is served between batches. Reports
+   the folder size against the budget, the evictions and how much of the hot
+   set survived, which should be all of it.
+
+Usage:
+    python scripts/bench_image_mirror.py
+    python scripts/bench_image_mirror.py --images 200 --latency-ms 150 --concurrency 1,4,8,16
+"""
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import contextlib
+
+# Adjust path to import from app
+backend_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, backend_dir)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import requests
+from config import Config
+from app import create_app, db
+from app.image_mirror import ImageMirror, get_image_mirror, mirror_key, register_mirror_images
+from ebay_image_standin import start_standin
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark the image mirror against a local HTTP stand-in.")
+    parser.add_argument("--images", type=int, default=120, help="Images mirrored per concurrency level. Default: 120")
+    parser.add_argument("--latency-ms", type=float, default=100, help="Stand-in response delay. Default: 100")
+    parser.add_argument("--concurrency", default="1,4,8", help="Comma-separated worker counts. Default: 1,4,8")
+    parser.add_argument("--grid-images", type=int, default=60, help="Images in the served grid. Default: 60")
+    parser.add_argument("--budget-share", type=float, default=0.5,
+                        help="Eviction run budget as a share of the bytes mirrored. Default: 0.5")
+    return parser.parse_args()
+
+
+def mirror_all(mirror, urls):
+    """Registers and downloads urls with the given mirror; returns (seconds, keys)."""
+    added = register_mirror_images(urls)
+    db.session.commit()
+    start = time.perf_counter()
+    futures = [mirror.enqueue(key, url) for key, url in added.items()]
+    for future in futures:
+        future.result()
+    return time.perf_counter() - start, list(added)
+
+
+def folder_bytes(folder):
+    return sum(os.path.getsize(os.path.join(dirpath, name))
+               for dirpath, _, names in os.walk(folder) for name in names)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    work_dir = tempfile.mkdtemp(prefix='bench_image_mirror_')
+    server, base_url = start_standin(latency_ms=args.latency_ms)
+
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = 'sqlite:///' + os.path.join(work_dir, 'bench.db')
+        IMAGE_MIRROR = True
+        IMAGE_MIRROR_FOLDER = os.path.join(work_dir, 'mirror')
+        IMAGE_MIRROR_HOSTS = ['127.0.0.1']
+
+    try:
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            app = create_app(BenchConfig)
+        with app.app_context():
+            db.create_all()
+
+            def image_urls(prefix, count):
+                return [f"{base_url}/images/g/{prefix}{i}/s-l1600.jpg" for i in range(count)]
+
+            print(f"\n--- Mirroring {args.images} images, stand-in latency {args.latency_ms:.0f} ms ---")
+            print(f"{'workers':>7} {'seconds':>8} {'images/s':>9}")
+            for workers in (int(value) for value in args.concurrency.split(',')):
+                mirror = ImageMirror(app, os.path.join(work_dir, f"sweep_{workers}"), concurrency=workers)
+                elapsed, keys = mirror_all(mirror, image_urls(f"c{workers}-", args.images))
+                assert mirror.fetched == len(keys), f"{mirror.failed} downloads failed"
+                print(f"{workers:>7} {elapsed:>8.2f} {len(keys) / elapsed:>9.1f}")
+                mirror.shutdown()
+
+            mirror = get_image_mirror()
+            grid_urls = image_urls('grid-', args.grid_images)
+            mirror_all(mirror, grid_urls)
+            client = app.test_client()
+            paths = [f"/mirror/{mirror_key(url)}" for url in grid_urls]
+            assert client.get(paths[0]).status_code == 200
+            start = time.perf_counter()
+            local_bytes = sum(len(client.get(path).data) for path in paths)
+            local_ms = (time.perf_counter() - start) * 1000
+            start = time.perf_counter()
+            remote_bytes = sum(len(requests.get(url).content) for url in grid_urls)
+            remote_ms = (time.perf_counter() - start) * 1000
+            print(f"\n--- {args.grid_images}-image grid, one request at a time ---")
+            print(f"{'source':<12} {'total ms':>9} {'ms/image':>9} {'KB':>8}")
+            print(f"{'mirror':<12} {local_ms:>9.1f} {local_ms / len(paths):>9.2f} {local_bytes / 1024:>8.0f}")
+            print(f"{'hotlink':<12} {remote_ms:>9.1f} {remote_ms / len(paths):>9.2f} {remote_bytes / 1024:>8.0f}")
+
+            # Eviction: a budget smaller than what gets mirrored, with a hot set served throughout
+            image_bytes = local_bytes / len(paths)
+            eviction_dir = os.path.join(work_dir, 'eviction')
+            budget = int(args.images * image_bytes * args.budget_share)
+            mirror = ImageMirror(app, eviction_dir, concurrency=8, max_bytes=budget)
+            hot_urls = image_urls('hot-', max(1, int(args.images * args.budget_share / 4)))
+            _, hot_keys = mirror_all(mirror, hot_urls)
+            hot_files = {os.path.join(dirpath, name) for dirpath, _, names in os.walk(eviction_dir) for name in names}
+            peak = 0
+            batch = max(1, args.images // 10)
+            for i in range(0, args.images, batch):
+                for path in hot_files:
+                    mirror.touch(path)
+                mirror_all(mirror, image_urls(f"cold{i}-", batch))
+                peak = max(peak, folder_bytes(eviction_dir))
+            survivors = sum(os.path.exists(path) for path in hot_files)
+            print(f"\n--- LRU eviction: budget {budget / 1024:.0f} KB, {args.images} cold + {len(hot_keys)} hot images ---")
+            print(f"peak folder size: {peak / 1024:.0f} KB ({peak / budget:.0%} of budget)")
+            print(f"evicted files:    {mirror.evicted}")
+            print(f"hot set kept:     {survivors} / {len(hot_files)}")
+            mirror.shutdown()
+    finally:
+        server.shutdown()
+        shutil.rmtree(work_dir, ignore_errors=True)
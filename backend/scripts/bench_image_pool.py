@@ -0,0 +1,125 @@
+# backend/scripts/bench_image_pool.py
+"""Binder page throughput on the image process pool vs. request threads, and frame transfer cost.
+
+Writes synthetic 3x3 binder pages to a temp directory and pushes them through
+process_binder_page (split + triage, as /upload-binder does) two ways:
+
+    threads  N threads calling it in-process, OpenCV at its default thread count
+    pool     ImageWorkerPool with N processes, cv2.setNumThreads(--cv-threads) each
+
+and reports pages/s and pages/s per core used. It then compares handing a
+decoded frame to a worker pickled (submit) against shared memory (submit_frame).
+
+Process pools only pay off with spare cores: on a single-core machine expect
+the pool to match the threads, not beat them.
+
+Usage:
+    python scripts/bench_image_pool.py
+    python scripts/bench_image_pool.py --pages 48 --workers 1 2 4 --megapixels 12
+"""
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import contextlib
+from concurrent.futures import ThreadPoolExecutor
+
+# Adjust path to import from app
+backend_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, backend_dir)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import cv2
+from config import Config
+from app.image_utils import process_binder_page
+from app.image_pool import ImageWorkerPool
+from bench_binder_splitters import render_page, FRAMINGS
+
+TRIAGE = {'min_edge_density': Config.TRIAGE_MIN_EDGE_DENSITY, 'min_sharpness': Config.TRIAGE_MIN_SHARPNESS,
+          'max_clipped': Config.TRIAGE_MAX_CLIPPED}
+
+
+def parse_args():
+    cores = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description="Benchmark the image process pool.")
+    parser.add_argument("--pages", type=int, default=24, help="Pages per run. Default: 24")
+    parser.add_argument("--megapixels", type=float, default=12, help="Page photo size. Default: 12")
+    parser.add_argument("--workers", type=int, nargs='+', default=sorted({1, cores}),
+                        help=f"Worker counts to compare. Default: 1 {cores}")
+    parser.add_argument("--cv-threads", type=int, default=1, help="cv2.setNumThreads per pool worker. Default: 1")
+    parser.add_argument("--transfers", type=int, default=20, help="Frames per transfer test. Default: 20")
+    return parser.parse_args()
+
+
+def quiet_process_binder_page(*args, **kwargs):
+    """process_binder_page without its progress prints (they would interleave with the table)."""
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        return process_binder_page(*args, **kwargs)
+
+
+def frame_checksum(frame):
+    """Worker task for the transfer test: touches every pixel, returns a scalar."""
+    return int(frame[::7, ::7].sum())
+
+
+def run_threads(pages, out_root, workers):
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(quiet_process_binder_page, path, os.path.join(out_root, f"t{i}"), triage=TRIAGE)
+                   for i, path in enumerate(pages)]
+        return [future.result() for future in futures]
+
+
+def run_pool(pool, pages, out_root):
+    futures = [pool.submit(quiet_process_binder_page, path, os.path.join(out_root, f"p{i}"), triage=TRIAGE)
+               for i, path in enumerate(pages)]
+    return [future.result() for future in futures]
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    cores = os.cpu_count() or 1
+    work_dir = tempfile.mkdtemp(prefix='bench_image_pool_')
+    try:
+        pages = []
+        for i in range(min(args.pages, 6)):
+            img, _ = render_page('3x3', FRAMINGS[i % len(FRAMINGS)][1], args.megapixels, seed=i)
+            path = os.path.join(work_dir, f"page_{i}.jpg")
+            cv2.imwrite(path, img)
+            pages.append(path)
+        # Reuse the rendered pages to reach the requested count
+        pages = [pages[i % len(pages)] for i in range(args.pages)]
+
+        print(f"\n--- Image pool benchmark: {args.pages} pages of {args.megapixels:g} MP, {cores} CPU(s) ---")
+        print(f"{'mode':<10} {'workers':>8} {'cores used':>11} {'pages/s':>9} {'pages/s/core':>13}")
+        for workers in args.workers:
+            used = min(workers, cores)
+            threads = timed(run_threads, pages, os.path.join(work_dir, 'out'), workers)
+            pool = ImageWorkerPool(workers, cv_threads=args.cv_threads, queue_size=args.pages)
+            pool.run(quiet_process_binder_page, pages[0], os.path.join(work_dir, 'warmup'))  # start workers
+            pooled = timed(run_pool, pool, pages, os.path.join(work_dir, 'out'))
+            # Threads let OpenCV use every core; the pool uses workers x cv_threads
+            for mode, seconds, cores_used in (('threads', threads, cores),
+                                              ('pool', pooled, min(cores, used * args.cv_threads))):
+                rate = args.pages / seconds
+                print(f"{mode:<10} {workers:>8} {cores_used:>11} {rate:>9.2f} {rate / cores_used:>13.2f}")
+
+            if workers == args.workers[-1]:
+                frame, _ = render_page('3x3', FRAMINGS[0][1], args.megapixels)
+                pickled = timed(lambda: [pool.submit(frame_checksum, frame).result()
+                                         for _ in range(args.transfers)])
+                shared = timed(lambda: [pool.submit_frame(frame_checksum, frame).result()
+                                        for _ in range(args.transfers)])
+                print(f"\nFrame handoff ({frame.nbytes / 2 ** 20:.0f} MB frame, {workers} worker(s))")
+                print(f"{'pickled':<10} {pickled / args.transfers * 1000:>8.1f} ms/frame")
+                print(f"{'shared':<10} {shared / args.transfers * 1000:>8.1f} ms/frame")
+            pool.shutdown()
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
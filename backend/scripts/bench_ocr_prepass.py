@@ -0,0 +1,102 @@
+# backend/scripts/bench_ocr_prepass.py
+"""Per-card latency and eBay API spend with and without the OCR pre-pass.
+
+Runs every card crop in a directory through identify_card twice, once with
+OCR off (every card is an eBay image search, the old behaviour) and once with
+it on, and reports per-card latency, where each card was identified
+(ocr / keyword / image) and how many eBay searches were made. Spend weighs
+the searches with --image-cost and --keyword-cost (e.g. quota units or
+cents per call).
+
+This calls the real eBay API when EBAY_APP_ID is configured. Without
+credentials the lookups fail at once, so the latencies cover OCR only but
+the call counts still show what each mode would spend.
+
+Usage:
+    python scripts/bench_ocr_prepass.py path/to/card_crops
+    python scripts/bench_ocr_prepass.py path/to/card_crops --image-cost 1.0 --keyword-cost 0.2 --limit 50
+"""
+import os
+import sys
+import time
+import argparse
+import contextlib
+import statistics
+
+# Adjust path to import from app
+backend_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, backend_dir)
+
+from app import create_app
+from app.card_identification import identify_card, ocr_available
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp')
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Compare card identification with and without OCR.")
+    parser.add_argument("crops", help="Directory of single-card images (e.g. a binder page's _cards folder).")
+    parser.add_argument("--limit", type=int, default=0, help="Only the first N crops. Default: all")
+    parser.add_argument("--image-cost", type=float, default=1.0, help="Cost of one image search. Default: 1.0")
+    parser.add_argument("--keyword-cost", type=float, default=1.0, help="Cost of one keyword search. Default: 1.0")
+    return parser.parse_args()
+
+
+def run(paths, use_ocr):
+    rows = []
+    for path in paths:
+        start = time.perf_counter()
+        # Silence the per-call progress prints
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            mapped_data, info = identify_card(path, use_ocr=use_ocr)
+        info['total_ms'] = (time.perf_counter() - start) * 1000
+        info['identified'] = mapped_data is not None
+        rows.append((os.path.basename(path), info))
+    return rows
+
+
+def summarize(label, rows, image_cost, keyword_cost):
+    totals = [info['total_ms'] for _, info in rows]
+    calls = {kind: sum(info['api_calls'][kind] for _, info in rows) for kind in ('image', 'keyword')}
+    sources = {source: sum(info['source'] == source for _, info in rows) for source in ('ocr', 'keyword', 'image')}
+    spend = calls['image'] * image_cost + calls['keyword'] * keyword_cost
+    p95 = statistics.quantiles(totals, n=20)[18] if len(totals) >= 2 else totals[0]
+    print(f"{label:<10} {statistics.median(totals):>9.1f} {p95:>9.1f} "
+          f"{sources['ocr']:>5} {sources['keyword']:>8} {sources['image']:>6} "
+          f"{calls['image']:>9} {calls['keyword']:>9} {spend:>8.2f} "
+          f"{sum(info['identified'] for _, info in rows):>11}")
+    return spend
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    paths = sorted(os.path.join(args.crops, name) for name in os.listdir(args.crops)
+                   if name.lower().endswith(IMAGE_EXTENSIONS))
+    if args.limit:
+        paths = paths[:args.limit]
+    if not paths:
+        sys.exit(f"No card images in {args.crops}")
+
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        app = create_app()
+    with app.app_context():
+        if not ocr_available():
+            print("Warning: pytesseract/tesseract unavailable; the OCR run will match the baseline.")
+        if not app.config.get('EBAY_APP_ID'):
+            print("Warning: EBAY_APP_ID not set; eBay lookups fail immediately (latency is OCR only).")
+
+        without = run(paths, use_ocr=False)
+        with_ocr = run(paths, use_ocr=True)
+
+        print(f"\n--- OCR pre-pass: {len(paths)} card crops ---")
+        print(f"{'card':<24} {'no OCR ms':>10} {'OCR ms':>8} {'lookup ms':>10} {'route':>8} {'score':>6}")
+        for (name, before), (_, after) in zip(without, with_ocr):
+            print(f"{name[:24]:<24} {before['total_ms']:>10.1f} {after['ocr_ms']:>8.1f} "
+                  f"{after['lookup_ms']:>10.1f} {after['source']:>8} {after['player_score']:>6}")
+
+        print(f"\n{'mode':<10} {'p50 ms':>9} {'p95 ms':>9} {'ocr':>5} {'keyword':>8} {'image':>6} "
+              f"{'img calls':>9} {'kw calls':>9} {'spend':>8} {'identified':>11}")
+        baseline = summarize('no OCR', without, args.image_cost, args.keyword_cost)
+        spend = summarize('OCR', with_ocr, args.image_cost, args.keyword_cost)
+        if baseline:
+            print(f"\nAPI spend with OCR: {spend / baseline:.0%} of the image-search-only baseline")
@@ -0,0 +1,137 @@
+# backend/scripts/bench_sqlite_concurrency.py
+"""Concurrent read/write throughput on SQLite with and without the engine profile.
+
+Starts several worker processes (like gunicorn workers) against one database
+file: writers save cards one commit at a time, as a binder upload does, while
+readers fetch the collection grid. Runs once with SQLITE_TUNING off (default
+rollback journal) and once with the WAL/pragma/write-lock profile on.
+
+Usage:
+    python scripts/bench_sqlite_concurrency.py
+    python scripts/bench_sqlite_concurrency.py --writers 4 --readers 8 --seconds 10
+"""
+import os
+import sys
+import io
+import time
+import argparse
+import tempfile
+import contextlib
+import multiprocessing
+
+# Adjust path to import from app
+backend_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, backend_dir)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark concurrent SQLite reads/writes before and after tuning.")
+    parser.add_argument("--writers", type=int, default=4, help="Writer processes. Default: 4")
+    parser.add_argument("--readers", type=int, default=4, help="Reader processes. Default: 4")
+    parser.add_argument("--seconds", type=float, default=5.0, help="Duration of each run. Default: 5")
+    parser.add_argument("--seed-cards", type=int, default=2000, help="Cards in the collection before the run. Default: 2000")
+    return parser.parse_args()
+
+
+def make_app(database_url, tuned):
+    from config import Config
+
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = database_url
+        SQLITE_TUNING = tuned
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        from app import create_app
+        return create_app(BenchConfig)
+
+
+def worker(database_url, tuned, role, user_id, seconds, ready, results):
+    import logging
+    logging.disable(logging.WARNING)
+    from sqlalchemy.exc import OperationalError
+    app = make_app(database_url, tuned)
+    from app import db
+    from app.models import Card
+    from app.services import save_card_from_data
+    from app.serializers import select_card_rows
+
+    ops = errors = 0
+    latencies = []
+    with app.app_context():
+        # Start together once every process has imported the app
+        ready.wait()
+        deadline = time.time() + seconds
+        while time.time() < deadline:
+            began = time.perf_counter()
+            try:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    if role == 'write':
+                        save_card_from_data({'player_name': 'Bench Player', 'card_year': '2023-24',
+                                             'manufacturer': 'Panini', 'card_number': str(ops)}, user_id)
+                    else:
+                        select_card_rows(Card.owner_id == user_id, order_by=Card.date_added.desc())
+                        db.session.rollback()
+                ops += 1
+                latencies.append(time.perf_counter() - began)
+            except Exception as e:
+                # "database is locked" surfaces as OperationalError (wrapped by save_card_from_data)
+                db.session.rollback()
+                if isinstance(e, OperationalError) or 'locked' in str(e):
+                    errors += 1
+                else:
+                    raise
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95)] * 1000 if latencies else 0.0
+    results.put((role, ops, errors, p95))
+
+
+def run_scenario(label, tuned, args):
+    temp_dir = tempfile.TemporaryDirectory()
+    database_url = 'sqlite:///' + os.path.join(temp_dir.name, 'bench_concurrency.db')
+    app = make_app(database_url, tuned)
+    from app import db
+    from app.models import User
+    from app.services import bulk_create_cards
+    with app.app_context():
+        db.create_all()
+        user = User(username='bench_concurrency', email='bench_concurrency@example.com')
+        user.set_password('bench')
+        db.session.add(user)
+        db.session.commit()
+        user_id = user.id
+        bulk_create_cards(user_id, [{'player_name': f'Player {i}', 'card_year': '2023-24', 'manufacturer': 'Panini',
+                                     'card_number': str(i), 'team': 'Team'} for i in range(args.seed_cards)])
+        db.session.commit()
+        db.session.remove()
+        db.engine.dispose()
+
+    ctx = multiprocessing.get_context('spawn')
+    results = ctx.Queue()
+    roles = ['write'] * args.writers + ['read'] * args.readers
+    ready = ctx.Barrier(len(roles))
+    processes = [ctx.Process(target=worker, args=(database_url, tuned, role, user_id, args.seconds, ready, results))
+                 for role in roles]
+    for process in processes:
+        process.start()
+    collected = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    temp_dir.cleanup()
+
+    print(f"\n{label}")
+    for role in ('write', 'read'):
+        rows = [r for r in collected if r[0] == role]
+        if not rows:
+            continue
+        ops = sum(r[1] for r in rows)
+        errors = sum(r[2] for r in rows)
+        p95 = max(r[3] for r in rows)
+        print(f"  {role + 's':<7} {ops / args.seconds:10,.1f} ops/s  {errors:5} 'database is locked' errors  "
+              f"worst-worker p95 {p95:8.1f} ms")
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    print(f"--- SQLite concurrency benchmark: {args.writers} writers, {args.readers} readers, {args.seconds}s ---")
+    run_scenario("Before: default SQLite settings (SQLITE_TUNING=false)", False, args)
+    run_scenario("After: WAL + pragmas + serialized writes (SQLITE_TUNING=true)", True, args)
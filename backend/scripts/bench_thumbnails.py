@@ -0,0 +1,108 @@
+# backend/scripts/bench_thumbnails.py
+"""Thumbnail generation cost and what a card grid downloads with and without thumbnails.
+
+Renders --cards synthetic card crops at binder-crop size, runs make_thumbnails
+on each and reports the time per crop and the bytes per width/format. It then
+serves a --grid-card grid through GET /thumbnails on the Flask test client:
+cold (200), revalidated (If-None-Match -> 304) and as byte ranges, against
+shipping the full crops. Browsers never revalidate an immutable thumbnail, so
+the 304 row is the worst case after a cache eviction.
+
+Usage:
+    python scripts/bench_thumbnails.py
+    python scripts/bench_thumbnails.py --cards 40 --grid-cards 500 --crop-width 1000
+"""
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import contextlib
+import statistics
+
+# Adjust path to import from app
+backend_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, backend_dir)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import cv2
+import numpy as np
+from config import Config
+from app import create_app
+from app.thumbnails import make_thumbnails, thumbnail_relpath
+from bench_image_hash import render_card
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark crop thumbnails and their serving endpoint.")
+    parser.add_argument("--cards", type=int, default=30, help="Distinct crops to render. Default: 30")
+    parser.add_argument("--grid-cards", type=int, default=500, help="Cards in the simulated grid. Default: 500")
+    parser.add_argument("--crop-width", type=int, default=1000, help="Crop width in px (12 MP page / 3). Default: 1000")
+    parser.add_argument("--grid-width", type=int, default=400, help="Thumbnail width the grid loads. Default: 400")
+    return parser.parse_args()
+
+
+def timed_requests(client, urls, headers=None):
+    start = time.perf_counter()
+    total = 0
+    for url in urls:
+        response = client.get(url, headers=headers(url) if headers else None)
+        total += len(response.data)
+    return (time.perf_counter() - start) * 1000, total
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    work_dir = tempfile.mkdtemp(prefix='bench_thumbnails_')
+
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = 'sqlite:///' + os.path.join(work_dir, 'bench.db')
+        THUMBNAIL_FOLDER = os.path.join(work_dir, 'thumbnails')
+
+    try:
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            app = create_app(BenchConfig)
+        settings = {'folder': BenchConfig.THUMBNAIL_FOLDER, 'widths': BenchConfig.THUMBNAIL_SIZES,
+                    'formats': BenchConfig.THUMBNAIL_FORMATS, 'quality': BenchConfig.THUMBNAIL_QUALITY}
+
+        rng = np.random.default_rng(0)
+        crop_height = int(args.crop_width * 1.4)
+        crops, keys, timings = [], [], []
+        for i in range(args.cards):
+            path = os.path.join(work_dir, f"crop_{i}.jpg")
+            cv2.imwrite(path, cv2.resize(render_card(rng), (args.crop_width, crop_height)),
+                        [cv2.IMWRITE_JPEG_QUALITY, 92])
+            start = time.perf_counter()
+            keys.append(make_thumbnails(path, **settings))
+            timings.append((time.perf_counter() - start) * 1000)
+            crops.append(path)
+
+        crop_bytes = statistics.mean(os.path.getsize(path) for path in crops)
+        print(f"\n--- Thumbnails: {args.cards} crops of {args.crop_width}x{crop_height} "
+              f"(quality {settings['quality']}) ---")
+        print(f"make_thumbnails: {statistics.median(timings):.1f} ms/crop median "
+              f"({len(settings['widths']) * len(settings['formats'])} files)")
+        print(f"{'size':<10} {'avg KB':>8} {'of crop':>8}")
+        print(f"{'crop':<10} {crop_bytes / 1024:>8.1f} {'100%':>8}")
+        for width in settings['widths']:
+            for extension in settings['formats']:
+                size = statistics.mean(os.path.getsize(os.path.join(settings['folder'],
+                                                                    thumbnail_relpath(key, width, extension)))
+                                       for key in keys)
+                print(f"{f'{width}.{extension}':<10} {size / 1024:>8.1f} {size / crop_bytes:>8.1%}")
+
+        grid = [f"/thumbnails/{keys[i % len(keys)]}/{args.grid_width}.webp" for i in range(args.grid_cards)]
+        client = app.test_client()
+        client.get(grid[0])  # Warm up the route
+        etags = {url: client.get(url).headers['ETag'] for url in set(grid)}
+        print(f"\n--- {args.grid_cards}-card grid at {args.grid_width} px WebP (Flask test client) ---")
+        print(f"{'request':<16} {'total ms':>9} {'ms/image':>9} {'MB':>7}")
+        for label, headers in (('cold 200', None),
+                               ('revalidate 304', lambda url: {'If-None-Match': etags[url]}),
+                               ('range 0-1023', lambda url: {'Range': 'bytes=0-1023'})):
+            elapsed, total = timed_requests(client, grid, headers)
+            print(f"{label:<16} {elapsed:>9.1f} {elapsed / len(grid):>9.2f} {total / 2 ** 20:>7.2f}")
+        print(f"{'full crops':<16} {'':>9} {'':>9} {crop_bytes * args.grid_cards / 2 ** 20:>7.2f}")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
@@ -0,0 +1,204 @@
+# backend/scripts/check_query_plans.py
+"""Query-plan regression check for the hot Card queries in app/routes.py.
+
+Seeds a synthetic multi-user collection, runs EXPLAIN on each hot query and
+exits non-zero if any of them falls back to a full scan of the card tables
+(or to a separate sort step for queries that should be served in index order).
+
+Usage:
+    python scripts/check_query_plans.py                      # throwaway SQLite db
+    python scripts/check_query_plans.py --database-url postgresql://... --users 2000
+"""
+import os
+import sys
+import re
+import json
+import random
+import argparse
+import tempfile
+from datetime import datetime, timedelta
+
+# Adjust path to import from app
+backend_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, backend_dir)
+
+from sqlalchemy import select, insert, text, func
+from config import Config
+from app import create_app, db
+from app.models import User, Card, CardFacet
+from app.collection import rebuild_card_facets
+from app.serializers import card_rows_statement
+
+PLAYERS = ["Jaylen Brown", "Jayson Tatum", "Tyler Herro", "Ja Morant", "LeBron James",
+           "Stephen Curry", "Nikola Jokic", "Luka Doncic", "Anthony Edwards", "Jaren Jackson Jr."]
+MANUFACTURERS = ["Panini", "Topps", "Upper Deck", "Fleer", "Donruss", "Hoops"]
+TEAMS = ["Boston Celtics", "Miami Heat", "Memphis Grizzlies", "Los Angeles Lakers", "Denver Nuggets"]
+
+# Tables that must never be scanned in full by a hot query
+SCAN_GUARDED_TABLES = ('card', 'card_facet')
+
+# (name, query builder, must be served in index order)
+# Mirrors the statements issued by get_cards, get_autocomplete_options and the
+# per-card ownership checks in routes.py.
+HOT_QUERIES = [
+    ('collection_grid',
+     lambda owner_id, card_id: card_rows_statement(Card.owner_id == owner_id, order_by=Card.date_added.desc()),
+     True),
+    ('autocomplete_player_names',
+     lambda owner_id, card_id: select(Card.player_name).where(Card.owner_id == owner_id)
+                                .distinct().order_by(Card.player_name),
+     True),
+    ('player_filter',
+     lambda owner_id, card_id: select(Card).where(Card.owner_id == owner_id, Card.player_name == PLAYERS[0]),
+     False),
+    ('player_id_filter',
+     lambda owner_id, card_id: card_rows_statement(Card.owner_id == owner_id, Card.player_id == 1),
+     False),
+    ('season_range',
+     lambda owner_id, card_id: card_rows_statement(Card.owner_id == owner_id, Card.season_start >= 2005,
+                                                   Card.season_start <= 2015, order_by=Card.season_start.desc()),
+     True),
+    ('autocomplete_prefix',
+     lambda owner_id, card_id: select(CardFacet.value, CardFacet.count)
+                                .where(CardFacet.owner_id == owner_id, CardFacet.field == 'player_name',
+                                       CardFacet.value_key >= 'ja', CardFacet.value_key < 'jb')
+                                .order_by(CardFacet.value_key).limit(20),
+     True),
+    ('card_by_id',
+     lambda owner_id, card_id: select(Card).where(Card.id == card_id),
+     False),
+]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Fail if hot Card queries regress to full table scans.")
+    parser.add_argument("--database-url", default=None,
+                        help="Database to check. Default: a temporary SQLite file.")
+    parser.add_argument("--users", type=int, default=500, help="Synthetic users to create. Default: 500")
+    parser.add_argument("--cards-per-user", type=int, default=200, help="Synthetic cards per user. Default: 200")
+    parser.add_argument("--batch-size", type=int, default=10000, help="Insert batch size. Default: 10000")
+    return parser.parse_args()
+
+
+def seed(users, cards_per_user, batch_size):
+    """Populate the database with a synthetic collection if it is empty."""
+    if db.session.scalar(select(func.count()).select_from(Card)):
+        print("Card table already populated, skipping seed.")
+        return
+
+    print(f"Seeding {users} users x {cards_per_user} cards...")
+    rng = random.Random(42)
+    db.session.execute(insert(User), [
+        {'username': f'bench_user_{i}', 'email': f'bench_user_{i}@example.com', 'password_hash': 'x'}
+        for i in range(users)
+    ])
+    user_ids = db.session.scalars(select(User.id)).all()
+
+    start = datetime(2024, 1, 1)
+    rows = []
+    for owner_id in user_ids:
+        for _ in range(cards_per_user):
+            season_start = rng.randint(1990, 2024)
+            rows.append({
+                'player_name': rng.choice(PLAYERS),
+                'card_year': f"{season_start}-{(season_start + 1) % 100:02d}",
+                'season_start': season_start,
+                'manufacturer': rng.choice(MANUFACTURERS),
+                'card_number': str(rng.randint(1, 400)),
+                'team': rng.choice(TEAMS),
+                'owner_id': owner_id,
+                'date_added': start + timedelta(minutes=rng.randint(0, 500000)),
+            })
+            if len(rows) >= batch_size:
+                db.session.execute(insert(Card), rows)
+                rows = []
+    if rows:
+        db.session.execute(insert(Card), rows)
+    db.session.commit()
+    rebuild_card_facets()
+
+
+def explain_sqlite(sql, ordered):
+    plan = [row[-1] for row in db.session.execute(text(f"EXPLAIN QUERY PLAN {sql}"))]
+    problems = []
+    for detail in plan:
+        # "SCAN card" (with or without a covering index) visits every row;
+        # "SEARCH card USING INDEX ..." is what we want.
+        match = re.match(r'SCAN (?:TABLE )?(\w+)', detail)
+        if match and match.group(1) in SCAN_GUARDED_TABLES:
+            problems.append(f"full scan: {detail}")
+        if ordered and 'TEMP B-TREE' in detail:
+            problems.append(f"separate sort: {detail}")
+    return plan, problems
+
+
+def _walk_pg_plan(node):
+    yield node
+    for child in node.get('Plans', []):
+        yield from _walk_pg_plan(child)
+
+
+def explain_postgresql(sql, ordered):
+    raw = db.session.execute(text(f"EXPLAIN (FORMAT JSON) {sql}")).scalar()
+    root = (raw if isinstance(raw, list) else json.loads(raw))[0]['Plan']
+    plan, problems = [], []
+    for node in _walk_pg_plan(root):
+        detail = f"{node['Node Type']} {node.get('Relation Name', '')} {node.get('Index Name', '')}".strip()
+        plan.append(detail)
+        if node['Node Type'] == 'Seq Scan' and node.get('Relation Name') in SCAN_GUARDED_TABLES:
+            problems.append(f"full scan: {detail}")
+        if ordered and node['Node Type'] in ('Sort', 'Incremental Sort'):
+            problems.append(f"separate sort: {detail}")
+    return plan, problems
+
+
+def check_plans():
+    dialect = db.engine.dialect.name
+    explain = explain_postgresql if dialect == 'postgresql' else explain_sqlite
+    owner_id, card_id = db.session.execute(
+        select(Card.owner_id, Card.id).order_by(Card.id.desc()).limit(1)).one()
+
+    failures = 0
+    for name, build, ordered in HOT_QUERIES:
+        stmt = build(owner_id, card_id)
+        sql = str(stmt.compile(dialect=db.engine.dialect, compile_kwargs={'literal_binds': True}))
+        plan, problems = explain(sql, ordered)
+        status = "FAIL" if problems else "ok"
+        print(f"[{status}] {name}")
+        for line in plan:
+            print(f"    {line}")
+        for problem in problems:
+            print(f"    !! {problem}")
+        failures += bool(problems)
+    return failures
+
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    temp_dir = None
+    database_url = args.database_url
+    if not database_url:
+        temp_dir = tempfile.TemporaryDirectory()
+        database_url = 'sqlite:///' + os.path.join(temp_dir.name, 'query_plans.db')
+
+    class QueryPlanConfig(Config):
+        SQLALCHEMY_DATABASE_URI = database_url
+
+    app = create_app(QueryPlanConfig)
+    with app.app_context():
+        db.create_all()
+        seed(args.users, args.cards_per_user, args.batch_size)
+        db.session.execute(text("ANALYZE"))
+        db.session.commit()
+        print(f"\n--- Checking query plans ({db.engine.dialect.name}) ---")
+        failures = check_plans()
+        db.session.remove()
+
+    if temp_dir:
+        temp_dir.cleanup()
+
+    if failures:
+        print(f"\n{failures} hot queries regressed to full scans.")
+        sys.exit(1)
+    print("\nAll hot queries use indexes.")
@@ -0,0 +1,94 @@
+# backend/scripts/ebay_image_standin.py
+"""Local HTTP stand-in for the eBay image host, for exercising the image mirror offline.
+
+Serves GET /images/g/<id>/s-l1600.jpg with a generated JPEG per id after
+--latency-ms, like a listing photo on i.ebayimg.com. Ids starting with
+"gone" answer 404 (an ended listing) and ids starting with "html" answer an
+HTML page, so the mirror's failure paths can be hit too. Point the backend at
+it with IMAGE_MIRROR_HOSTS=127.0.0.1 and image URLs such as
+http://127.0.0.1:8765/images/g/abc/s-l1600.jpg.
+
+Usage:
+    python scripts/ebay_image_standin.py --port 8765 --latency-ms 150
+"""
+import re
+import time
+import zlib
+import argparse
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+import cv2
+import numpy as np
+
+IMAGE_PATH_PATTERN = re.compile(r'/images/g/([\w-]+)/s-l\d+\.jpg')
+
+
+class StandInImageHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    latency = 0.0
+    image_size = (500, 700)
+    _images = {}
+    _images_lock = threading.Lock()
+    requests_served = 0
+
+    def _image_bytes(self, image_id):
+        with self._images_lock:
+            encoded = self._images.get(image_id)
+        if encoded is None:
+            # Deterministic per id, smooth like a photo so it compresses like one
+            rng = np.random.default_rng(zlib.crc32(image_id.encode()))
+            width, height = self.image_size
+            noise = rng.random((height // 20, width // 20, 3)).astype(np.float32) * 255
+            img = cv2.GaussianBlur(cv2.resize(noise, (width, height)), (0, 0), 3).astype(np.uint8)
+            encoded = cv2.imencode('.jpg', img, [cv2.IMWRITE_JPEG_QUALITY, 90])[1].tobytes()
+            with self._images_lock:
+                self._images[image_id] = encoded
+        return encoded
+
+    def do_GET(self):
+        type(self).requests_served += 1
+        time.sleep(self.latency)
+        match = IMAGE_PATH_PATTERN.fullmatch(self.path)
+        if not match or match.group(1).startswith('gone'):
+            self._send(404, 'text/plain', b'Not found')
+        elif match.group(1).startswith('html'):
+            self._send(200, 'text/html', b'<html><body>Listing ended</body></html>')
+        else:
+            self._send(200, 'image/jpeg', self._image_bytes(match.group(1)))
+
+    def _send(self, status, content_type, body):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass # Keep benchmark output readable
+
+
+def start_standin(port=0, latency_ms=0, image_size=(500, 700)):
+    """Starts the stand-in on a background thread.
+
+    Returns:
+        tuple: (server, base URL such as 'http://127.0.0.1:8765'); call server.shutdown() to stop it.
+    """
+    handler = type('Handler', (StandInImageHandler,), {'latency': latency_ms / 1000, 'image_size': image_size,
+                                                       '_images': {}})
+    server = ThreadingHTTPServer(('127.0.0.1', port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve generated card images like the eBay image host.")
+    parser.add_argument("--port", type=int, default=8765, help="Port on 127.0.0.1. Default: 8765")
+    parser.add_argument("--latency-ms", type=float, default=150, help="Delay before each response. Default: 150")
+    args = parser.parse_args()
+    server, base_url = start_standin(args.port, args.latency_ms)
+    print(f"Serving stand-in images at {base_url}/images/g/<id>/s-l1600.jpg (Ctrl+C to stop)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -8,11 +8,12 @@ from datetime import datetime
 backend_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 sys.path.insert(0, backend_dir)
 
-from app.image_utils import split_binder_page, split_binder_page_by_grid, \
+from app.image_utils import split_binder_page, split_binder_page_by_grid, split_binder_page_by_profile, \
+    triage_card_crops, crop_quality, peak_rss_mb, \
     DEFAULT_BLUR_KERNEL, DEFAULT_CANNY_LOW, DEFAULT_CANNY_HIGH, \
     DEFAULT_MIN_CARD_AREA_RATIO, DEFAULT_MAX_CARD_AREA_RATIO, \
     DEFAULT_CARD_ASPECT_RATIO_MIN, DEFAULT_CARD_ASPECT_RATIO_MAX, \
-    DEFAULT_APPROX_POLY_EPSILON, DEFAULT_ROW_TOLERANCE_RATIO
+    DEFAULT_APPROX_POLY_EPSILON, DEFAULT_ROW_TOLERANCE_RATIO, DEFAULT_DETECT_MAX_SIDE, POCKET_LAYOUTS
 
 # --- Argument Parsing ---
 def parse_args():
@@ -21,8 +22,13 @@ def parse_args():
     parser.add_argument("-o", "--output_base", default="../CV_testing",
                         help="Base directory for output subfolders (relative to script location). Default: ../CV_testing")
     parser.add_argument("--run_name", default=None, help="Optional custom name for the output subfolder.")
-    parser.add_argument("--method", choices=['contour', 'grid'], default='contour',
-                        help="Splitting method: 'contour' (default) or 'grid'.")
+    parser.add_argument("--method", choices=['contour', 'grid', 'profile'], default='contour',
+                        help="Splitting method: 'contour' (default), 'grid' or 'profile'.")
+    parser.add_argument("--triage", action="store_true",
+                        help="Score each crop as /upload-binder does before eBay lookups.")
+
+    parser.add_argument("--decode_max_side", type=int, default=0,
+                        help="Decode the page at 1/2, 1/4 or 1/8 scale down to this longest side, 0 for full resolution. Default: 0")
 
     # Contour Method Parameters
     contour_group = parser.add_argument_group('Contour Method Parameters')
@@ -35,12 +41,18 @@ def parse_args():
     contour_group.add_argument("--max_aspect", type=float, default=DEFAULT_CARD_ASPECT_RATIO_MAX, help=f"Max card aspect ratio (W/H). Default: {DEFAULT_CARD_ASPECT_RATIO_MAX}")
     contour_group.add_argument("--poly_eps", type=float, default=DEFAULT_APPROX_POLY_EPSILON, help=f"Polygon approximation epsilon factor. Default: {DEFAULT_APPROX_POLY_EPSILON}")
     contour_group.add_argument("--row_tol", type=float, default=DEFAULT_ROW_TOLERANCE_RATIO, help=f"Row sorting tolerance ratio. Default: {DEFAULT_ROW_TOLERANCE_RATIO}")
+    contour_group.add_argument("--detect_max_side", type=int, default=DEFAULT_DETECT_MAX_SIDE, help=f"Longest side of the detection image, 0 for full resolution. Default: {DEFAULT_DETECT_MAX_SIDE}")
     contour_group.add_argument("--no_debug_img", action="store_true", help="Do not save the debug image with contours.")
 
     # Grid Method Parameters
     grid_group = parser.add_argument_group('Grid Method Parameters')
     grid_group.add_argument("--crop_percent", type=int, default=5,
-                           help="Inner crop percentage for grid method. Default: 5")
+                           help="Inner crop percentage for grid and profile methods. Default: 5")
+
+    # Profile Method Parameters
+    profile_group = parser.add_argument_group('Profile Method Parameters')
+    profile_group.add_argument("--layout", choices=sorted(POCKET_LAYOUTS), default=None,
+                               help="Pocket layout (columns x rows). Default: detected")
 
     return parser.parse_args()
 
@@ -67,6 +79,8 @@ if __name__ == "__main__":
         # Add method and relevant params to folder name
         if args.method == 'grid':
             run_folder_name = f"run_{timestamp}_grid_crop{args.crop_percent}"
+        elif args.method == 'profile':
+            run_folder_name = f"run_{timestamp}_profile_{args.layout or 'auto'}_crop{args.crop_percent}"
         else: # contour
             run_folder_name = f"run_{timestamp}_contour_blur{args.blur[0]}x{args.blur[1]}_canny{args.canny_low}-{args.canny_high}"
     run_output_dir = os.path.join(base_output_path, run_folder_name)
@@ -84,7 +98,20 @@ if __name__ == "__main__":
         extracted_paths = split_binder_page_by_grid(
             image_path=args.image_path,
             output_dir=run_output_dir,
-            inner_crop_percent=args.crop_percent
+            inner_crop_percent=args.crop_percent,
+            decode_max_side=args.decode_max_side
+        )
+    elif args.method == 'profile':
+        print(f"Parameters:")
+        print(f"  Layout: {args.layout or 'detect'}")
+        print(f"  Crop Percent: {args.crop_percent}")
+        print("---")
+        extracted_paths = split_binder_page_by_profile(
+            image_path=args.image_path,
+            output_dir=run_output_dir,
+            layout=args.layout,
+            inner_crop_percent=args.crop_percent,
+            decode_max_side=args.decode_max_side
         )
     else: # contour
         print(f"Parameters:")
@@ -94,6 +121,7 @@ if __name__ == "__main__":
         print(f"  Aspect Ratio Filter: {args.min_aspect} - {args.max_aspect}")
         print(f"  Polygon Epsilon: {args.poly_eps}")
         print(f"  Row Tolerance Ratio: {args.row_tol}")
+        print(f"  Detection Max Side: {args.detect_max_side or 'full resolution'}")
         print(f"  Save Debug Image: {not args.no_debug_img}")
         print("---")
         extracted_paths = split_binder_page(
@@ -108,9 +136,24 @@ if __name__ == "__main__":
             aspect_max=args.max_aspect,
             poly_epsilon=args.poly_eps,
             row_tolerance_ratio=args.row_tol,
-            save_debug_image=not args.no_debug_img
+            save_debug_image=not args.no_debug_img,
+            detect_max_side=args.detect_max_side,
+            decode_max_side=args.decode_max_side
         )
 
+    if args.triage and extracted_paths:
+        import cv2
+        _, rejected = triage_card_crops(extracted_paths)
+        reasons = {item['card']: item['reason'] for item in rejected}
+        print("\n--- Triage ---")
+        for number, path in enumerate(extracted_paths, start=1):
+            metrics = crop_quality(cv2.imread(path, cv2.IMREAD_GRAYSCALE))
+            print(f"  Card {number}: {reasons.get(number, 'ok'):<8} {metrics}")
+        print(f"  eBay lookups saved: {len(rejected)} of {len(extracted_paths)}")
+
     print(f"\n--- Test Run Complete --- ")
     print(f"Results saved in: {run_output_dir}")
-    print(f"Number of cards extracted: {len(extracted_paths)}") 
\ No newline at end of file
+    print(f"Number of cards extracted: {len(extracted_paths)}")
+    peak = peak_rss_mb()
+    if peak is not None:
+        print(f"Peak RSS: {peak:.0f} MB") 
\ No newline at end of file
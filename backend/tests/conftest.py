@@ -0,0 +1,98 @@
+# backend/tests/conftest.py
+"""Shared fixtures: one app on a temporary SQLite database for the whole run.
+
+create_app registers the routes on the first app only, so the app (and its
+database) is session-scoped. Tests stay independent by working as a fresh
+user each: every per-process cache is keyed by owner, so nothing leaks
+between tests.
+"""
+import itertools
+import os
+import sys
+
+import pytest
+
+# Add the backend directory to the path so 'app' and 'config' import, as the scripts do
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, backend_dir)
+
+from config import Config
+
+_user_numbers = itertools.count(1)
+
+CARD = {
+    'player_name': 'Ja Morant',
+    'card_year': '2023-24',
+    'manufacturer': 'Panini',
+    'card_number': '12',
+    'team': 'Memphis Grizzlies',
+}
+
+
+@pytest.fixture(scope='session')
+def app(tmp_path_factory):
+    folder = tmp_path_factory.mktemp('app')
+
+    class TestConfig(Config):
+        TESTING = True
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{folder / 'test.db'}"
+        SQLALCHEMY_BINDS = {}
+        READ_DATABASE_URL = None
+        SESSION_COOKIE_DOMAIN = None
+        SESSION_COOKIE_SECURE = False
+        UPLOAD_FOLDER = str(folder / 'uploads')
+        THUMBNAIL_FOLDER = str(folder / 'thumbnails')
+        IMAGE_MIRROR = False
+        IMAGE_WORKERS = 0
+        COMPRESS_MIN_SIZE = 0
+
+    os.makedirs(TestConfig.UPLOAD_FOLDER)
+    from app import create_app, db
+    app = create_app(TestConfig)
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def make_user(app):
+    """Creates a user and returns (user id, bearer headers)."""
+    from app import db
+    from app.auth import issue_access_token
+    from app.models import User
+
+    def make_user():
+        number = next(_user_numbers)
+        with app.app_context():
+            user = User(username=f'user{number}', email=f'user{number}@example.com')
+            user.set_password('password')
+            db.session.add(user)
+            db.session.commit()
+            return user.id, {'Authorization': f'Bearer {issue_access_token(user)}'}
+    return make_user
+
+
+@pytest.fixture
+def user(make_user):
+    return make_user()
+
+
+@pytest.fixture
+def headers(user):
+    return user[1]
+
+
+@pytest.fixture
+def create_cards(client, headers):
+    """Creates cards through /cards/bulk and returns their ids."""
+    def create_cards(*cards, headers=headers):
+        response = client.post('/cards/bulk', json={'create': [dict(CARD, **card) for card in cards]},
+                               headers=headers)
+        assert response.status_code == 200, response.get_json()
+        return [item['id'] for item in response.get_json()['created']]
+    return create_cards
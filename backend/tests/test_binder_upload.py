@@ -0,0 +1,82 @@
+# backend/tests/test_binder_upload.py
+"""/upload-binder saves each card on its own: one bad card does not sink the page."""
+import io
+import sys
+
+import cv2
+import numpy as np
+import pytest
+
+
+@pytest.fixture
+def binder_page():
+    ok, encoded = cv2.imencode('.png', np.full((300, 240, 3), 200, np.uint8))
+    return encoded.tobytes()
+
+
+@pytest.fixture
+def routes(app, monkeypatch):
+    """app.routes with image splitting and eBay identification replaced by three fixed crops."""
+    routes = sys.modules['app.routes']
+    crops = [f'/crops/card_{number}.png' for number in (1, 2, 3)]
+
+    class Pool:
+        def run(self, fn, *args, **kwargs):
+            return crops, list(enumerate(crops, start=1)), [], {}, None
+
+    def identify_card(card_path, owner_id=None, image_hash=None):
+        number = card_path[-5]
+        data = {'player_name': f'Player {number}', 'card_year': '2020', 'manufacturer': 'Topps',
+                'card_number': number, 'team': 'Team', 'title': f'2020 Topps Player {number}',
+                'ebay_item_id': f'item{number}', 'image_url': None}
+        return data, {'source': 'keyword', 'api_calls': {'keyword': 1, 'image': 0}, 'duplicate_of': None}
+
+    monkeypatch.setattr(routes, 'get_image_pool', lambda: Pool())
+    monkeypatch.setattr(routes, 'identify_card', identify_card)
+    return routes
+
+
+def upload(client, headers, page):
+    return client.post('/upload-binder', headers=headers, content_type='multipart/form-data',
+                       data={'file': (io.BytesIO(page), 'page.png')})
+
+
+def test_failed_card_is_reported_and_the_rest_saved(app, client, user, routes, binder_page, monkeypatch):
+    from app.models import Card, CardFacet
+    user_id, headers = user
+    save_card_from_data = routes.save_card_from_data
+
+    def failing_save(data, owner_id, commit=True):
+        card = save_card_from_data(data, owner_id, commit=commit)
+        if data['card_number'] == '2':
+            raise RuntimeError('database said no')
+        return card
+    monkeypatch.setattr(routes, 'save_card_from_data', failing_save)
+
+    response = upload(client, headers, binder_page)
+
+    assert response.status_code == 201
+    body = response.get_json()
+    assert [card['player_name'] for card in body['saved_cards']] == ['Player 1', 'Player 3']
+    assert body['failed_saves'] == [{'card': 2, 'source_image': 'card_2.png', 'error': 'database said no'}]
+    with app.app_context():
+        assert sorted(card.card_number for card in Card.query.filter_by(owner_id=user_id)) == ['1', '3']
+        # The failed card's own writes were rolled back with its savepoint
+        assert CardFacet.query.filter_by(owner_id=user_id, field='total').one().count == 2
+        assert all(card.catalog_card_id for card in Card.query.filter_by(owner_id=user_id))
+
+
+def test_card_missing_fields_is_reported(client, headers, routes, binder_page, monkeypatch):
+    identify_card = routes.identify_card
+
+    def identify_without_year(card_path, **kwargs):
+        data, info = identify_card(card_path, **kwargs)
+        if card_path.endswith('card_3.png'):
+            data['card_year'] = None
+        return data, info
+    monkeypatch.setattr(routes, 'identify_card', identify_without_year)
+
+    body = upload(client, headers, binder_page).get_json()
+
+    assert len(body['saved_cards']) == 2
+    assert [failure['card'] for failure in body['failed_saves']] == [3]
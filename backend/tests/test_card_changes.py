@@ -0,0 +1,104 @@
+# backend/tests/test_card_changes.py
+"""Delta sync: /cards/changes keyset paging, deletions and expired cursors."""
+from datetime import datetime, timedelta
+
+import pytest
+
+
+def sync(client, headers, state, cursor='0', limit=500):
+    """Pages through /cards/changes like a client, applying each page to state."""
+    pages = 0
+    while True:
+        response = client.get(f'/cards/changes?since={cursor}&limit={limit}', headers=headers)
+        assert response.status_code == 200, response.get_json()
+        page = response.get_json()
+        assert len(page['upserts']) + len(page['deletes']) <= limit
+        for card_id in page['deletes']:
+            state.pop(card_id, None)
+        for card in page['upserts']:
+            state[card['id']] = card['team']
+        cursor, pages = page['cursor'], pages + 1
+        if not page['has_more']:
+            return cursor, pages
+
+
+def server_state(client, headers):
+    return {card['id']: card['team'] for card in client.get('/cards', headers=headers).get_json()}
+
+
+def test_full_sync_honours_limit(client, headers, create_cards):
+    create_cards(*[{'card_number': str(n)} for n in range(5)])
+
+    state = {}
+    cursor, pages = sync(client, headers, state, limit=2)
+
+    assert pages == 3
+    assert state == server_state(client, headers)
+    response = client.get(f'/cards/changes?since={cursor}', headers=headers).get_json()
+    assert response == {'cursor': cursor, 'has_more': False, 'upserts': [], 'deletes': []}
+
+
+def test_version_larger_than_limit_pages(client, headers, create_cards):
+    state = {}
+    cursor, _ = sync(client, headers, state)
+    # One bulk request is one collection version holding five changes
+    create_cards(*[{'card_number': str(n)} for n in range(5)])
+
+    cursor, pages = sync(client, headers, state, cursor, limit=2)
+
+    assert pages == 3
+    assert state == server_state(client, headers)
+
+
+def test_delta_sync_applies_updates_and_deletes(client, headers, create_cards):
+    ids = create_cards(*[{'card_number': str(n)} for n in range(4)])
+    state = {}
+    cursor, _ = sync(client, headers, state)
+
+    client.post('/cards/bulk', headers=headers, json={
+        'update': [{'id': ids[0], 'team': 'Boston Celtics'}], 'delete': ids[1:3]})
+    create_cards({'card_number': '99'})
+    cursor, _ = sync(client, headers, state, cursor, limit=1)
+
+    assert state == server_state(client, headers)
+    assert len(state) == 3
+
+
+def test_deletes_during_paging_are_seen(client, headers, create_cards):
+    create_cards(*[{'card_number': str(n)} for n in range(4)])
+    state = {}
+    page = client.get('/cards/changes?since=0&limit=2', headers=headers).get_json()
+    assert page['has_more']
+    for card in page['upserts']:
+        state[card['id']] = card['team']
+
+    client.delete(f"/cards/{page['upserts'][0]['id']}", headers=headers)
+    sync(client, headers, state, page['cursor'], limit=2)
+
+    assert state == server_state(client, headers)
+
+
+def test_purged_tombstones_expire_old_cursors(app, client, headers, create_cards):
+    from app.collection import purge_card_tombstones
+    ids = create_cards({'card_number': '1'}, {'card_number': '2'})
+    old_cursor, _ = sync(client, headers, {})
+    client.delete(f'/cards/{ids[0]}', headers=headers)
+    with app.app_context():
+        purge_card_tombstones(datetime.utcnow() + timedelta(days=1))
+
+    response = client.get(f'/cards/changes?since={old_cursor}', headers=headers)
+    assert response.status_code == 410
+
+    state = {}
+    sync(client, headers, state, limit=1)
+    assert state == server_state(client, headers)
+
+
+@pytest.mark.parametrize('cursor', ['x', '-1', '1:z:1:1', '1:u:1', '1:u:x:1'])
+def test_malformed_cursor_is_400(client, headers, cursor):
+    assert client.get(f'/cards/changes?since={cursor}', headers=headers).status_code == 400
+
+
+def test_cursor_from_the_future_is_410(client, headers, create_cards):
+    create_cards({})
+    assert client.get('/cards/changes?since=1000', headers=headers).status_code == 410
@@ -0,0 +1,93 @@
+# backend/tests/test_cards.py
+"""Card writes: /cards/bulk per-item statuses and card_year validation."""
+import pytest
+
+from conftest import CARD
+
+
+def test_bulk_create_reports_each_item(client, headers):
+    response = client.post('/cards/bulk', headers=headers, json={'create': [
+        CARD,
+        dict(CARD, player_name='Tyler Herro', team='Miami Heat'),
+        {'player_name': 'No Team'},
+        dict(CARD, card_year='vintage'),
+    ]})
+
+    assert response.status_code == 207
+    created = response.get_json()['created']
+    assert [item['status'] for item in created] == [201, 201, 400, 400]
+    assert [item['index'] for item in created] == [0, 1, 2, 3]
+    assert 'Missing required fields' in created[2]['error']
+    assert 'Invalid card_year' in created[3]['error']
+    cards = client.get('/cards', headers=headers).get_json()
+    assert sorted(card['player_name'] for card in cards) == ['Ja Morant', 'Tyler Herro']
+
+
+def test_bulk_update_and_delete_statuses(client, headers, make_user, create_cards):
+    mine, gone = create_cards({}, {'card_number': '13'})
+    _, other_headers = make_user()
+    [theirs] = create_cards({}, headers=other_headers)
+
+    response = client.post('/cards/bulk', headers=headers, json={
+        'update': [{'id': mine, 'team': 'Boston Celtics'}, {'id': theirs, 'team': 'x'}, {'id': 999999},
+                   {'id': mine, 'team': 'again'}, {'team': 'no id'}, ],
+        'delete': [gone, theirs, 'x'],
+    })
+
+    assert response.status_code == 207
+    body = response.get_json()
+    assert [item['status'] for item in body['updated']] == [200, 403, 404, 400, 400]
+    assert [item['status'] for item in body['deleted']] == [200, 403, 400]
+    cards = client.get('/cards', headers=headers).get_json()
+    assert [(card['id'], card['team']) for card in cards] == [(mine, 'Boston Celtics')]
+    assert client.get(f'/cards/{theirs}', headers=other_headers).get_json()['team'] == CARD['team']
+
+
+def test_bulk_all_invalid_is_400(client, headers):
+    response = client.post('/cards/bulk', headers=headers, json={'create': [{}], 'delete': [123456789]})
+    assert response.status_code == 400
+
+
+def test_create_normalizes_card_year(client, headers):
+    response = client.post('/cards', headers=headers, json=dict(CARD, card_year='2024'))
+    assert response.status_code == 201
+    card = response.get_json()
+    assert card['card_year'] == '2023-24'
+    assert card['season_start'] == 2023
+
+
+@pytest.mark.parametrize('patch', [
+    {'card_year': None},
+    {'card_year': ''},
+    {'card_year': 'vintage'},
+    {'card_year': ['2023']},
+    {'team': ''},
+    {'team': ['Heat']},
+])
+def test_put_rejects_invalid_fields(client, headers, create_cards, patch):
+    [card_id] = create_cards({})
+    response = client.put(f'/cards/{card_id}', headers=headers, json=patch)
+    assert response.status_code == 400
+    assert client.get(f'/cards/{card_id}', headers=headers).get_json()['card_year'] == '2023-24'
+
+
+def test_put_updates_season(client, headers, create_cards):
+    [card_id] = create_cards({})
+    response = client.put(f'/cards/{card_id}', headers=headers, json={'card_year': '19-20', 'grade': 'PSA 9'})
+    assert response.status_code == 200
+    card = client.get(f'/cards/{card_id}', headers=headers).get_json()
+    assert (card['card_year'], card['season_start'], card['grade']) == ('2019-20', 2019, 'PSA 9')
+
+
+def test_writes_by_deleted_user_are_401(app, client, user, create_cards):
+    from sqlalchemy import delete
+    from app import db
+    from app.models import User
+    user_id, headers = user
+    create_cards({})
+    with app.app_context():
+        db.session.execute(delete(User).where(User.id == user_id))
+        db.session.commit()
+
+    assert client.post('/cards', headers=headers, json=CARD).status_code == 401
+    assert client.post('/cards/bulk', headers=headers, json={'create': [CARD]}).status_code == 401
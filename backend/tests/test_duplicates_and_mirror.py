@@ -0,0 +1,75 @@
+# backend/tests/test_duplicates_and_mirror.py
+"""Per-owner near-duplicate index and mirrored image URLs on card responses."""
+import sys
+
+import pytest
+
+from conftest import CARD
+
+
+def save_hashed_card(app, user_id, image_hash, **fields):
+    from app.services import save_card_from_data
+    with app.app_context():
+        return save_card_from_data(dict(CARD, image_hash=image_hash, **fields), user_id).id
+
+
+def find(app, image_hash, owner_id, max_distance=4):
+    from app.image_hash import card_hash_index
+    with app.app_context():
+        return [card.id for _, card in card_hash_index.find(image_hash, max_distance, owner_id)]
+
+
+def test_hash_index_is_per_owner(app, user, make_user):
+    user_id, _ = user
+    other_id, _ = make_user()
+    card_id = save_hashed_card(app, user_id, 0x0123456789ABCDEF)
+
+    assert find(app, 0x0123456789ABCDEF, user_id) == [card_id]
+    assert find(app, 0x0123456789ABCDEE, user_id) == [card_id]
+    assert find(app, 0x0123456789ABCDEF, other_id) == []
+
+
+def test_hash_index_follows_writes(app, client, user):
+    user_id, headers = user
+    first = save_hashed_card(app, user_id, 0x1111)
+    assert find(app, 0x1111, user_id) == [first]
+
+    # Cards added after the owner's table was loaded are picked up by collection version
+    second = save_hashed_card(app, user_id, 0x7777000000000000, card_number='13')
+    assert find(app, 0x7777000000000000, user_id) == [second]
+
+    client.delete(f'/cards/{first}', headers=headers)
+    assert find(app, 0x1111, user_id) == []
+
+
+@pytest.fixture
+def mirror_on(app, monkeypatch):
+    monkeypatch.setitem(app.config, 'IMAGE_MIRROR', True)
+    # Register images without downloading them
+    monkeypatch.setattr(sys.modules['app.routes'], 'queue_mirror_downloads', lambda added: None)
+
+
+def test_mirror_url_only_for_registered_images(app, client, headers, create_cards, mirror_on):
+    from app import db
+    from app.models import Card
+    mirrored = client.post('/cards', headers=headers,
+                           json=dict(CARD, image_url='https://i.ebayimg.com/images/g/abc/s-l1600.jpg')).get_json()
+    elsewhere = client.post('/cards', headers=headers,
+                            json=dict(CARD, card_number='2', image_url='https://example.com/card.jpg')).get_json()
+    assert mirrored['image_mirror_url']
+    assert elsewhere['image_mirror_url'] is None
+
+    # A card stored before mirroring has no registered copy yet
+    with app.app_context():
+        db.session.execute(db.update(Card).where(Card.id == elsewhere['id'])
+                           .values(image_url='https://i.ebayimg.com/images/g/old/s-l1600.jpg'))
+        db.session.commit()
+    cards = {card['id']: card for card in client.get('/cards', headers=headers).get_json()}
+    assert cards[mirrored['id']]['image_mirror_url'] == mirrored['image_mirror_url']
+    assert cards[elsewhere['id']]['image_mirror_url'] is None
+
+
+def test_no_mirror_urls_when_mirroring_is_off(client, headers):
+    card = client.post('/cards', headers=headers,
+                       json=dict(CARD, image_url='https://i.ebayimg.com/images/g/abc/s-l1600.jpg')).get_json()
+    assert card['image_mirror_url'] is None
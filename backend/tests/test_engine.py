@@ -0,0 +1,101 @@
+# backend/tests/test_engine.py
+"""SQLite profile: write serialization and transactions pysqlite would not open."""
+import threading
+import time
+
+import pytest
+from sqlalchemy import text
+
+from app.engine import SQLiteWriteLock, _WRITE_STATEMENT
+
+
+@pytest.fixture
+def engine(app):
+    from app import db
+    with app.app_context():
+        yield db.engine
+
+
+@pytest.mark.parametrize('statement, is_write', [
+    ("INSERT INTO player (full_name) VALUES ('a')", True),
+    ("  update card SET team = 'x'", True),
+    ("SAVEPOINT sa_savepoint_1", True),
+    ("WITH v(n) AS (SELECT 1)\nINSERT INTO player (full_name) SELECT n FROM v", True),
+    ("WITH v(n) AS (SELECT 1) DELETE FROM player WHERE id IN (SELECT n FROM v)", True),
+    ("SELECT * FROM card", False),
+    ("WITH v(n) AS (SELECT 1) SELECT n FROM v", False),
+])
+def test_write_statement_pattern(statement, is_write):
+    assert bool(_WRITE_STATEMENT.match(statement)) is is_write
+
+
+def count_players(engine, name):
+    with engine.connect() as connection:
+        return connection.execute(text('SELECT count(*) FROM player WHERE full_name = :name'),
+                                  {'name': name}).scalar()
+
+
+def test_with_insert_is_locked_and_rolled_back(engine):
+    with engine.connect() as connection:
+        connection.execute(text("WITH v(n) AS (SELECT 'cte player') INSERT INTO player (full_name) SELECT n FROM v"))
+        assert connection.info.get('sqlite_write_lock')
+        connection.rollback()
+    assert count_players(engine, 'cte player') == 0
+
+
+def test_second_writer_on_the_same_thread_fails_fast(engine):
+    with engine.connect() as first, engine.connect() as second:
+        first.execute(text("INSERT INTO player (full_name) VALUES ('first')"))
+        start = time.monotonic()
+        with pytest.raises(RuntimeError):
+            second.execute(text("INSERT INTO player (full_name) VALUES ('second')"))
+        assert time.monotonic() - start < 1
+        first.rollback()
+
+
+def test_writers_on_other_threads_wait(engine):
+    finished = threading.Event()
+
+    def write():
+        with engine.connect() as connection:
+            connection.execute(text("INSERT INTO player (full_name) VALUES ('waiter')"))
+            connection.commit()
+        finished.set()
+
+    with engine.connect() as connection:
+        connection.execute(text("INSERT INTO player (full_name) VALUES ('holder')"))
+        thread = threading.Thread(target=write)
+        thread.start()
+        assert not finished.wait(0.2)
+        connection.rollback()
+    thread.join(5)
+    assert finished.is_set()
+    assert count_players(engine, 'waiter') == 1
+
+
+def test_lock_timeout(tmp_path):
+    lock = SQLiteWriteLock(str(tmp_path / 'db.writelock'), timeout=0.1)
+    lock.acquire()
+    timed_out = threading.Event()
+
+    def acquire():
+        try:
+            lock.acquire()
+        except TimeoutError:
+            timed_out.set()
+
+    thread = threading.Thread(target=acquire)
+    thread.start()
+    thread.join()
+    lock.release()
+    assert timed_out.is_set()
+
+
+def test_nested_transaction_is_a_real_savepoint(app):
+    from app import db
+    from app.models import Player
+    with app.app_context():
+        with db.session.begin_nested():
+            db.session.add(Player(full_name='savepoint player'))
+        db.session.rollback()
+        assert Player.query.filter_by(full_name='savepoint player').count() == 0
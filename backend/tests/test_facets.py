@@ -0,0 +1,53 @@
+# backend/tests/test_facets.py
+"""card_facet rollups kept by card writes, read through /autocomplete-options."""
+import pytest
+
+
+def team_counts(client, headers, **params):
+    query = '&'.join(f'{key}={value}' for key, value in dict({'field': 'team'}, **params).items())
+    response = client.get(f'/autocomplete-options?{query}', headers=headers)
+    assert response.status_code == 200
+    return {item['value']: item['count'] for item in response.get_json()['values']}
+
+
+def test_facet_counts_follow_writes(client, headers, create_cards):
+    first, second, third = create_cards({'team': 'Miami Heat'}, {'team': 'Miami Heat'}, {'team': 'Boston Celtics'})
+    assert team_counts(client, headers) == {'Boston Celtics': 1, 'Miami Heat': 2}
+
+    client.post('/cards/bulk', headers=headers, json={'update': [{'id': first, 'team': 'Boston Celtics'}]})
+    assert team_counts(client, headers) == {'Boston Celtics': 2, 'Miami Heat': 1}
+
+    client.put(f'/cards/{second}', headers=headers, json={'team': 'Boston Celtics'})
+    client.delete(f'/cards/{third}', headers=headers)
+    assert team_counts(client, headers) == {'Boston Celtics': 2}
+
+
+def test_bulk_create_upserts_one_row_per_value(app, client, user, create_cards):
+    from app.models import CardFacet
+    user_id, headers = user
+    create_cards(*[{'card_number': str(n)} for n in range(3)])
+
+    with app.app_context():
+        counts = {(facet.field, facet.value): facet.count
+                  for facet in CardFacet.query.filter_by(owner_id=user_id)}
+    assert counts[('total', '*')] == 3
+    assert counts[('team', 'Memphis Grizzlies')] == 3
+    assert counts[('card_year', '2023-24')] == 3
+
+
+def test_facets_are_per_owner(client, headers, make_user, create_cards):
+    _, other_headers = make_user()
+    create_cards({'team': 'Miami Heat'})
+    create_cards({'team': 'Boston Celtics'}, headers=other_headers)
+    assert team_counts(client, headers) == {'Miami Heat': 1}
+
+
+@pytest.mark.parametrize('limit, expected', [('-1', 1), ('0', 1), ('2', 2), ('1000', 3), ('x', 3)])
+def test_autocomplete_limit_is_clamped(client, headers, create_cards, limit, expected):
+    create_cards({'team': 'A'}, {'team': 'B'}, {'team': 'C'})
+    assert len(team_counts(client, headers, limit=limit)) == expected
+
+
+def test_autocomplete_prefix(client, headers, create_cards):
+    create_cards({'team': 'Miami Heat'}, {'team': 'Memphis Grizzlies'}, {'team': 'Boston Celtics'})
+    assert set(team_counts(client, headers, prefix='m')) == {'Miami Heat', 'Memphis Grizzlies'}
@@ -0,0 +1,72 @@
+# backend/tests/test_http_cache.py
+"""Conditional GETs: ETag/304 negotiation across representations and encodings."""
+import pytest
+
+
+@pytest.fixture
+def cards_headers(headers, create_cards):
+    create_cards(*[{'card_number': str(n)} for n in range(3)])
+    return headers
+
+
+def get(client, headers, url='/cards', **extra):
+    return client.get(url, headers=dict(headers, **extra))
+
+
+def test_matching_etag_is_304(client, cards_headers):
+    etag = get(client, cards_headers).headers['ETag']
+
+    response = get(client, cards_headers, **{'If-None-Match': etag})
+
+    assert response.status_code == 304
+    assert response.data == b''
+    assert response.headers['ETag'] == etag
+
+
+def test_write_changes_etag(client, cards_headers, create_cards):
+    etag = get(client, cards_headers).headers['ETag']
+    create_cards({'card_number': '99'})
+    assert get(client, cards_headers, **{'If-None-Match': etag}).status_code == 200
+
+
+def test_query_string_is_part_of_etag(client, cards_headers):
+    assert get(client, cards_headers).headers['ETag'] != \
+        get(client, cards_headers, '/cards?sort=-season').headers['ETag']
+
+
+def test_msgpack_etag_ignores_mimetype_alias(client, cards_headers):
+    from app import serializers
+    if serializers.msgpack is None:
+        pytest.skip('msgpack is not installed')
+    json_etag = get(client, cards_headers, Accept='application/json').headers['ETag']
+    msgpack_etag = get(client, cards_headers, Accept='application/msgpack').headers['ETag']
+    alias = get(client, cards_headers, Accept='application/x-msgpack')
+
+    assert alias.mimetype == 'application/msgpack'
+    assert alias.headers['ETag'] == msgpack_etag != json_etag
+    assert get(client, cards_headers, Accept='application/json',
+               **{'If-None-Match': msgpack_etag}).status_code == 200
+
+
+def test_304_keeps_encoding_suffix(client, cards_headers):
+    response = get(client, cards_headers, **{'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    etag = response.headers['ETag']
+    assert etag.endswith('-gzip"')
+
+    not_modified = get(client, cards_headers, **{'Accept-Encoding': 'gzip', 'If-None-Match': etag})
+
+    assert not_modified.status_code == 304
+    assert not_modified.headers['ETag'] == etag
+    assert 'Accept-Encoding' in not_modified.headers['Vary']
+
+
+def test_if_modified_since(client, cards_headers):
+    last_modified = get(client, cards_headers).headers['Last-Modified']
+    assert get(client, cards_headers, **{'If-Modified-Since': last_modified}).status_code == 304
+
+
+def test_errors_carry_no_validators(client, headers):
+    response = get(client, headers, '/autocomplete-options?field=bad')
+    assert response.status_code == 400
+    assert 'ETag' not in response.headers
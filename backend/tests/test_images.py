@@ -0,0 +1,74 @@
+# backend/tests/test_images.py
+"""Image work: the process pool's task timeout, thumbnails and grid splitting."""
+import os
+import threading
+import time
+
+import cv2
+import numpy as np
+import pytest
+
+from app.image_pool import ImageWorkerPool, ImagePoolBusy
+from app.image_utils import split_binder_page_by_grid
+from app.thumbnails import check_thumbnail_formats, make_thumbnails, thumbnail_relpath
+
+
+@pytest.fixture
+def page_path(tmp_path):
+    path = str(tmp_path / 'page.png')
+    cv2.imwrite(path, np.random.default_rng(0).integers(0, 255, (900, 600, 3), dtype=np.uint8))
+    return path
+
+
+def test_stuck_task_times_out_and_frees_its_slot():
+    pool = ImageWorkerPool(1, queue_size=1, submit_timeout=1)
+    try:
+        pool.run(time.sleep, 0)  # Start the worker outside the timeout
+        pool.task_timeout = 1
+
+        start = time.monotonic()
+        with pytest.raises(ImagePoolBusy):
+            pool.run(time.sleep, 60)
+        assert time.monotonic() - start < 5
+
+        pool.task_timeout = None
+        assert pool.run(max, 1, 2) == 2
+        assert pool.stats()['timed_out'] == 1
+        assert pool.stats()['in_flight'] == 0
+    finally:
+        pool.shutdown(wait=False)
+
+
+def test_inline_pool_runs_in_the_caller():
+    assert ImageWorkerPool(0, task_timeout=1).run(max, 1, 2) == 2
+
+
+def test_unknown_thumbnail_format_is_rejected():
+    check_thumbnail_formats(['webp', 'jpg'])
+    with pytest.raises(ValueError, match='jpeg'):
+        check_thumbnail_formats(['webp', 'jpeg'])
+
+
+def test_concurrent_thumbnail_writers(tmp_path, page_path):
+    folder = str(tmp_path / 'thumbnails')
+    keys = []
+    threads = [threading.Thread(target=lambda: keys.append(make_thumbnails(page_path, folder, [200, 100], ['jpg'])))
+               for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    key = keys[0]
+    assert keys == [key] * 4
+    for width in (200, 100):
+        path = os.path.join(folder, thumbnail_relpath(key, width, 'jpg'))
+        assert cv2.imread(path).shape[1] == width
+    assert not [name for name in os.listdir(os.path.join(folder, key[:2])) if name.endswith('.tmp')]
+
+
+def test_grid_split_crops_nine_cells(tmp_path, page_path):
+    paths = split_binder_page_by_grid(page_path, str(tmp_path / 'cards'), inner_crop_percent=5)
+    assert len(paths) == 9
+    # 200x300 cells less 5% on each side
+    assert cv2.imread(paths[0]).shape[:2] == (270, 180)
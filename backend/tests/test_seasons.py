@@ -0,0 +1,36 @@
+# backend/tests/test_seasons.py
+"""Season parsing: card_year forms, the stored season_start and validation."""
+import pytest
+
+from app.serializers import format_card_year, format_season
+from app.services import card_season_fields, check_card_year, parse_season_start
+
+
+@pytest.mark.parametrize('card_year', ['2023-24', '23-24', '2024', 2024, '24', '2023-2024'])
+def test_accepted_forms_share_a_season(card_year):
+    assert parse_season_start(card_year) == 2023
+    assert card_season_fields(card_year) == {'card_year': '2023-24', 'season_start': 2023}
+
+
+def test_century_rollover():
+    assert card_season_fields('1999-00') == {'card_year': '1999-00', 'season_start': 1999}
+    assert format_season(1999) == '1999-00'
+
+
+@pytest.mark.parametrize('card_year', ['vintage', '2023/24'])
+def test_unparseable_years_are_kept_verbatim(card_year):
+    assert parse_season_start(card_year) is None
+    assert card_season_fields(card_year) == {'card_year': card_year, 'season_start': None}
+    assert check_card_year(card_year).startswith('Invalid card_year')
+
+
+@pytest.mark.parametrize('card_year', [None, ''])
+def test_empty_years_are_left_to_required_field_checks(card_year):
+    assert parse_season_start(card_year) is None
+    assert check_card_year(card_year) is None
+
+
+@pytest.mark.parametrize('stored, shown', [('2024', '2023-24'), (2024, '2023-24'), ('2023-24', '2023-24'),
+                                           (None, None)])
+def test_format_card_year(stored, shown):
+    assert format_card_year(stored) == shown
@@ -13,6 +13,7 @@ interface Card {
   team: string | null;
   grade: string | null;
   image_url: string | null;
+  image_mirror_url?: string | null; // Backend copy of image_url, relative to the API URL
   date_added: string;
   notes: string | null;
   sport?: string | null;
@@ -236,7 +237,10 @@ export default function EditCardPage() {
         <div className="bg-white rounded-lg shadow-md p-4 mb-6 relative aspect-w-3 aspect-h-4">
           {card.image_url ? (
             <Image
-              src={card.image_url}
+              src={card.image_mirror_url
+                ? `${process.env.NEXT_PUBLIC_API_URL || 'http://localhost:5000'}${card.image_mirror_url}`
+                : card.image_url}
+              unoptimized={Boolean(card.image_mirror_url)}
               alt={`${card.card_year || ''} ${card.manufacturer || ''} ${card.player_name}`}
               fill
               style={{ objectFit: 'contain' }}
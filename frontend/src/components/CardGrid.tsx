@@ -1,6 +1,16 @@
 import React from 'react';
 import { useRouter } from 'next/navigation';
-import Image from 'next/image';
+import Image, { ImageLoaderProps } from 'next/image';
+
+const API_URL = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:5000';
+// Widths the backend writes for every uploaded crop (THUMBNAIL_SIZES)
+const THUMBNAIL_WIDTHS = [200, 400, 800];
+
+// Picks the smallest stored thumbnail at least as wide as the slot Next.js asks for
+const thumbnailLoader = (key: string) => ({ width }: ImageLoaderProps) => {
+  const size = THUMBNAIL_WIDTHS.find((w) => w >= width) ?? THUMBNAIL_WIDTHS[THUMBNAIL_WIDTHS.length - 1];
+  return `${API_URL}/thumbnails/${key}/${size}.webp`;
+};
 
 // Define the structure of a Card object (matching backend)
 interface Card {
@@ -12,6 +22,8 @@ interface Card {
   team: string | null;
   grade: string | null;
   image_url: string | null;
+  image_key: string | null; // Uploaded crop, served as /thumbnails/<key>/<width>.webp
+  image_mirror_url: string | null; // Backend copy of image_url, relative to API_URL
   date_added: string; // ISO format string
   notes: string | null;
 }
@@ -40,7 +52,25 @@ const CardGrid: React.FC<CardGridProps> = ({ cards }) => {
           onClick={() => handleCardClick(card.id)}
         >
           <div className="relative w-full h-48">
-            {card.image_url ? (
+            {card.image_key ? (
+              <Image
+                loader={thumbnailLoader(card.image_key)}
+                src={card.image_key}
+                alt={`${card.card_year || ''} ${card.manufacturer || ''} ${card.player_name}`}
+                fill
+                style={{ objectFit: 'cover' }}
+                sizes="(max-width: 640px) 50vw, (max-width: 768px) 33vw, (max-width: 1024px) 25vw, (max-width: 1280px) 20vw, 17vw"
+              />
+            ) : card.image_mirror_url ? (
+              // Served and cached by the backend; it redirects to image_url until the copy exists
+              <Image
+                src={`${API_URL}${card.image_mirror_url}`}
+                alt={`${card.card_year || ''} ${card.manufacturer || ''} ${card.player_name}`}
+                fill
+                unoptimized
+                style={{ objectFit: 'cover' }}
+              />
+            ) : card.image_url ? (
               <Image
                 src={card.image_url}
                 alt={`${card.card_year || ''} ${card.manufacturer || ''} ${card.player_name}`}